@@ -0,0 +1,65 @@
+# Import (startup) time of each pipeline entry point, measured in fresh interpreters
+# Run from the repository root: python -m benchmarks.bench_import_time
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ["pmc", "conf", "combine_classify"]
+# Importing an entry point should not pull in the heavy stacks it loads lazily
+BUDGET_SECONDS = 1.0
+
+
+def parse_importtime(stderr, module, top=5):
+    """Slowest packages imported directly by ``module`` (cumulative microseconds) from -X importtime output"""
+    # Lines are printed children-first, each nesting level indented by two more spaces
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if not cum.strip().isdigit():
+            continue
+        level = len(name) - len(name.lstrip())
+        if level == 3:
+            package = name.strip().split(".")[0]
+            children[package] = children.get(package, 0) + int(cum)
+        elif level == 1:
+            if name.strip() == module:
+                return sorted(children.items(), key=lambda item: -item[1])[:top]
+            children = {}
+    return []
+
+
+def measure(module, repeat=3):
+    times = []
+    stderr = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True
+        )
+        times.append(time.perf_counter() - start)
+        stderr = proc.stderr
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{stderr.splitlines()[-1]}")
+    return statistics.median(times), parse_importtime(stderr, module)
+
+
+def main():
+    baseline, _ = measure("pandas")
+    print(f"{'python + pandas':>18}: {baseline:.2f}s (shared floor)")
+    for module in ENTRY_POINTS:
+        try:
+            elapsed, heaviest = measure(module)
+        except RuntimeError as e:
+            print(f"{module:>18}: {e}")
+            continue
+        flag = "" if elapsed < BUDGET_SECONDS else f"  OVER {BUDGET_SECONDS:.1f}s BUDGET"
+        slowest = ", ".join(f"{name} {us / 1e6:.2f}s" for name, us in heaviest)
+        print(f"{module:>18}: {elapsed:.2f}s{flag}  [{slowest}]")
+
+
+if __name__ == "__main__":
+    main()
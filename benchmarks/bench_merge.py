@@ -0,0 +1,101 @@
+# Merge time and peak memory of DataMerger on a synthetic corpus
+# Run from the repository root: python -m benchmarks.bench_merge [rows]
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from combine_classify import DataMerger, DataPaths
+
+WORDS = np.array(["deep", "learning", "sepsis", "icu", "federated", "ehr", "model", "clinical",
+                  "imaging", "signal", "patients", "cohort", "prediction", "outcome", "risk"])
+# Per-dataset count columns carried by the real inputs but unused by the merge
+DATASET_COLUMNS = ['mimic', 'eicu', 'uk_biobank', 'chest_x-ray14', 'adni', 'physionet', 'oasis',
+                   'tcga', 'gdc', 'seer', 'tuh_eeg_corpus', 'github', 'gitlab', 'zenodo']
+# Roughly the real split: PubMed dominates, conferences are small
+SHARES = {'pubmed': 0.97, 'ml4h': 0.01, 'chil': 0.01, 'mlhc': 0.01}
+
+
+def make_frame(n, source, seed=0):
+    rng = np.random.default_rng(seed)
+    text = lambda k: [" ".join(row) for row in WORDS[rng.integers(0, len(WORDS), size=(n, k))]]
+    df = pd.DataFrame({
+        'year': rng.integers(2017, 2025, size=n),
+        'paper_id': rng.integers(10**7, 10**8, size=n).astype(str),
+        'title': text(8),
+        'authors': text(4),
+        'abstract': text(40),
+        'citation_count': rng.integers(0, 500, size=n),
+        'code': rng.integers(0, 2, size=n),
+        'ai': rng.integers(0, 2, size=n),
+        'dataset_count': rng.integers(0, 3, size=n),
+        **{f"{name}_count": rng.integers(0, 2, size=n) for name in DATASET_COLUMNS},
+    })
+    if source != 'pubmed':
+        df['cleaned_title'] = df['title']
+    return df
+
+
+def write_corpus(directory, rows):
+    paths = {}
+    for i, (source, share) in enumerate(SHARES.items()):
+        paths[source] = Path(directory) / f"{source}.csv"
+        make_frame(max(1, int(rows * share)), source, seed=i).to_csv(paths[source], index=False)
+    return DataPaths(
+        pubmed_path=paths['pubmed'], ml4h_path=paths['ml4h'], chil_path=paths['chil'],
+        mlhc_path=paths['mlhc'], output_path=Path(directory) / "combined.csv",
+    )
+
+
+def legacy_merge(paths):
+    """The previous per-column, in-place standardization, for comparison"""
+    dfs = []
+    for source, path in [('ml4h', paths.ml4h_path), ('chil', paths.chil_path),
+                         ('mlhc', paths.mlhc_path), ('pubmed', paths.pubmed_path)]:
+        df = pd.read_csv(path)
+        for col in ['year', 'paper_id', 'title', 'cleaned_title', 'authors',
+                    'abstract', 'citation_count', 'code', 'ai']:
+            if col not in df.columns:
+                df[col] = 0 if col in ['code', 'ai', 'citation_count', 'year'] else ''
+        for col in ['year', 'citation_count', 'code', 'ai']:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+        if 'venue' not in df.columns:
+            df['venue'] = source
+        for col in ['paper_id', 'title', 'cleaned_title', 'authors', 'abstract', 'venue']:
+            df[col] = df[col].fillna('').astype(str)
+        dfs.append(df)
+    return pd.concat(dfs, ignore_index=True)
+
+
+def measure(fn):
+    """Wall time of one run, then peak traced memory of a second (tracing slows allocation)"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    df = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def main(rows=1_000_000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing synthetic corpus of {rows} rows...")
+        paths = write_corpus(directory, rows)
+
+        merger = DataMerger(paths, extra_columns=('dataset_count',))
+        for name, fn in [("legacy", lambda: legacy_merge(paths)),
+                         ("schema", lambda: merger.merge_data(write_csv=False))]:
+            df, elapsed, peak = measure(fn)
+            frame_mb = df.memory_usage(deep=True).sum() / 2**20
+            print(f"{name:>7}: {elapsed:6.2f}s, peak {peak / 2**20:8.1f} MiB, frame {frame_mb:8.1f} MiB")
+            del df
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,51 @@
+# Microbenchmark for per-PDF post-processing in PDFContentProcessor (no spaCy model needed)
+# Run from the repository root: python -m benchmarks.bench_pdf_postprocess
+import random
+import timeit
+
+from src.conf_proc.measure_conf import PDFContentProcessor
+
+HEADERS = [
+    "Proceedings of Machine Learning Research 1–26, 2023 Machine Learning for Health (ML4H) 2023",
+    "Proceedings of Machine Learning Research 182:1–20, 2022 Machine Learning for Healthcare",
+    "Conference on Health, Inference, and Learning (CHIL) 2021",
+]
+WORDS = ["Deep", "Learning", "for", "Sepsis", "Prediction", "in", "the", "ICU", "Federated",
+         "EHR", "Models", "Clinical", "Time", "Series", "Self-Supervised", "Imaging"]
+
+
+def make_titles(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(HEADERS)} {' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 14)))}"
+        for _ in range(n)
+    ]
+
+
+def make_pages(n, words_per_page=600, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(words_per_page // 12)]
+        if i == n - 1:
+            lines.insert(len(lines) // 2, "References")
+        pages.append("\n".join(lines))
+    return pages
+
+
+def main(repeat=5):
+    titles = make_titles(1000)
+    pages = make_pages(12)
+
+    title_time = min(timeit.repeat(
+        lambda: [PDFContentProcessor.clean_title(t) for t in titles], number=1, repeat=repeat
+    ))
+    cutoff_time = min(timeit.repeat(
+        lambda: [PDFContentProcessor.find_references_cutoff(p) for p in pages], number=1, repeat=repeat
+    ))
+    print(f"clean_title: {title_time / len(titles) * 1e6:.1f} us/title")
+    print(f"find_references_cutoff: {cutoff_time / len(pages) * 1e6:.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
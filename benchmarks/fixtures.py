@@ -0,0 +1,301 @@
+# Synthetic inputs and fake backends for the offline benchmark suite
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+from src.pubmed.pmc_scrape import AI_TERMS, CODE_TERMS, DATASET_TERMS
+
+FILLER = ("the of and to in for with on by patients model clinical data learning outcomes risk cohort "
+          "prediction hospital imaging signal sequencing records treatment analysis network training "
+          "validation performance accuracy sensitivity specificity baseline features temporal").split()
+# Vocabulary the term counters look for, mixed sparsely into the filler text
+TERMS = [term for group in DATASET_TERMS for term in group] + CODE_TERMS + AI_TERMS
+SURNAMES = ["Smith", "Chen", "Garcia", "Okafor", "Ivanova", "Tanaka", "Dubois", "Kumar"]
+GIVEN_NAMES = ["Alex", "Maria", "Wei", "Amara", "Lena", "Kenji", "Sophie", "Ravi"]
+
+
+def sentence(rng: random.Random, words: int = 18, term_rate: float = 0.02) -> str:
+    tokens = [rng.choice(TERMS) if rng.random() < term_rate else rng.choice(FILLER) for _ in range(words)]
+    return " ".join(tokens).capitalize() + "."
+
+
+def paragraph(rng: random.Random, sentences: int = 6, term_rate: float = 0.02) -> str:
+    return " ".join(sentence(rng, rng.randint(12, 26), term_rate) for _ in range(sentences))
+
+
+def _passage(offset: int, text: str, section: str, kind: str, **infons) -> str:
+    fields = {'section_type': section, 'type': kind, **infons}
+    infon_xml = "".join(f'<infon key="{key}">{escape(str(value))}</infon>' for key, value in fields.items())
+    return f"<passage>{infon_xml}<offset>{offset}</offset><text>{escape(text)}</text></passage>"
+
+
+def make_bioc_xml(pmid: str, seed: int = 0, paragraphs: int = 40, references: int = 40) -> str:
+    """
+    A PMC open-access article in BioC XML as served by the BioNLP API.
+
+    The defaults give about 100 KB per document with the front matter,
+    abstract, body sections, tables, figures and references that the parsers
+    read; real articles are mostly 50-300 KB.
+    """
+    rng = random.Random(seed)
+    year = rng.randint(2018, 2024)
+    authors = {
+        f"name_{i}": f"surname:{rng.choice(SURNAMES)};given-names:{rng.choice(GIVEN_NAMES)}"
+        for i in range(rng.randint(3, 8))
+    }
+    passages, offset = [], 0
+
+    def add(text, section, kind, **infons):
+        nonlocal offset
+        passages.append(_passage(offset, text, section, kind, **infons))
+        offset += len(text) + 1
+
+    add(sentence(rng, 12).rstrip("."), "TITLE", "front",
+        **{'article-id_pmid': pmid, 'article-id_pmc': f"PMC{int(pmid) + 1000000}", 'year': year}, **authors)
+    add("Background", "ABSTRACT", "abstract_title_1")
+    add(paragraph(rng, 4), "ABSTRACT", "abstract")
+    add("Methods", "ABSTRACT", "abstract_title_1")
+    add(paragraph(rng, 4), "ABSTRACT", "abstract")
+    sections = ["INTRO", "METHODS", "RESULTS", "DISCUSS", "CONCL"]
+    for i in range(paragraphs):
+        section = sections[min(i * len(sections) // paragraphs, len(sections) - 1)]
+        add(paragraph(rng, rng.randint(4, 9)), section, "paragraph")
+        if i % 10 == 9:
+            add(paragraph(rng, 2), "TABLE", "table_caption", id=f"T{i // 10 + 1}")
+            add(paragraph(rng, 1), "FIG", "fig_caption", id=f"F{i // 10 + 1}")
+    for i in range(references):
+        add(f"{rng.choice(SURNAMES)} {rng.choice(GIVEN_NAMES)[0]}. {sentence(rng, 10)} J Med {2000 + i % 24}.",
+            "REF", "ref")
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><!DOCTYPE collection SYSTEM "BioC.dtd">'
+        f"<collection><source>PMC</source><date>20240101</date><key>pmc.key</key>"
+        f"<document><id>PMC{int(pmid) + 1000000}</id>{''.join(passages)}</document></collection>"
+    )
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """
+    A minimal uncompressed PDF with one text line per entry, using the base-14
+    Helvetica font so no font program is embedded. Offsets in the xref table
+    are computed exactly, so strict readers accept it.
+    """
+    objects = {1: "<< /Type /Catalog /Pages 2 0 R >>", 3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for i, lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        body = "\n".join(f"{_pdf_string(line)} Tj T*" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 54 750 Td\n{body}\nET"
+        objects[content_id] = f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream"
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode('latin-1')
+    for number in range(1, size):
+        out += f"{offsets[number]:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    return bytes(out)
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + ([line] if line else [])
+
+
+def make_conference_paper(seed: int = 0, pages: int = 10, lines_per_page: int = 60) -> bytes:
+    """A PMLR-style conference paper: header, title, authors, abstract, body and references"""
+    rng = random.Random(seed)
+    authors = [f"{rng.choice(GIVEN_NAMES)} {rng.choice(SURNAMES)}" for _ in range(rng.randint(2, 5))]
+    first = [
+        "Proceedings of Machine Learning Research 1-26, 2023 Machine Learning for Health (ML4H) 2023",
+        sentence(rng, 10).rstrip("."),
+        "",
+    ]
+    for name in authors:
+        first += [name, f"{name.split()[1].lower()}@university.edu", "Department of Computer Science"]
+    first += ["", "Abstract"] + _wrap(paragraph(rng, 6, term_rate=0.05)) + ["", "1. Introduction"]
+
+    body = []
+    while len(first) + len(body) < pages * lines_per_page:
+        body += _wrap(paragraph(rng, 6, term_rate=0.05)) + [""]
+    lines = (first + body)[:pages * lines_per_page]
+    # References start partway down the last page
+    reference_at = (pages - 1) * lines_per_page + lines_per_page // 2
+    lines[reference_at:] = ["References"] + [
+        f"{rng.choice(SURNAMES)}, {rng.choice(GIVEN_NAMES)[0]}. {sentence(rng, 10)}"
+        for _ in range(len(lines) - reference_at - 1)
+    ]
+    return make_pdf([lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)])
+
+
+class FakeNLP:
+    """Stand-in for the spaCy pipeline: tags capitalized two-word lines as PERSON"""
+
+    def __call__(self, text: str):
+        words = text.split()
+        person = len(words) == 2 and all(word[:1].isupper() and word[1:].islower() for word in words)
+        return SimpleNamespace(ents=[SimpleNamespace(label_="PERSON", text=text)] if person else [])
+
+
+class FakeHTTPServer:
+    """
+    Threaded local HTTP server with configurable latency and 429 rate.
+
+    ``responder(path, query)`` returns (status, body, content_type). A seeded
+    fraction ``rate_429`` of requests get HTTP 429 before the responder runs.
+    Use as a context manager; ``url`` is the base address.
+    """
+
+    def __init__(self, responder: Callable[[str, dict], Tuple[int, bytes, str]],
+                 latency: float = 0.0, rate_429: float = 0.0, seed: int = 0):
+        rng = random.Random(seed)
+        lock = threading.Lock()
+        server = self
+        self.requests = 0
+        self.throttled = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    server.requests += 1
+                    throttled = rng.random() < rate_429
+                    server.throttled += throttled
+                if latency:
+                    time.sleep(latency)
+                if throttled:
+                    status, body, content_type = 429, b'{"message": "Too Many Requests"}', "application/json"
+                else:
+                    parsed = urlparse(self.path)
+                    status, body, content_type = responder(parsed.path, parse_qs(parsed.query))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+def semantic_scholar_responder(path: str, query: dict) -> Tuple[int, bytes, str]:
+    """Paper search results echoing the queried title with a deterministic citation count"""
+    title = query.get('query', [''])[0]
+    citations = sum(map(ord, title)) % 500
+    data = [{'paperId': str(i), 'title': title if i == 0 else f"Unrelated {i}", 'citationCount': citations}
+            for i in range(3)]
+    return 200, json.dumps({'total': len(data), 'data': data}).encode('utf-8'), "application/json"
+
+
+class WhitespaceTokenizer:
+    """Fast-tokenizer stand-in: one token per whitespace-separated word, with offsets"""
+    is_fast = True
+    eos_token_id = 0
+    pad_token_id = None
+    padding_side = "right"
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        offsets, start = [], None
+        for i, char in enumerate(text + " "):
+            if char.isspace():
+                if start is not None:
+                    offsets.append((start, i))
+                    start = None
+            elif start is None:
+                start = i
+        encoding = {'input_ids': list(range(1, len(offsets) + 1))}
+        if return_offsets_mapping:
+            encoding['offset_mapping'] = offsets
+        return encoding
+
+    def decode(self, ids, **kwargs):
+        return " ".join("tok" for _ in ids)
+
+
+class MockLLMPipeline:
+    """
+    Text-generation pipeline stand-in with simulated latency.
+
+    Each call sleeps ``prefill_latency`` per prompt token, then
+    ``token_latency`` per decode step (shared by the batch, as on a GPU),
+    calling any ``stopping_criteria`` after each step like generate() does.
+    Responses cycle through ``responses``. ``simulated_seconds`` accumulates
+    the sleep time so callers can separate their own overhead from it.
+    """
+
+    def __init__(self, responses: Optional[List[str]] = None, token_latency: float = 0.0,
+                 prefill_latency: float = 0.0, model_name: str = "mock-llm"):
+        self.responses = responses or [
+            "Category: E.H.R (Electronic Health Records)", "Category: Clinical Images",
+            "Category: Biosignals", "Category: Biomedicine",
+        ]
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self.tokenizer = WhitespaceTokenizer()
+        self.model = SimpleNamespace(name_or_path=model_name, device="cpu")
+        self.simulated_seconds = 0.0
+        self.calls = 0
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+            self.simulated_seconds += seconds
+
+    def __call__(self, prompts, batch_size=None, max_new_tokens=256, return_full_text=True,
+                 stopping_criteria=None, **generate_kwargs):
+        single = isinstance(prompts, str)
+        batch = [prompts] if single else list(prompts)
+        self._sleep(self.prefill_latency * sum(len(self.tokenizer(p)['input_ids']) for p in batch))
+
+        texts = [self.responses[(self.calls + i) % len(self.responses)] for i in range(len(batch))]
+        self.calls += len(batch)
+        steps = min(max_new_tokens, max(len(text.split()) for text in texts))
+        input_ids = SimpleNamespace(shape=(len(batch), steps))
+        for _ in range(steps):
+            self._sleep(self.token_latency)
+            for criterion in stopping_criteria or ():
+                criterion(input_ids, None)
+
+        outputs = [
+            [{'generated_text': text if not return_full_text else prompt + text}]
+            for prompt, text in zip(batch, texts)
+        ]
+        return outputs[0] if single else outputs
@@ -0,0 +1,294 @@
+# Offline benchmark suite over the pipeline hot paths: no network, GPU or downloaded models needed
+# Run from the repository root: python -m benchmarks.suite [--quick] [--only NAME ...] [--save-baseline]
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.fixtures import (FakeHTTPServer, FakeNLP, MockLLMPipeline, make_bioc_xml,
+                                 make_conference_paper, paragraph, semantic_scholar_responder, sentence)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+# A benchmark regresses when it is this much slower per item than its saved baseline
+TOLERANCE = 0.25
+
+
+@dataclass
+class Benchmark:
+    name: str
+    fn: Callable[[bool], Tuple[float, int, str]]
+    unit: str
+    # Hard ceiling in seconds per item, checked even without a baseline
+    budget: float
+
+
+@dataclass
+class Result:
+    name: str
+    seconds: float
+    items: int
+    unit: str
+    budget: float
+    note: str = ""
+    skipped: bool = False
+
+    @property
+    def per_item(self) -> float:
+        return self.seconds / self.items if self.items else 0.0
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str, budget: float):
+    def register(fn):
+        BENCHMARKS[name] = Benchmark(name, fn, unit, budget)
+        return fn
+    return register
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose optional dependency is not installed"""
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest wall time of ``repeat`` runs, with the pipeline's own prints silenced"""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def make_papers(n: int, seed: int = 0) -> pd.DataFrame:
+    import random
+    rng = random.Random(seed)
+    venues = ['pubmed'] * 17 + ['ml4h', 'chil', 'mlhc']
+    titles = [sentence(rng, 10).rstrip('.') for _ in range(n)]
+    return pd.DataFrame({
+        'paper_id': [str(10_000_000 + i) for i in range(n)],
+        'venue': [rng.choice(venues) for _ in range(n)],
+        'title': titles,
+        'cleaned_title': titles,
+        'abstract': [paragraph(rng, rng.randint(6, 14)) for _ in range(n)],
+        'citation_count': [rng.randint(0, 300) for _ in range(n)],
+    })
+
+
+@lru_cache(maxsize=None)
+def bioc_corpus(n: int):
+    pmids = [str(30_000_000 + i) for i in range(n)]
+    return pmids, [make_bioc_xml(pmid, seed=i) for i, pmid in enumerate(pmids)]
+
+
+@lru_cache(maxsize=None)
+def parsed_records(n: int):
+    from src.pubmed.pmc_scrape import PubMedProcessor
+    pmids, xmls = bioc_corpus(n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return PubMedProcessor("bench").process_bioc_xml(xmls, pmids)
+
+
+@benchmark("bioc_parse", unit="doc", budget=0.5)
+def bench_bioc_parse(quick: bool):
+    from src.pubmed.pmc_scrape import PubMedProcessor
+    pmids, xmls = bioc_corpus(20 if quick else 100)
+    processor = PubMedProcessor("bench")
+    seconds = best_of(lambda: processor.process_bioc_xml(xmls, pmids), 1 if quick else 2)
+    megabytes = sum(map(len, xmls)) / 1e6
+    return seconds, len(xmls), f"{megabytes / seconds:.1f} MB/s of BioC XML"
+
+
+@benchmark("term_count", unit="paper", budget=0.05)
+def bench_term_count(quick: bool):
+    from src.pubmed.pmc_scrape import DATASET_TERMS, PubMedProcessor
+    from src.pubmed.term_cache import TermCountCache
+    records = parsed_records(20 if quick else 100)
+    processor = PubMedProcessor("bench")
+    processor.create_dataset_mapping(DATASET_TERMS)
+
+    def run():
+        # A cold cache each time, with citations preloaded so iCite is never queried
+        processor.term_cache = TermCountCache()
+        processor.term_cache.citations = {pmid: (0, time.time()) for pmid in records}
+        processor.get_counts_per_paper(records)
+
+    return best_of(run, 3), len(records), "cold term cache"
+
+
+@benchmark("get_analysis", unit="paper", budget=0.0005)
+def bench_get_analysis(quick: bool):
+    import random
+    from src.pubmed.pmc_scrape import DATASET_TERMS, PubMedProcessor
+    processor = PubMedProcessor("bench")
+    processor.create_dataset_mapping(DATASET_TERMS)
+    rng = random.Random(0)
+    columns = list(processor.count_columns())
+    counts = {}
+    for i in range(5_000 if quick else 50_000):
+        row = {name: rng.choice((0, 0, 0, 1, 2)) for name in columns}
+        row['big_datasets'] = sum(row[key] for key in processor.dataset_mapping)
+        row['citation_count'] = rng.randint(0, 300)
+        counts[str(i)] = row
+    return best_of(lambda: processor.get_analysis(counts), 3), len(counts), ""
+
+
+@benchmark("pdf_extract", unit="pdf", budget=1.0)
+def bench_pdf_extract(quick: bool):
+    try:
+        from src.conf_proc.measure_conf import PDFContentProcessor
+    except ImportError as e:
+        raise Skip(f"needs {e.name}")
+    from src.conf_proc.pathing import ConferencePathManager
+    n = 5 if quick else 30
+    directory = Path("pdfs")
+    directory.mkdir(exist_ok=True)
+    files = []
+    for i in range(n):
+        files.append(directory / f"paper{i}.pdf")
+        files[-1].write_bytes(make_conference_paper(seed=i))
+    processor = PDFContentProcessor(ConferencePathManager(base_dir="data"))
+    # Offline NER stand-in; the transformer model dominates real runs and is measured by the metrics layer
+    processor._nlp = FakeNLP()
+    seconds = best_of(lambda: [processor.process_pdf_file(path, 2023) for path in files], 1 if quick else 2)
+    return seconds, n, "PyPDF2 extraction + header heuristics, fake NER"
+
+
+@benchmark("classify", unit="paper", budget=0.05)
+def bench_classify(quick: bool):
+    from src.topic.classification import ClassifierConfig, TopicClassifier
+    df = make_papers(200 if quick else 2_000)
+    runs = []
+
+    def run():
+        # Fresh results log each run so nothing is skipped as already classified
+        tag = len(runs)
+        pipeline = MockLLMPipeline()
+        config = ClassifierConfig(device="cpu", input_path=Path("unused.csv"),
+                                  output_path=Path(f"classified{tag}.csv"), log_path=Path(f"classified{tag}.jsonl"))
+        TopicClassifier(config, pipeline).process_dataset(df.copy(), batch_size=100)
+        runs.append(pipeline)
+
+    seconds = best_of(run, 1 if quick else 2)
+    return seconds, len(df), "mock LLM with zero latency: prompt building, batching, logging"
+
+
+@benchmark("classify_latency", unit="paper", budget=0.05)
+def bench_classify_latency(quick: bool):
+    from src.topic.classification import ClassifierConfig, TopicClassifier
+    df = make_papers(50 if quick else 200)
+    pipeline = MockLLMPipeline(token_latency=0.002, prefill_latency=1e-6)
+    config = ClassifierConfig(device="cpu", output_path=Path("latency.csv"), log_path=Path("latency.jsonl"))
+    seconds = best_of(lambda: TopicClassifier(config, pipeline).process_dataset(df.copy(), batch_size=100), 1)
+    overhead = seconds - pipeline.simulated_seconds
+    return seconds, len(df), f"simulated LLM {pipeline.simulated_seconds:.2f}s, overhead {overhead:.2f}s"
+
+
+@benchmark("semantic_scholar", unit="paper", budget=0.1)
+def bench_semantic_scholar(quick: bool):
+    from src.citation.semantic_scholar import SemanticScholarConfig, SemanticScholarProcessor
+    df = make_papers(40 if quick else 200)
+    df.to_csv("cleaned.csv", index=False)
+    with FakeHTTPServer(semantic_scholar_responder, latency=0.002, rate_429=0.1) as server:
+        processor = SemanticScholarProcessor(SemanticScholarConfig(
+            api_key="bench", base_url=f"{server.url}/graph/v1/paper/search", delay=0.0
+        ))
+        seconds = best_of(lambda: processor.process_conferences(
+            {'bench': {'input': 'cleaned.csv', 'output': 'citations.csv'}}
+        ), 1)
+    return seconds, len(df), f"2 ms server latency, {server.throttled}/{server.requests} requests throttled (429)"
+
+
+@benchmark("merge", unit="row", budget=0.0002)
+def bench_merge(quick: bool):
+    from benchmarks.bench_merge import write_corpus
+    from combine_classify import DataMerger
+    rows = 20_000 if quick else 200_000
+    paths = write_corpus(".", rows)
+    merger = DataMerger(paths, extra_columns=('dataset_count',))
+    seconds = best_of(lambda: merger.merge_data(dedup=True), 1)
+    return seconds, rows, "read, standardize, MinHash dedup and CSV write"
+
+
+def run(names, quick: bool) -> Dict[str, Result]:
+    results = {}
+    # Benchmarks write their scratch files into a throwaway working directory
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        logging.disable(logging.WARNING)
+        try:
+            for name in names:
+                bench = BENCHMARKS[name]
+                try:
+                    seconds, items, note = bench.fn(quick)
+                    results[name] = Result(name, seconds, items, bench.unit, bench.budget, note)
+                except Skip as e:
+                    results[name] = Result(name, 0.0, 0, bench.unit, bench.budget, str(e), skipped=True)
+        finally:
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+    return results
+
+
+def check(results: Dict[str, Result], baseline: Optional[dict], tolerance: float):
+    """Lines of the report and whether any benchmark regressed"""
+    lines = [f"{'benchmark':<18} {'items':>7} {'seconds':>8} {'per item':>12} {'baseline':>12} {'status':>9}  note"]
+    failed = False
+    for result in results.values():
+        if result.skipped:
+            lines.append(f"{result.name:<18} {'':>7} {'':>8} {'':>12} {'':>12} {'skipped':>9}  {result.note}")
+            continue
+        status = "ok"
+        reference = (baseline or {}).get(result.name)
+        if result.per_item > result.budget:
+            status = "OVER"
+        elif reference and result.per_item > reference * (1 + tolerance):
+            status = "SLOWER"
+        failed |= status != "ok"
+        reference_text = f"{reference * 1e3:>9.3f} ms" if reference else f"{'-':>12}"
+        lines.append(
+            f"{result.name:<18} {result.items:>7} {result.seconds:>8.2f} "
+            f"{result.per_item * 1e3:>9.3f} ms {reference_text} {status:>9}  {result.note}"
+        )
+    return lines, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the pipeline hot paths")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast smoke run")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Record per-item times in {BASELINE_PATH.name}")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else None
+    results = run(args.only or list(BENCHMARKS), args.quick)
+    lines, failed = check(results, baseline, args.tolerance)
+    print("\n".join(lines))
+
+    if args.save_baseline:
+        saved = dict(baseline or {})
+        saved.update({name: result.per_item for name, result in results.items() if not result.skipped})
+        BASELINE_PATH.write_text(json.dumps(saved, indent=1, sort_keys=True) + "\n")
+        print(f"Saved baseline to {BASELINE_PATH}")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,21 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
-import torch
+from typing import Dict, Optional, Tuple
 import pandas as pd
 import logging
+from src.corpus.dedup import deduplicate
+from src.pipeline.metrics import METRICS
 from src.topic.classification import ClassifierConfig, TopicClassifier
-from src.llm.llm import load_70b_model
+from src.llm.sharding import ShardedRunner
+
+# Merged schema, declared once: string columns default to '', count columns to 0
+STRING_COLUMNS = ['paper_id', 'title', 'cleaned_title', 'authors', 'abstract']
+COUNT_COLUMNS = ['year', 'citation_count', 'code', 'ai']
+MERGE_COLUMNS = ['year', 'paper_id', 'title', 'cleaned_title', 'authors',
+                 'abstract', 'citation_count', 'code', 'ai', 'venue']
+COUNT_DTYPE = 'Int64'
+
 @dataclass
 class DataPaths:
     """Paths for input and output data files"""
@@ -18,16 +27,33 @@ class DataPaths:
     chil_path: Path
     mlhc_path: Path
     output_path: Path
+    parquet_path: Optional[Path] = None  # Optional Parquet copy of the merged data
 
 class DataMerger:
-    def __init__(self, paths: DataPaths):
+    def __init__(self, paths: DataPaths, extra_columns: Optional[Tuple[str, ...]] = None):
         self.paths = paths
+        # Columns typed beyond the merge schema; '*_count' columns are typed as counts.
+        # With None every other source column (affiliation, per-dataset counts, ...) is
+        # kept as read; a tuple keeps only the schema plus those columns.
+        self.keep_all_columns = extra_columns is None
+        self.extra_columns = tuple(extra_columns or ())
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def string_columns(self):
+        return STRING_COLUMNS + [c for c in self.extra_columns if not c.endswith('_count')]
+
+    @property
+    def count_columns(self):
+        return COUNT_COLUMNS + [c for c in self.extra_columns if c.endswith('_count')]
+
     def read_data(self) -> Dict[str, pd.DataFrame]:
         """Read all input dataframes"""
         dfs = {}
+        wanted = set(MERGE_COLUMNS) | set(self.extra_columns)
+        usecols = None if self.keep_all_columns else (lambda col: col in wanted)
+        string_dtypes = {col: str for col in self.string_columns + ['venue']}
         
         # Read conference data
         for name, path in [
@@ -37,7 +63,8 @@ class DataMerger:
             ('pubmed', self.paths.pubmed_path)
         ]:
             try:
-                df = pd.read_csv(path)
+                # Only the schema columns are parsed; strings skip type inference
+                df = pd.read_csv(path, usecols=usecols, dtype=string_dtypes)
                 self.logger.info(f"Read {name} data: {len(df)} rows")
                 dfs[name] = df
             except FileNotFoundError:
@@ -47,40 +74,34 @@ class DataMerger:
         return dfs
 
     def standardize_columns(self, df: pd.DataFrame, source: str) -> pd.DataFrame:
-        """Standardize columns for a dataframe"""
-        # Ensure required columns exist
-        required_columns = [
-            'year', 'paper_id', 'title', 'cleaned_title', 'authors', 
-            'abstract', 'citation_count', 'code', 'ai'
-        ]
-        
-        for col in required_columns:
-            if col not in df.columns:
-                if col in ['code', 'ai']:
-                    df[col] = 0
-                elif col in ['citation_count', 'year']:
-                    df[col] = 0
-                else:
-                    df[col] = ''
+        """Standardize a dataframe to the merge schema, returning a new frame"""
+        columns = {}
+        for col in self.count_columns:
+            if col in df.columns:
+                values = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            else:
+                values = pd.Series(0, index=df.index)
+            columns[col] = values.astype(COUNT_DTYPE)
         
-        # Convert numeric columns
-        numeric_cols = ['year', 'citation_count', 'code', 'ai']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+        for col in self.string_columns:
+            columns[col] = df[col].fillna('') if col in df.columns else pd.Series('', index=df.index, dtype=object)
         
         # Add venue if not present
-        if 'venue' not in df.columns:
-            df['venue'] = source
+        columns['venue'] = df['venue'].fillna('') if 'venue' in df.columns else pd.Series(source, index=df.index)
         
-        # Ensure string columns are strings
-        string_cols = ['paper_id', 'title', 'cleaned_title', 'authors', 'abstract', 'venue']
-        for col in string_cols:
-            df[col] = df[col].fillna('').astype(str)
-            
-        return df
-
-    def merge_data(self) -> pd.DataFrame:
-        """Merge all dataframes"""
+        ordered = [col for col in MERGE_COLUMNS if col in columns]
+        ordered += [col for col in self.extra_columns if col not in ordered]
+        if self.keep_all_columns:
+            # Undeclared columns are passed through untyped; concat fills them with NaN
+            # for sources that lack them, as a plain concat of the sources would
+            for col in df.columns:
+                if col not in columns:
+                    columns[col] = df[col]
+                    ordered.append(col)
+        return pd.DataFrame(columns, index=df.index)[ordered]
+
+    def merge_data(self, write_csv: bool = True, dedup: bool = False) -> pd.DataFrame:
+        """Merge all dataframes, optionally collapsing duplicate papers across sources"""
         # Read all data
         dfs = self.read_data()
         if not dfs:
@@ -91,14 +112,41 @@ class DataMerger:
         for source, df in dfs.items():
             standardized_dfs[source] = self.standardize_columns(df, source)
             self.logger.info(f"Standardized {source} data: {len(standardized_dfs[source])} rows")
+        del dfs
+        
+        # A shared categorical dtype lets the venue codes concatenate without falling back to object
+        venues = sorted(set().union(*(df['venue'].unique() for df in standardized_dfs.values())))
+        venue_dtype = pd.CategoricalDtype(venues)
+        for df in standardized_dfs.values():
+            df['venue'] = df['venue'].astype(venue_dtype)
         
         # Combine all dataframes
-        merged_df = pd.concat(standardized_dfs.values(), ignore_index=True)
+        merged_df = pd.concat(standardized_dfs.values(), ignore_index=True, copy=False)
         self.logger.info(f"Combined data: {len(merged_df)} rows")
         
+        if dedup:
+            merged_rows = len(merged_df)
+            with METRICS.timer("merge.dedup", items=merged_rows):
+                merged_df, duplicates = deduplicate(merged_df)
+            duplicates_path = self.paths.output_path.with_name(f"{self.paths.output_path.stem}_duplicates.csv")
+            duplicates.to_csv(duplicates_path, index=False)
+            self.logger.info(
+                f"Deduplicated data: {merged_rows} -> {len(merged_df)} rows; "
+                f"{duplicates['dedup_cluster'].nunique()} duplicate clusters saved to {duplicates_path}"
+            )
+        
         # Save merged data
-        merged_df.to_csv(self.paths.output_path, index=False)
-        self.logger.info(f"Saved combined data to {self.paths.output_path}")
+        if write_csv:
+            with METRICS.timer("csv.write", items=len(merged_df)):
+                merged_df.to_csv(self.paths.output_path, index=False)
+            self.logger.info(f"Saved combined data to {self.paths.output_path}")
+        if self.paths.parquet_path is not None:
+            try:
+                with METRICS.timer("parquet.write", items=len(merged_df)):
+                    merged_df.to_parquet(self.paths.parquet_path, index=False)
+                self.logger.info(f"Saved combined data to {self.paths.parquet_path}")
+            except ImportError as e:
+                self.logger.warning(f"Skipping Parquet output: {e}")
         
         return merged_df
 
@@ -110,12 +158,13 @@ def main():
         ml4h_path=Path("data/processed/ml4h/ml4h_citations.csv"),
         chil_path=Path("data/processed/chil/chil_citations.csv"),
         mlhc_path=Path("data/processed/mlhc/mlhc_citations.csv"),
-        output_path=Path("data/processed/combined_data.csv")
+        output_path=Path("data/processed/combined_data.csv"),
+        parquet_path=Path("data/processed/combined_data.parquet")
     )
     
     # Initialize merger and process data
     merger = DataMerger(paths)
-    combined_df = merger.merge_data()
+    combined_df = merger.merge_data(dedup=True)
     
 
     # Initialize config
@@ -125,13 +174,27 @@ def main():
         output_path=Path("data/processed/classified_data.csv")
     )
     
-    # Initialize LLM (assuming load_70b_model is imported)
-    device = torch.device(config.device if torch.cuda.is_available() else "cpu")
-    llm_pipeline = load_70b_model(device)
-    
-    # Initialize and run classifier
-    classifier = TopicClassifier(config, llm_pipeline)
-    classified_df = classifier.process_dataset(batch_size=100)
+    # torch and transformers load only once the classification stage starts
+    import torch
+    from src.llm.llm import load_70b_model
+
+    # With several GPUs, shard the corpus over one 70B replica per device
+    devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    if len(devices) > 1:
+        classifier = TopicClassifier(config)
+        runner = ShardedRunner(devices, load_70b_model)
+    else:
+        # Initialize LLM (assuming load_70b_model is imported)
+        device = torch.device(config.device if torch.cuda.is_available() else "cpu")
+        llm_pipeline = load_70b_model(device, config.decoding)
+        
+        # Initialize and run classifier
+        classifier = TopicClassifier(config, llm_pipeline)
+        runner = None
+    # Classify the merged frame in memory instead of re-reading combined_data.csv
+    classified_df = classifier.process_dataset(df=combined_df, batch_size=100, runner=runner)
+    if runner is not None:
+        runner.close()
     
     # Topic Classification saved below
     if classified_df is not None:
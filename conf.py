@@ -1,11 +1,14 @@
 # Main Script for Aggregating Conference Papers and Extracting Content
+import argparse
 from src.conf_proc.scrape_conf import ConferenceDownloader
 from src.conf_proc.clean_conf import ConferencePaperCleaner
-from src.conf_proc.measure_conf import PDFContentProcessor
+from src.llm.sharding import ShardedRunner
+from src.conf_proc.measure_conf import DEFAULT_PDF_WORKERS, PDFContentProcessor
+from src.conf_proc.header_backend import GrobidHeaderBackend
 from src.conf_proc.pathing import ConferencePathManager
 from src.citation.semantic_scholar import SemanticScholarProcessor, SemanticScholarConfig
 
-def start_debug():
+def start_debug(header_backend=None):
     print("Starting debug mode...")
     
     # Initialize path manager in debug mode
@@ -16,7 +19,7 @@ def start_debug():
     
     # Initialize processors with debug path manager
     downloader = ConferenceDownloader(path_manager)
-    processor = PDFContentProcessor(path_manager)
+    processor = PDFContentProcessor(path_manager, header_backend=header_backend)
     
     
     # Process only ML4H in debug mode
@@ -31,25 +34,35 @@ def start_debug():
     print("Cleaning Functionality Complete!")
 
 
-def main():
+def main(debug: bool = False, workers: int = DEFAULT_PDF_WORKERS, grobid_url: str = None):
+    # Headers come from GROBID when a service URL is given, else from the spaCy heuristics
+    header_backend = GrobidHeaderBackend(grobid_url) if grobid_url else None
 
-    debug = True 
     if debug:
-        return start_debug()
+        return start_debug(header_backend)
     else:
         print("Downloading and processing conference papers...")
         path_manager = ConferencePathManager(base_dir="data")
         
         # Initialize processors with path manager
         downloader = ConferenceDownloader(path_manager)
-        processor = PDFContentProcessor(path_manager)
+        processor = PDFContentProcessor(path_manager, header_backend=header_backend)
         cleaner = ConferencePaperCleaner(path_manager, device="cuda:0")
+        # With several GPUs, clean titles with one 70B replica per device
+        import torch
+        from src.llm.llm import load_70b_model
+        devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+        runner = ShardedRunner(devices, load_70b_model) if len(devices) > 1 else None
         
+        # The replicas load once and are reused for every conference
         for conference in ['chil', 'ml4h', 'mlhc']:
             print(f"\nProcessing {conference.upper()}...")
             downloader.process_conference(conference)
-            processor.process_conference(conference)
-            cleaner.clean_conference_papers(conference)
+            # Header parsing is CPU-only; shard PDFs over a few processes
+            processor.process_conference(conference, workers=workers)
+            cleaner.clean_conference_papers(conference, runner=runner)
+        if runner is not None:
+            runner.close()
 
         # Define file paths
         file_paths = {
@@ -80,4 +93,11 @@ def main():
             print(f"\n{conf} shape:", df.shape)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--debug", action="store_true", help="Process a few ML4H papers under data/debug")
+    parser.add_argument("--workers", type=int, default=DEFAULT_PDF_WORKERS,
+                        help="PDF extraction processes; each loads its own spaCy transformer model")
+    parser.add_argument("--grobid", metavar="URL",
+                        help="Extract paper headers with a GROBID service, e.g. http://localhost:8070")
+    args = parser.parse_args()
+    main(debug=args.debug, workers=args.workers, grobid_url=args.grobid)
\ No newline at end of file
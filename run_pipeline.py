@@ -0,0 +1,41 @@
+# Runs the whole data pipeline as a DAG, skipping stages whose inputs are unchanged
+import argparse
+from pathlib import Path
+
+from src.pipeline.metrics import METRICS, MetricsExporter
+from src.pipeline.stages import build_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the PubMed and conference pipeline")
+    parser.add_argument("--targets", nargs="+", help="Stages to run along with their upstream stages (default: all)")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="Rerun the named stages even if cached; with no names, rerun every selected stage")
+    parser.add_argument("--debug", action="store_true", help="Process a few ML4H papers under data/debug")
+    parser.add_argument("--workers", type=int, default=2, help="Stages run concurrently")
+    parser.add_argument("--pdf-workers", type=int,
+                        help="PDF extraction processes per conference; each loads its own spaCy transformer model")
+    parser.add_argument("--list", action="store_true", help="Print the stages and their dependencies, then exit")
+    parser.add_argument("--metrics", type=Path, default=Path("data/pipeline_metrics.json"),
+                        help="Timings and counters as JSON; a Prometheus textfile is written beside it (.prom)")
+    parser.add_argument("--metrics-interval", type=float, default=60.0, help="Seconds between metrics exports")
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(debug=args.debug, max_workers=args.workers, pdf_workers=args.pdf_workers)
+    if args.list:
+        for name, deps in pipeline.deps.items():
+            print(f"{name}: {', '.join(sorted(deps)) or '-'}")
+        return
+
+    force = True if args.force == [] else (args.force or False)
+    with MetricsExporter(METRICS, args.metrics, args.metrics.with_suffix(".prom"), args.metrics_interval):
+        results = pipeline.run(targets=args.targets, force=force)
+    print("\n" + pipeline.format_report(results))
+    print("\n" + METRICS.format_report())
+    print(f"Metrics written to {args.metrics} and {args.metrics.with_suffix('.prom')}")
+    if any(result.status in ('failed', 'blocked') for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,26 @@
+import os
 import pandas as pd
 import requests
 from urllib.parse import quote
 import re
 import time
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "https://paperswithcode.com/api/v1/papers/"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Lookup outcomes recorded in the 'paper_with_code_status' column
+STATUS_FOUND = "found"
+STATUS_NO_MATCH = "no_match"
+STATUS_NO_DATASETS = "no_datasets"
+STATUS_ERROR = "error"
 
 def word_overlap(str1, str2):
     words1 = re.findall(r'\w+', str1.lower())
@@ -10,15 +28,28 @@ def word_overlap(str1, str2):
     overlap = sum(any(w2.startswith(w1) or w1.startswith(w2) for w2 in words2) for w1 in words1)
     return overlap
 
-def find_paper_datasets(search_title):
-    base_url = "https://paperswithcode.com/api/v1/papers/"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
+def create_session(pool_size=16, max_retries=3, backoff_factor=1.0):
+    """Create a pooled session that retries rate-limited and server errors with backoff"""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def lookup_paper_datasets(search_title, session=None):
+    """Look up a title and return {'status', 'count', 'error'} instead of collapsing failures to 0"""
+    session = session or requests
     try:
-        search_url = f"{base_url}?title={quote(search_title)}"
-        response = requests.get(search_url, headers=headers)
+        search_url = f"{BASE_URL}?title={quote(search_title)}"
+        response = session.get(search_url, headers=HEADERS, timeout=30)
         response.raise_for_status()
         search_data = response.json()
 
@@ -26,48 +57,128 @@ def find_paper_datasets(search_title):
             overlap = word_overlap(search_title, paper['title'])
             if overlap >= 3:
                 paper_id = paper['id']
-                datasets_url = f"{base_url}{paper_id}/datasets/"
-                dataset_response = requests.get(datasets_url, headers=headers)
+                datasets_url = f"{BASE_URL}{paper_id}/datasets/"
+                dataset_response = session.get(datasets_url, headers=HEADERS, timeout=30)
                 dataset_response.raise_for_status()
                 dataset_data = dataset_response.json()
-                return len(dataset_data.get('results', []))
+                count = len(dataset_data.get('results', []))
+                status = STATUS_FOUND if count > 0 else STATUS_NO_DATASETS
+                return {'status': status, 'count': count, 'error': ''}
 
-        return 0
+        return {'status': STATUS_NO_MATCH, 'count': 0, 'error': ''}
 
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"An error occurred for title '{search_title}': {e}")
-        return 0
-
-def update_dataframe_with_dataset_count(df):
-    df['paper_with_code_data_count'] = 0
-    total_rows = len(df)
-
-    for index, row in df.iterrows():
-        if index % 10 == 0:
-            print(f"Processing row {index+1}/{total_rows}")
-
-        search_title = row['cleaned_title'] if pd.notna(row['cleaned_title']) and row['cleaned_title'] != '' else row['title']
-        
-        if pd.isna(search_title) or search_title == '':
-            continue
-
-        dataset_count = find_paper_datasets(search_title)
-        df.at[index, 'paper_with_code_data_count'] = dataset_count
-
-        # time.sleep(0.5)  # 0.5 second delay between API calls
-
-    return df
+        return {'status': STATUS_ERROR, 'count': 0, 'error': str(e)}
+
+def find_paper_datasets(search_title, session=None):
+    return lookup_paper_datasets(search_title, session)['count']
+
+class PapersWithCodeFetcher:
+    """Concurrent Papers with Code API client with a title-hash response cache.
+
+    Only successful lookups are cached, so re-running over the same frame retries
+    the rows that errored without re-fetching the ones that already resolved.
+    """
+
+    def __init__(self, cache_path="data/cache/papers_with_code.jsonl", max_workers=8, max_retries=3):
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.session = create_session(pool_size=max_workers, max_retries=max_retries)
+        self._lock = threading.Lock()
+        self.cache = self._load_cache()
+
+    @staticmethod
+    def title_hash(title):
+        normalized = ' '.join(re.findall(r'\w+', title.lower()))
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def _load_cache(self):
+        cache = {}
+        if self.cache_path and os.path.exists(self.cache_path):
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partially written last line
+                    cache[entry['key']] = entry['result']
+        return cache
+
+    def _store(self, key, result):
+        with self._lock:
+            self.cache[key] = result
+            if self.cache_path:
+                os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+                with open(self.cache_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'result': result}) + '\n')
+
+    def lookup(self, search_title):
+        key = self.title_hash(search_title)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = lookup_paper_datasets(search_title, self.session)
+        if result['status'] != STATUS_ERROR:
+            self._store(key, result)
+        return result
+
+    def update_dataframe(self, df):
+        search_titles = df['cleaned_title'].where(
+            df['cleaned_title'].notna() & (df['cleaned_title'] != ''), df['title']
+        ).fillna('')
+        unique_titles = [title for title in search_titles.unique() if title != '']
+        print(f"Looking up {len(unique_titles)} unique titles with {self.max_workers} workers")
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for done, (title, result) in enumerate(
+                zip(unique_titles, executor.map(self.lookup, unique_titles)), start=1
+            ):
+                results[title] = result
+                if done % 100 == 0:
+                    print(f"Processed {done}/{len(unique_titles)} titles")
+
+        df['paper_with_code_data_count'] = search_titles.map(
+            lambda t: results[t]['count'] if t in results else 0
+        ).astype(int)
+        df['paper_with_code_status'] = search_titles.map(
+            lambda t: results[t]['status'] if t in results else STATUS_NO_MATCH
+        )
+        print(df['paper_with_code_status'].value_counts())
+        return df
+
+def update_dataframe_with_dataset_count(df, max_workers=8, cache_path="data/cache/papers_with_code.jsonl"):
+    fetcher = PapersWithCodeFetcher(cache_path=cache_path, max_workers=max_workers)
+    return fetcher.update_dataframe(df)
 
 # Load your DataFrame
 
-def papers_with_code(path):
+def load_dump_index(dump_dir):
+    """Load the cached local dump index from ``dump_dir``, rebuilding it when the dump files change"""
+    from src.citation.pwc_dump import PapersWithCodeDumpIndex, dump_signature
+    index_path = os.path.join(dump_dir, "pwc_index.pkl")
+    if os.path.exists(index_path):
+        index = PapersWithCodeDumpIndex.load(index_path)
+        if index.source == dump_signature(dump_dir):
+            return index
+        print(f"Dump files in {dump_dir} changed; rebuilding {index_path}")
+    index = PapersWithCodeDumpIndex.from_dump_dir(dump_dir)
+    index.save(index_path)
+    print(f"Built Papers with Code dump index with {len(index.titles)} papers at {index_path}")
+    return index
+
+def papers_with_code(path, dump_dir=None, max_workers=8):
     topic_df = pd.read_csv(path)
     print(f"Original DataFrame length: {len(topic_df)}")
 
-    # Update the DataFrame with dataset counts
-    updated_df = update_dataframe_with_dataset_count(topic_df)
+    # Update the DataFrame with dataset counts, offline if the PwC dumps are available
+    if dump_dir is not None:
+        updated_df = load_dump_index(dump_dir).update_dataframe(topic_df)
+    else:
+        updated_df = update_dataframe_with_dataset_count(topic_df, max_workers=max_workers)
 
     # Save the updated DataFrame
     updated_df.to_csv("data/final_processed.csv", index=False)
     print(f"Updated DataFrame saved. New column added: paper_with_code_data_count")
-    print(f"Final DataFrame length: {len(updated_df)}")
\ No newline at end of file
+    print(f"Final DataFrame length: {len(updated_df)}")
@@ -2,16 +2,23 @@ import pandas as pd
 import pickle 
 import csv
 import json
-import pmidcite
-from pmidcite.icite.downloader import get_downloader
 from typing import Dict, List, Any
+from src.pubmed.stats import compute_stats, counts_to_frame, stats_keys
 
 class PubMedAnalyzer:
     def __init__(self):
-        """Initialize the PubMed analyzer with citation downloader."""
-        print(f"pmidcite version: {pmidcite.__version__}")
-        self.dnldr = get_downloader()
+        """Initialize the PubMed analyzer; the citation downloader is created on first use."""
+        self._dnldr = None
         self.dataset_mapping = {}
+
+    @property
+    def dnldr(self):
+        if self._dnldr is None:
+            import pmidcite
+            from pmidcite.icite.downloader import get_downloader
+            print(f"pmidcite version: {pmidcite.__version__}")
+            self._dnldr = get_downloader()
+        return self._dnldr
     
     def get_citation_count(self, pmid: str) -> int:
         """Get citation count for a given PMID."""
@@ -76,39 +83,28 @@ class PubMedAnalyzer:
     
     def get_analysis(self, counts: Dict) -> Dict:
         """Generate analysis statistics from counts."""
-        stats = {
-            'total_files': len(counts),
-            'files_with_github': sum(1 for r in counts.values() if r['code'] > 0),
-            'files_without_github': sum(1 for r in counts.values() if r['code'] == 0),
-            'total_github_mentions': sum(r['code'] for r in counts.values()),
-            'files_with_public_dataset': sum(1 for r in counts.values() if r['big_datasets'] > 0),
-            'total_dataset_mentions': sum(r['big_datasets'] for r in counts.values()),
-            'files_with_github_and_dataset': sum(1 for r in counts.values() if r['code'] > 0 and r['big_datasets'] > 0),
-            'files_with_github_and_without_dataset': sum(1 for r in counts.values() if r['code'] > 0 and r['big_datasets'] == 0),
-            'files_with_AI': sum(1 for r in counts.values() if r['ai'] > 0),
-            'total_citations': sum(r['citation_count'] for r in counts.values() if r['citation_count'] is not None),
-        }
-        
-        for key in self.dataset_mapping.keys():
-            stats[f'files_with_{key}'] = sum(1 for r in counts.values() if r[key] > 0)
-            stats[f'total_{key}_mentions'] = sum(r[key] for r in counts.values())
-        
-        return stats
+        frame = counts_to_frame(counts, year="all")
+        return compute_stats(frame, self.dataset_mapping.keys(), years=["all"])["all"]
     
     def analyze_papers_across_years(self, dictionary: Dict, years: List[str]) -> tuple:
         """Analyze papers across multiple years."""
-        all_stats = {}
-        all_paper_data = {}
-        
-        for year in years:
-            papers = self.get_papers_year(dictionary, year)
-            counts_each_paper = self.get_counts_per_paper(papers)
-            analysis = self.get_analysis(counts_each_paper)
-            all_stats[year] = analysis 
-            all_paper_data[year] = counts_each_paper
+        wanted = set(years)
+        papers_by_year = {year: {} for year in years}
+        for pmid, record in dictionary.items():
+            if record["year"] in wanted:
+                papers_by_year[record["year"]][pmid] = record
 
-            print(f"Year: {year}, Papers: {len(papers)}")
-            print(analysis)
+        all_paper_data = {
+            year: self.get_counts_per_paper(papers)
+            for year, papers in papers_by_year.items()
+        }
+        frames = [counts_to_frame(counts, year) for year, counts in all_paper_data.items() if counts]
+        frame = pd.concat(frames) if frames else pd.DataFrame(columns=["year"])
+        all_stats = compute_stats(frame, self.dataset_mapping.keys(), years=years)
+
+        for year in years:
+            print(f"Year: {year}, Papers: {len(papers_by_year[year])}")
+            print(all_stats[year])
             
         return all_stats, all_paper_data
     
@@ -121,20 +117,7 @@ class PubMedAnalyzer:
             header = ['Statistic'] + list(all_stats.keys())
             writer.writerow(header)
             
-            stats_keys = [
-                'total_files', 
-                'files_with_github', 'files_without_github', 'total_github_mentions',
-                'files_with_public_dataset', 'total_dataset_mentions',
-                'files_with_github_and_dataset',
-                'files_with_github_and_without_dataset',
-                'files_with_AI',
-                'total_citations'
-            ]
-            
-            for key in dataset_mapping.keys():
-                stats_keys.extend([f'files_with_{key}', f'total_{key}_mentions'])
-            
-            for key in stats_keys:
+            for key in stats_keys(dataset_mapping.keys()):
                 row = [key.replace('_', ' ').title()]
                 for year in all_stats.keys():
                     row.append(all_stats[year].get(key, ''))
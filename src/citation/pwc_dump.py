@@ -0,0 +1,211 @@
+import gzip
+import json
+import os
+import pickle
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.citation.papers_with_code import STATUS_FOUND, STATUS_NO_DATASETS, STATUS_NO_MATCH
+from src.corpus.dedup import normalize_title
+
+TOKEN_RE = re.compile(r'\w+')
+# Bumped whenever the pickled index layout changes so cached indexes are rebuilt
+INDEX_VERSION = 2
+
+DUMP_FILES = {
+    'papers': 'papers-with-abstracts.json.gz',
+    'datasets': 'datasets.json.gz',
+    'links': 'links-between-papers-and-code.json.gz',
+    'evaluations': 'evaluation-tables.json.gz',
+}
+
+
+def _load_json(path: str):
+    """Load a (optionally gzipped) Papers with Code JSON dump"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    return (url or '').strip().rstrip('/')
+
+
+def dump_signature(dump_dir: str) -> Dict:
+    """Index version plus (size, mtime) of each dump file present, to detect a re-downloaded dump"""
+    signature = {'version': INDEX_VERSION}
+    for key, name in DUMP_FILES.items():
+        path = os.path.join(dump_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[key] = (stat.st_size, stat.st_mtime_ns)
+    return signature
+
+
+def _jaccard(tokens1: set, tokens2: set) -> float:
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2) if tokens1 or tokens2 else 0.0
+
+
+def _iter_evaluation_rows(tasks: Iterable[Dict]):
+    """Yield (dataset name, paper url) pairs from the nested evaluation tables dump"""
+    for task in tasks:
+        for dataset in task.get('datasets', []):
+            for row in dataset.get('sota', {}).get('rows', []):
+                yield dataset.get('dataset', ''), row.get('paper_url', '')
+        yield from _iter_evaluation_rows(task.get('subtasks', []))
+
+
+class PapersWithCodeDumpIndex:
+    """Offline title -> dataset count lookup built from the public Papers with Code dumps.
+
+    A title matches a dump paper with the same normalized title, or else the candidate
+    from the inverted index over title tokens with the highest token Jaccard similarity,
+    if that is at least ``min_jaccard``. The whole dump holds hundreds of thousands of
+    titles, so the live API's loose three-shared-words rule would match unrelated papers.
+    """
+
+    def __init__(self, max_candidates: int = 20, min_jaccard: float = 0.9, max_df_ratio: float = 0.05):
+        self.max_candidates = max_candidates
+        self.min_jaccard = min_jaccard
+        self.max_df_ratio = max_df_ratio
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.exact: Dict[str, int] = {}
+        self.source: Dict = {}
+        self.dataset_counts: Dict[str, int] = {}
+        self.repo_counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_dump_dir(cls, dump_dir: str, **kwargs) -> "PapersWithCodeDumpIndex":
+        """Build an index from a directory holding the downloaded dump files"""
+        paths = {
+            key: os.path.join(dump_dir, name) for key, name in DUMP_FILES.items()
+            if os.path.exists(os.path.join(dump_dir, name))
+        }
+        if 'papers' not in paths:
+            raise FileNotFoundError(f"Missing {DUMP_FILES['papers']} in {dump_dir}")
+
+        index = cls(**kwargs)
+        index.source = dump_signature(dump_dir)
+        index.add_papers(_load_json(paths['papers']))
+
+        dataset_pairs = []
+        if 'datasets' in paths:
+            for dataset in _load_json(paths['datasets']):
+                paper = dataset.get('paper') or {}
+                dataset_pairs.append((dataset.get('name', ''), paper.get('url', '')))
+        if 'evaluations' in paths:
+            dataset_pairs.extend(_iter_evaluation_rows(_load_json(paths['evaluations'])))
+        index.set_dataset_links(dataset_pairs)
+
+        if 'links' in paths:
+            index.set_repo_links(
+                (link.get('paper_url', ''), link.get('repo_url', ''))
+                for link in _load_json(paths['links'])
+            )
+        return index
+
+    def add_papers(self, papers: Iterable[Dict]) -> None:
+        """Add papers (dicts with 'title' and 'paper_url') to the title index"""
+        postings = defaultdict(list, self.postings)
+        for paper in papers:
+            title = paper.get('title') or ''
+            if not title:
+                continue
+            doc_id = len(self.titles)
+            self.titles.append(title)
+            self.urls.append(_normalize_url(paper.get('paper_url')))
+            self.exact.setdefault(normalize_title(title), doc_id)
+            for token in set(TOKEN_RE.findall(title.lower())):
+                postings[token].append(doc_id)
+        self.postings = dict(postings)
+
+    def set_dataset_links(self, pairs: Iterable) -> None:
+        """Count distinct datasets per paper url from (dataset name, paper url) pairs"""
+        datasets = defaultdict(set)
+        for name, url in pairs:
+            url = _normalize_url(url)
+            if name and url:
+                datasets[url].add(name)
+        self.dataset_counts = {url: len(names) for url, names in datasets.items()}
+
+    def set_repo_links(self, pairs: Iterable) -> None:
+        """Count distinct code repositories per paper url from (paper url, repo url) pairs"""
+        repos = defaultdict(set)
+        for url, repo in pairs:
+            url = _normalize_url(url)
+            if url and repo:
+                repos[url].add(repo)
+        self.repo_counts = {url: len(names) for url, names in repos.items()}
+
+    def match_title(self, search_title: str) -> Optional[str]:
+        """Return the paper url best matching ``search_title`` or None"""
+        doc_id = self.exact.get(normalize_title(search_title))
+        if doc_id is not None:
+            return self.urls[doc_id]
+
+        tokens = set(TOKEN_RE.findall(search_title.lower()))
+        max_df = max(1, int(len(self.titles) * self.max_df_ratio))
+
+        candidates = Counter()
+        for token in tokens:
+            docs = self.postings.get(token)
+            if docs and len(docs) <= max_df:
+                candidates.update(docs)
+
+        best_id, best_score = None, self.min_jaccard
+        for doc_id, _ in candidates.most_common(self.max_candidates):
+            score = _jaccard(tokens, set(TOKEN_RE.findall(self.titles[doc_id].lower())))
+            if score >= best_score and (best_id is None or score > best_score):
+                best_id, best_score = doc_id, score
+        return self.urls[best_id] if best_id is not None else None
+
+    def update_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add ``paper_with_code_data_count`` and ``paper_with_code_status`` (and repo
+        counts if loaded) to ``df``, with the same statuses as the API fetcher.
+        """
+        search_titles = df['cleaned_title'].where(
+            df['cleaned_title'].notna() & (df['cleaned_title'] != ''), df['title']
+        ).fillna('')
+
+        # Resolve each distinct title once, then join the counts over the whole frame
+        unique_titles = pd.Series(search_titles.unique())
+        unique_titles = unique_titles[unique_titles != '']
+        resolved = pd.Series(
+            [self.match_title(title) for title in unique_titles],
+            index=unique_titles.values, dtype=object
+        )
+        matched_urls = search_titles.map(resolved)
+
+        df['paper_with_code_data_count'] = (
+            matched_urls.map(self.dataset_counts).fillna(0).astype(int)
+        )
+        # The dump has no per-title failures, so STATUS_ERROR never occurs offline
+        df['paper_with_code_status'] = STATUS_NO_MATCH
+        df.loc[matched_urls.notna(), 'paper_with_code_status'] = STATUS_NO_DATASETS
+        df.loc[df['paper_with_code_data_count'] > 0, 'paper_with_code_status'] = STATUS_FOUND
+        if self.repo_counts:
+            df['paper_with_code_repo_count'] = (
+                matched_urls.map(self.repo_counts).fillna(0).astype(int)
+            )
+        print(f"Matched {matched_urls.notna().sum()}/{len(df)} titles against the local dump")
+        print(df['paper_with_code_status'].value_counts())
+        return df
+
+    def save(self, filename: str) -> None:
+        """Save the index to a pickle file"""
+        with open(filename, 'wb') as f:
+            pickle.dump(self.__dict__, f)
+
+    @classmethod
+    def load(cls, filename: str) -> "PapersWithCodeDumpIndex":
+        """Load an index saved with ``save``"""
+        index = cls()
+        with open(filename, 'rb') as f:
+            index.__dict__.update(pickle.load(f))
+        return index
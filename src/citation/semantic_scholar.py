@@ -5,6 +5,7 @@ import time
 import pandas as pd
 from typing import Dict, Optional, List
 import logging
+from src.pipeline.metrics import METRICS
 
 @dataclass
 class SemanticScholarConfig:
@@ -34,11 +35,14 @@ class SemanticScholarProcessor:
 
         for attempt in range(self.config.max_retries):
             try:
-                response = requests.get(
-                    self.config.base_url, 
-                    params=params, 
-                    headers=headers
-                )
+                with METRICS.timer("http.s2") as span:
+                    response = requests.get(
+                        self.config.base_url, 
+                        params=params, 
+                        headers=headers
+                    )
+                    span.add(bytes_in=len(response.content))
+                METRICS.count(f"http.s2.status_{response.status_code}")
                 response.raise_for_status()
                 results = response.json()
                 time.sleep(self.config.delay)
@@ -1,13 +1,31 @@
-import transformers
-import torch
-from transformers import BitsAndBytesConfig, pipeline, AutoTokenizer
 from src.conf_proc.pathing import ConferencePathManager
+from src.llm.sharding import ShardedRunner
+from functools import partial
+from typing import Dict, Optional
+from src.llm.decoding import AssistedDecoding, DecodingConfig, GREEDY
+import json
 import pandas as pd
 
+# Cleaned titles and emails mostly copy their input, the best case for prompt lookup
+DEFAULT_ASSIST = {
+    "title": AssistedDecoding(prompt_lookup_num_tokens=10),
+    "emails": AssistedDecoding(prompt_lookup_num_tokens=10),
+}
+
 class ConferencePaperCleaner:
-    def __init__(self, path_manager: ConferencePathManager, device="cuda:0"):
+    def __init__(self, path_manager: ConferencePathManager, device="cuda:0",
+                 assist: Optional[Dict[str, Optional[AssistedDecoding]]] = None,
+                 decoding: DecodingConfig = GREEDY):
         self.path_manager = path_manager
         self.device = device
+        self.decoding = decoding
+        # Per-task assisted decoding ("title", "emails"); a task mapped to None decodes with ``decoding`` unassisted.
+        # Assisted generation decodes greedily, so the default only applies to greedy runs
+        if assist is None:
+            assist = DEFAULT_ASSIST if decoding.strategy == "greedy" else {}
+        elif decoding.strategy != "greedy" and any(a is not None for a in assist.values()):
+            raise ValueError("Assisted generation is only used with greedy decoding")
+        self.assist = assist
         self.title_cleaning_prompt = """
         You are an assistant specialized in cleaning and standardizing academic paper titles. Your task is to take a given title and improve its formatting, spacing, and consistency. Follow these rules:
 
@@ -47,17 +65,33 @@ class ConferencePaperCleaner:
 
         Cleaned title:
         """
-        self.model = self._load_70b_model()
+        # Loaded on first LLM call, so runs fully covered by a structured header backend skip it
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._load_70b_model()
+        return self._model
 
     def _load_70b_model(self):
         # Import your load_70b_model function or implement it here
         from src.llm.llm import load_70b_model
-        return load_70b_model(self.device)
+        return load_70b_model(self.device, self.decoding)
 
-    def _generate_text_with_icl(self, prompt, examples, max_new_tokens=256, temperature=0.00001, top_p=0.99):
+    def _generate_text_with_icl(self, prompt, examples, max_new_tokens=256, task=None):
         # Import your generate_text_with_icl function or implement it here
         from src.llm.llm import generate_text_with_icl
-        return generate_text_with_icl(prompt, self.model, examples, max_new_tokens, temperature, top_p)
+        return generate_text_with_icl(prompt, self.model, examples, max_new_tokens,
+                                      decoding=self.decoding, assist=self.assist.get(task))
+
+    def decoding_record(self):
+        """Decoding parameters per LLM task, saved with the cleaned rows"""
+        record = {}
+        for task in ("title", "emails"):
+            assist = self.assist.get(task)
+            record[task] = {**self.decoding.as_record(), **({"assist": assist.as_record()} if assist else {})}
+        return json.dumps(record, sort_keys=True)
 
     def extract_and_clean_emails(self, text):
         prompt = f"""
@@ -69,10 +103,24 @@ class ConferencePaperCleaner:
         
         Cleaned and extracted email addresses:
         """
-        return self._generate_text_with_icl(prompt, [{"input": text, "output": ""}])
+        return self._generate_text_with_icl(prompt, [{"input": text, "output": ""}], task="emails")
+
+    @staticmethod
+    def structured_rows(df: pd.DataFrame):
+        """Rows whose header came from a structured backend rather than NER heuristics"""
+        if 'header_source' not in df.columns:
+            return pd.Series(False, index=df.index)
+        return df['header_source'].fillna('heuristic') != 'heuristic'
 
     def process_dataframe_emails(self, df: pd.DataFrame, text_column: str):
-        processed_emails = df[text_column].apply(lambda x: self.extract_and_clean_emails(x))
+        structured = self.structured_rows(df)
+        processed_emails = pd.Series('', index=df.index, dtype=object)
+        if structured.any():
+            # Emails are already parsed out of the header; one per line like the LLM output
+            processed_emails[structured] = df.loc[structured, 'emails'].fillna('').str.replace(', ', '\n')
+        processed_emails[~structured] = df.loc[~structured, text_column].apply(
+            lambda x: self.extract_and_clean_emails(x)
+        )
         
         new_df = df.copy()
         new_df['processed_emails'] = processed_emails
@@ -86,9 +134,12 @@ class ConferencePaperCleaner:
 
     def clean_titles(self, df: pd.DataFrame):
         cleaned_titles = []
-        for title in df["title"]:
+        for title, structured in zip(df["title"], self.structured_rows(df)):
+            if structured:
+                cleaned_titles.append(title)
+                continue
             formatted_prompt = self.title_cleaning_prompt.format(title=title)
-            cleaned_title = self._generate_text_with_icl(formatted_prompt, [{"input": formatted_prompt, "output": ""}])
+            cleaned_title = self._generate_text_with_icl(formatted_prompt, [{"input": formatted_prompt, "output": ""}], task="title")
             print(cleaned_title)
             cleaned_titles.append(cleaned_title)
         return cleaned_titles
@@ -106,8 +157,20 @@ class ConferencePaperCleaner:
         
         return new_df
 
-    def clean_conference_papers(self, conference: str):
-        """Clean conference papers with simple debug mode"""
+    def clean_frame(self, df: pd.DataFrame):
+        """Clean titles and extract emails for a frame of processed papers"""
+        cleaned_df = self.process_dataframe_titles(df)
+        cleaned_df = self.process_dataframe_emails(cleaned_df, "authors")
+        cleaned_df['decoding'] = self.decoding_record()
+        return cleaned_df
+
+    def clean_conference_papers(self, conference: str, runner: Optional[ShardedRunner] = None):
+        """
+        Clean conference papers with simple debug mode.
+
+        With a ShardedRunner, rows are split into contiguous shards cleaned by one
+        model replica each, and the cleaned shards are concatenated in order.
+        """
         conf = self.path_manager.get_conference_config(conference)
         
         # Read input file
@@ -127,8 +190,11 @@ class ConferencePaperCleaner:
         
         # Process papers
         print(f"Cleaning {len(df)} papers...")
-        cleaned_df = self.process_dataframe_titles(df)
-        cleaned_df = self.process_dataframe_emails(cleaned_df, "authors")
+        if runner is None:
+            cleaned_df = self.clean_frame(df)
+        else:
+            shards = runner.map(partial(clean_shard, path_manager=self.path_manager, assist=self.assist, decoding=self.decoding), df)
+            cleaned_df = pd.concat(shards)
         
         # Save results
         output_file = self.path_manager.get_output_filename(
@@ -139,3 +205,11 @@ class ConferencePaperCleaner:
         cleaned_df.to_csv(output_file, index=False)
         print(f"Wrote cleaned data to {output_file}")
 
+
+def clean_shard(llm_pipeline, shard: pd.DataFrame, shard_index: int, path_manager: ConferencePathManager,
+                assist: Optional[Dict[str, Optional[AssistedDecoding]]] = None,
+                decoding: DecodingConfig = GREEDY):
+    """ShardedRunner task: clean one shard with this worker's model replica"""
+    cleaner = ConferencePaperCleaner(path_manager, assist=assist, decoding=decoding)
+    cleaner._model = llm_pipeline
+    return cleaner.clean_frame(shard)
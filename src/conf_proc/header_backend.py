@@ -0,0 +1,199 @@
+import abc
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+from xml.sax.saxutils import escape
+
+import requests
+
+TEI_NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+
+def empty_header(source: str) -> Dict:
+    return {'title': '', 'authors': [], 'emails': [], 'abstract': '', 'source': source}
+
+
+class HeaderBackend(abc.ABC):
+    """Interface for extracting a paper header (title, authors, emails, abstract) from a PDF"""
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def extract(self, pdf_path) -> Optional[Dict]:
+        """Structured header of one PDF, None if it could not be extracted"""
+
+    def extract_batch(self, pdf_paths: List) -> List[Optional[Dict]]:
+        """Headers for several PDFs, in the same order"""
+        return [self.extract(pdf_path) for pdf_path in pdf_paths]
+
+
+def _text(element) -> str:
+    if element is None:
+        return ''
+    return WHITESPACE_RUN_RE.sub(' ', ''.join(element.itertext())).strip()
+
+
+def parse_tei_header(tei_xml: str, source: str = "grobid") -> Dict:
+    """Parse a GROBID processHeaderDocument TEI response into a header dict"""
+    root = ET.fromstring(tei_xml)
+    header = empty_header(source)
+    header['title'] = _text(root.find('.//tei:titleStmt/tei:title', TEI_NS))
+
+    for author in root.findall('.//tei:sourceDesc//tei:analytic/tei:author', TEI_NS):
+        pers_name = author.find('tei:persName', TEI_NS)
+        if pers_name is not None:
+            parts = [_text(name) for name in pers_name.findall('tei:forename', TEI_NS)]
+            parts.append(_text(pers_name.find('tei:surname', TEI_NS)))
+            name = ' '.join(part for part in parts if part)
+            if name:
+                header['authors'].append(name)
+        email = _text(author.find('tei:email', TEI_NS))
+        if email:
+            header['emails'].append(email)
+
+    header['abstract'] = _text(root.find('.//tei:profileDesc/tei:abstract', TEI_NS))
+    return header
+
+
+class GrobidHeaderBackend(HeaderBackend):
+    """
+    Client for a locally run GROBID-compatible service.
+
+    PDFs are posted to ``/api/processHeaderDocument`` concurrently over a pooled
+    session; a PDF that fails returns None so the caller can fall back per paper.
+    """
+    name = "grobid"
+
+    def __init__(self, url: str = "http://localhost:8070", max_workers: int = 4, timeout: float = 60):
+        self.url = url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def is_available(self) -> bool:
+        try:
+            response = self.session.get(f"{self.url}/api/isalive", timeout=5)
+            return response.ok
+        except requests.RequestException:
+            return False
+
+    def extract(self, pdf_path) -> Optional[Dict]:
+        pdf_path = Path(pdf_path)
+        try:
+            with open(pdf_path, 'rb') as f:
+                response = self.session.post(
+                    f"{self.url}/api/processHeaderDocument",
+                    files={'input': (pdf_path.name, f, 'application/pdf')},
+                    data={'consolidateHeader': '0'},
+                    headers={'Accept': 'application/xml'},
+                    timeout=self.timeout,
+                )
+            response.raise_for_status()
+            return parse_tei_header(response.text, self.name)
+        except (OSError, requests.RequestException, ET.ParseError) as e:
+            print(f"Header extraction failed for {pdf_path.name}: {e}")
+            return None
+
+    def extract_batch(self, pdf_paths: List) -> List[Optional[Dict]]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.extract, pdf_paths))
+
+
+def build_tei_header(header: Dict) -> str:
+    """Render a header dict as a minimal GROBID-style TEI document"""
+    authors = []
+    for i, name in enumerate(header.get('authors', [])):
+        forename, _, surname = name.rpartition(' ')
+        email = header.get('emails', [])[i] if i < len(header.get('emails', [])) else ''
+        authors.append(
+            '<author><persName>'
+            f'<forename type="first">{escape(forename)}</forename><surname>{escape(surname)}</surname>'
+            '</persName>'
+            + (f'<email>{escape(email)}</email>' if email else '')
+            + '</author>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader>'
+        f'<fileDesc><titleStmt><title level="a" type="main">{escape(header.get("title", ""))}</title></titleStmt>'
+        f'<sourceDesc><biblStruct><analytic>{"".join(authors)}</analytic></biblStruct></sourceDesc></fileDesc>'
+        f'<profileDesc><abstract><p>{escape(header.get("abstract", ""))}</p></abstract></profileDesc>'
+        '</teiHeader></TEI>'
+    )
+
+
+class GrobidStubServer:
+    """
+    In-process stand-in for a GROBID service, for exercising GrobidHeaderBackend.
+
+    ``responder`` maps (filename, pdf_bytes) to a header dict, or to a string
+    served verbatim as the TEI body; by default the filename stem is returned as
+    the title.
+    """
+
+    def __init__(self, responder: Optional[Callable[[str, bytes], Union[Dict, str]]] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.responder = responder or (lambda filename, data: {'title': Path(filename).stem})
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/api/isalive':
+                    self._reply(200, 'true', 'text/plain')
+                else:
+                    self._reply(404, '', 'text/plain')
+
+            def do_POST(self):
+                if self.path != '/api/processHeaderDocument':
+                    return self._reply(404, '', 'text/plain')
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests += 1
+                match = re.search(rb'name="input"; filename="([^"]*)"', body)
+                filename = match.group(1).decode('utf-8', 'replace') if match else ''
+                reply = stub.responder(filename, body)
+                tei = reply if isinstance(reply, str) else build_tei_header(reply)
+                self._reply(200, tei, 'application/xml')
+
+            def _reply(self, status, text, content_type):
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GrobidStubServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -2,17 +2,64 @@ import os
 import PyPDF2
 import json
 import re
-import spacy
 import csv
+import multiprocessing
 from src.conf_proc.pathing import ConferencePathManager
+from src.conf_proc.header_backend import HeaderBackend
+from src.corpus.inverted_index import InvertedIndex
+from src.pipeline.metrics import METRICS
+from typing import Optional
 from collections import defaultdict, Counter
 
+# Conference and proceedings strings stripped from whitespace-free title headers
+CONFERENCE_HEADERS = [
+    'MachineLearningforHealthcare', 'MachineLearningforHealth', 'ML4H',
+    'ClinicalAbstract,Software,andDemoTrack', 'ConferenceonHealth,Inference,andLearning',
+    'CHIL', 'MLHC', 'NeurIPS', 'MachineLearningforHealthcare',
+    'ProceedingsofMachineLearningResearch', 
+    '1–26,2 0 1 8 M a c h i n eL e r gf o rH l t',
+    'M a c h i n eL e r gf o rH l t '
+]
+
+# Every PDF worker loads its own en_core_web_trf model, so memory grows with the
+# worker count; a few workers already keep the parser busy
+DEFAULT_PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+
 class PDFContentProcessor:
-    def __init__(self, path_manager: ConferencePathManager):
+    # Patterns are compiled once at class load and shared by every PDF
+    REFERENCES_RE = re.compile(r'\n(References|Bibliography|Works Cited|Literature Cited)', re.IGNORECASE)
+    WHITESPACE_RE = re.compile(r'\s')
+    WHITESPACE_RUN_RE = re.compile(r'\s+')
+    PROCEEDINGS_RE = re.compile(r'Proceedingsof.*?20\d{2}', re.IGNORECASE)
+    # Removed one name at a time in list order, "<name> ... <year>" before the bare name.
+    # A single alternation would let a short name like "CHIL" match inside "Childhood"
+    # first and swallow the rest of the title up to the year.
+    # Titles are matched with whitespace removed, so a name must start and end on a
+    # camel-case word boundary: "CHIL" matches "(CHIL)" or "CHILDataset", not "Childhood"
+    CONFERENCE_RES = [
+        (re.compile(rf'(?-i:(?<![A-Z])){re.escape(conf)}(?-i:(?![a-z])).*?20\d{{2}}', re.IGNORECASE),
+         re.compile(rf'(?-i:(?<![A-Z])){re.escape(conf)}(?-i:(?![a-z]))', re.IGNORECASE))
+        for conf in CONFERENCE_HEADERS
+    ]
+    WORKSHOP_RE = re.compile(r'Workshop', re.IGNORECASE)
+    YEAR_RE = re.compile(r'20\d{2}')
+    PAGE_RANGE_RE = re.compile(r'\d+[-–]\d+,?20\d{2}')
+    EDGE_NOISE_RE = re.compile(r'^[\d\W]+|[\d\W]+$')
+    CAMEL_SPLIT_RE = re.compile(r'(?<!^)(?=[A-Z])')
+    LEADING_NON_ALPHA_RE = re.compile(r'^[^a-zA-Z]+')
+    ABSTRACT_RE = re.compile(r'\bABSTRACT\b', re.IGNORECASE)
+    INTRODUCTION_RE = re.compile(r'\b(1\s*\.?\s*)?INTRODUCTION\b', re.IGNORECASE)
+
+    def __init__(self, path_manager: ConferencePathManager, header_backend: Optional[HeaderBackend] = None,
+                 build_index: bool = False):
         self.path_manager = path_manager
-        # ... rest of initialization
-        # Load the transformer-based model
-        self.nlp = spacy.load("en_core_web_trf")
+        # Optional structured header extractor (e.g. GROBID); NER heuristics are the fallback
+        self.header_backend = header_backend
+        # Opt-in inverted index over extracted PDF text for ad-hoc phrase queries, saved per conference
+        self.build_index = build_index
+        # The transformer-based NER model is loaded on first use (once per worker process)
+        self._nlp = None
         
         # Initialize dataset terms
         self.dataset_terms = [
@@ -42,6 +89,14 @@ class PDFContentProcessor:
                     "mlhc/2021pdf", "mlhc/2022pdf", "mlhc/2023pdf"]
         }
 
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            import spacy
+            with METRICS.timer("ner.load"):
+                self._nlp = spacy.load("en_core_web_trf")
+        return self._nlp
+
     def _create_dataset_mapping(self):
         """Create mapping of dataset terms"""
         mapping = {}
@@ -53,64 +108,67 @@ class PDFContentProcessor:
     def extract_pdf_content(self, filename):
         """Extract content from PDF file up to references section"""
         try:
-            with open(filename, 'rb') as f:
+            with open(filename, 'rb') as f, METRICS.timer("pdf.extract") as span:
+                span.add(bytes_in=os.fstat(f.fileno()).st_size)
                 pdf_reader = PyPDF2.PdfReader(f)
-                text = ""
+                pages = []
                 for page in pdf_reader.pages:
                     page_text = page.extract_text()
-                    text += page_text
-                    
-                    if re.search(r'\n(References|Bibliography|Works Cited|Literature Cited)', 
-                               page_text, re.IGNORECASE):
-                        split_text = re.split(r'\n(References|Bibliography|Works Cited|Literature Cited)', 
-                                           text, maxsplit=1, flags=re.IGNORECASE)
-                        text = split_text[0]
+                    # Only the new page is searched; earlier pages had no references header
+                    cutoff = self.find_references_cutoff(page_text)
+                    if cutoff is not None:
+                        pages.append(page_text[:cutoff])
                         break
+                    pages.append(page_text)
+                text = "".join(pages)
+                span.add(bytes_out=len(text))
             return text
         except Exception as e:
             print(f"Error extracting content from {filename}: {str(e)}")
             return None
 
+    @classmethod
+    def find_references_cutoff(cls, page_text):
+        """Offset of the references/bibliography header in a page, None if absent"""
+        match = cls.REFERENCES_RE.search(page_text)
+        return match.start() if match else None
+
     def is_likely_name(self, text):
         """Check if text likely contains a person's name"""
-        doc = self.nlp(text)
+        with METRICS.timer("ner.line"):
+            doc = self.nlp(text)
         return any(ent.label_ == "PERSON" for ent in doc.ents)
 
-    def clean_title(self, title):
+    @classmethod
+    def clean_title(cls, title):
         """Clean and standardize paper title"""
         # Remove all spaces
-        title = re.sub(r'\s', '', title)
+        title = cls.WHITESPACE_RE.sub('', title)
         
         # Remove proceedings information
-        title = re.sub(r'Proceedingsof.*?20\d{2}', '', title, flags=re.IGNORECASE)
+        title = cls.PROCEEDINGS_RE.sub('', title)
         
         # Remove conference names and years
-        conferences = [
-            'MachineLearningforHealthcare', 'MachineLearningforHealth', 'ML4H',
-            'ClinicalAbstract,Software,andDemoTrack', 'ConferenceonHealth,Inference,andLearning',
-            'CHIL', 'MLHC', 'NeurIPS', 'MachineLearningforHealthcare',
-            'ProceedingsofMachineLearningResearch', 
-            '1–26,2 0 1 8 M a c h i n eL e r gf o rH l t',
-            'M a c h i n eL e r gf o rH l t '
-        ]
-        
-        for conf in conferences:
-            title = re.sub(rf'{conf}.*?20\d{{2}}', '', title, flags=re.IGNORECASE)
-            title = re.sub(rf'{conf}', '', title, flags=re.IGNORECASE)
+        for with_year_re, name_re in cls.CONFERENCE_RES:
+            title = with_year_re.sub('', title)
+            title = name_re.sub('', title)
         
         # Additional cleaning steps
-        title = re.sub(r'Workshop', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'20\d{2}', '', title)
-        title = re.sub(r'\d+[-–]\d+,?20\d{2}', '', title)
-        title = re.sub(r'^[\d\W]+|[\d\W]+$', '', title)
-        title = re.sub(r'(?<!^)(?=[A-Z])', ' ', title)
+        title = cls.WORKSHOP_RE.sub('', title)
+        title = cls.YEAR_RE.sub('', title)
+        title = cls.PAGE_RANGE_RE.sub('', title)
+        title = cls.EDGE_NOISE_RE.sub('', title)
+        title = cls.CAMEL_SPLIT_RE.sub(' ', title)
         
         # Remove duplicate words
-        words = title.split()
-        title = ' '.join(word for i, word in enumerate(words) 
-                        if word.lower() not in [w.lower() for w in words[:i]])
+        seen = set()
+        words = []
+        for word in title.split():
+            if word.lower() not in seen:
+                seen.add(word.lower())
+                words.append(word)
         
-        return title.strip()
+        return ' '.join(words).strip()
 
     def extract_title(self, lines):
         """Extract paper title from text lines"""
@@ -124,8 +182,8 @@ class PDFContentProcessor:
             title_lines.append(line)
 
         title = ' '.join(title_lines)
-        title = re.sub(r'\s+', ' ', title).strip()
-        title = re.sub(r'^[^a-zA-Z]+', '', title)
+        title = self.WHITESPACE_RUN_RE.sub(' ', title).strip()
+        title = self.LEADING_NON_ALPHA_RE.sub('', title)
         return self.clean_title(title)
 
     def extract_authors(self, lines):
@@ -149,19 +207,18 @@ class PDFContentProcessor:
 
     def extract_abstract(self, text):
         """Extract abstract from paper text"""
-        abstract_start = re.search(r'\bABSTRACT\b', text, re.IGNORECASE)
+        abstract_start = self.ABSTRACT_RE.search(text)
         if not abstract_start:
             return ""
         
-        intro_start = re.search(r'\b(1\s*\.?\s*)?INTRODUCTION\b', 
-                              text[abstract_start.end():], re.IGNORECASE)
+        intro_start = self.INTRODUCTION_RE.search(text, abstract_start.end())
         
         if intro_start:
-            abstract = text[abstract_start.end():abstract_start.end() + intro_start.start()]
+            abstract = text[abstract_start.end():intro_start.start()]
         else:
             abstract = text[abstract_start.end():abstract_start.end() + 2000]
         
-        return re.sub(r'\s+', ' ', abstract).strip()
+        return self.WHITESPACE_RUN_RE.sub(' ', abstract).strip()
 
     def count_mentions(self, text, terms):
         """Count mentions of terms in text"""
@@ -171,17 +228,31 @@ class PDFContentProcessor:
         return sum(1 for term in terms if term.lower() in text)
 
 
-    def process_pdf(self, content):
+    def process_pdf(self, content, header=None):
         """Process PDF content and extract relevant information"""
-        lines = content.split('\n')
-        title = self.extract_title(lines)
-        authors = self.extract_authors(lines)
-        abstract = self.extract_abstract(content)
+        if header and header.get('title'):
+            # A structured header replaces the spaCy line heuristics entirely
+            title = header['title']
+            authors = header['authors']
+            abstract = header['abstract'] or self.extract_abstract(content)
+            emails = header['emails']
+            source = header['source']
+        else:
+            lines = content.split('\n')
+            with METRICS.timer("ner.header"):
+                title = self.extract_title(lines)
+                authors = self.extract_authors(lines)
+            abstract = self.extract_abstract(content)
+            emails = []
+            source = 'heuristic'
         
+        METRICS.count(f"pdf.header.{source}")
         result = {
             'title': title,
             'authors': authors,
             'abstract': abstract,
+            'emails': emails,
+            'header_source': source,
             'code_count': self.count_mentions(content, ['github', "gitlab", "zenodo", "colab"]),
             'gitlab_count': self.count_mentions(content, ['gitlab']),
             'zenodo_count': self.count_mentions(content, ['Zenodo']),
@@ -209,43 +280,104 @@ class PDFContentProcessor:
                     print(f"Processed {filename}")
         return results
 
-    def process_conference(self, conference: str):
-        """Process conference papers with simple debug mode"""
+    def process_pdf_file(self, pdf_file, year, header=None):
+        """Extract and process a single PDF, returning its result or None"""
+        return self.process_pdf_file_with_content(pdf_file, year, header)[0]
+
+    def process_pdf_file_with_content(self, pdf_file, year, header=None):
+        """Like ``process_pdf_file`` but also returns the extracted text: (result, content) or (None, None)"""
+        content = self.extract_pdf_content(pdf_file)
+        if not content:
+            return None, None
+        result = self.process_pdf(content, header)
+        result['year'] = year
+        result['filename'] = pdf_file.name
+        return result, content
+
+    def index_path(self, conference: str, output_file):
         conf = self.path_manager.get_conference_config(conference)
-        years = conf.get_years(self.path_manager.debug)
-        
-        all_results = []
-        for year in years:
+        return output_file.with_name(f"{conf.folder_prefix}_inverted_index.pkl")
+
+    def list_conference_pdfs(self, conference: str):
+        """List (pdf_file, year, header) tasks to process for a conference"""
+        conf = self.path_manager.get_conference_config(conference)
+        tasks = []
+        for year in conf.get_years(self.path_manager.debug):
             paths = self.path_manager.get_paths(conference, year)
-            print(f"\nProcessing {conference} papers from {year}")
             
             # Get list of PDFs and limit if in debug mode
             pdf_files = list(paths['year_pdfs'].glob('*.pdf'))
             if self.path_manager.debug:
                 pdf_files = pdf_files[:5]
-                print(f"Debug mode: Processing first {len(pdf_files)} papers")
-                
-            for pdf_file in pdf_files:
-                content = self.extract_pdf_content(pdf_file)
-                if content:
-                    result = self.process_pdf(content)
-                    result['year'] = year
-                    result['filename'] = pdf_file.name
-                    all_results.append(result)
-                    print(f"Processed {pdf_file.name}")
+                print(f"Debug mode: Processing first {len(pdf_files)} papers from {year}")
+            tasks.extend((pdf_file, year, None) for pdf_file in pdf_files)
+        return tasks
+
+    def attach_headers(self, tasks):
+        """Batch-extract headers with the configured backend, if it is reachable"""
+        if self.header_backend is None:
+            return tasks
+        if not self.header_backend.is_available():
+            print(f"Header backend '{self.header_backend.name}' unavailable; using NER heuristics")
+            return tasks
+        headers = self.header_backend.extract_batch([pdf_file for pdf_file, _, _ in tasks])
+        found = sum(1 for header in headers if header and header.get('title'))
+        print(f"Header backend '{self.header_backend.name}' parsed {found}/{len(tasks)} papers")
+        return [(pdf_file, year, header) for (pdf_file, year, _), header in zip(tasks, headers)]
+
+    def process_conference(self, conference: str, workers: int = 1):
+        """
+        Process conference papers with simple debug mode.
+
+        With ``workers > 1`` the PDFs are sharded over a process pool; each worker loads
+        its own CPU spaCy model once and processes PDFs end-to-end. Results stream
+        back in the original order straight into the CSV writer.
+        """
+        conf = self.path_manager.get_conference_config(conference)
         
-        # Save results
+        tasks = self.attach_headers(self.list_conference_pdfs(conference))
+        print(f"\nProcessing {len(tasks)} {conference} papers with {workers} worker(s)")
+
         output_file = self.path_manager.get_output_filename(
             conference,
             year=conf.debug_year if self.path_manager.debug else None,
             stage='processed'
         )
-        self.write_to_csv(all_results, output_file)
-        print(f"Wrote {len(all_results)} results to {output_file}")
+
+        index = InvertedIndex.load_or_create(str(self.index_path(conference, output_file))) if self.build_index else None
+
+        def stream(outputs):
+            for result, content in outputs:
+                if result is None:
+                    continue
+                if index is not None:
+                    index.add_document(f"{conference}/{result['year']}/{result['filename']}", content)
+                print(f"Processed {result['filename']}")
+                yield result
+
+        # Save results
+        if workers > 1:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(
+                workers,
+                initializer=_init_worker,
+                initargs=(self.path_manager, self.build_index)
+            ) as pool:
+                outputs = _merge_worker_metrics(pool.imap(_process_pdf_task, tasks, chunksize=4))
+                written = self.write_to_csv(stream(outputs), output_file)
+        else:
+            outputs = (self.process_pdf_file_with_content(*task) for task in tasks)
+            written = self.write_to_csv(stream(outputs), output_file)
+        print(f"Wrote {written} results to {output_file}")
+
+        if index is not None:
+            index_file = self.index_path(conference, output_file)
+            index.save(str(index_file))
+            print(f"Saved inverted index over {len(index)} papers to {index_file}")
                         
     def write_to_csv(self, results, filename):
-        """Write extracted information to CSV file"""
-        fieldnames = ['year', 'title', 'authors', 'abstract', 'code_count', 
+        """Write extracted information to CSV file, returning the number of rows written"""
+        fieldnames = ['year', 'title', 'authors', 'emails', 'header_source', 'abstract', 'code_count', 
                      'gitlab_count', 'zenodo_count', 'dataset_count']
         fieldnames.extend([f"{key}_count" for key in self.dataset_mapping])
         
@@ -256,12 +388,15 @@ class PDFContentProcessor:
                                   quoting=csv.QUOTE_ALL, escapechar='\\')
             writer.writeheader()
             
+            written = 0
             for result in results:
                 try:
                     row = {
                         'year': result['year'],
                         'title': result['title'],
                         'authors': ', '.join(result['authors']),
+                        'emails': ', '.join(result['emails']),
+                        'header_source': result['header_source'],
                         'abstract': result['abstract'],
                         'code_count': result['code_count'],
                         'gitlab_count': result['gitlab_count'],
@@ -277,8 +412,43 @@ class PDFContentProcessor:
                         if isinstance(value, str):
                             row[key] = value.replace('\n', ' ').replace('\r', '')
                     
-                    writer.writerow(row)
+                    with METRICS.timer("csv.write"):
+                        writer.writerow(row)
+                    written += 1
                 except Exception as e:
                     print(f"Error writing row: {e}")
                     print(f"Problematic row: {result}")
-                    continue
\ No newline at end of file
+                    continue
+        return written
+
+
+# Per-worker processor used by PDFContentProcessor.process_conference(workers > 1)
+_WORKER = None
+_WORKER_RETURNS_CONTENT = False
+
+
+def _init_worker(path_manager: ConferencePathManager, return_content: bool = False):
+    """Pool initializer: build one processor and load its CPU spaCy model once per process"""
+    global _WORKER, _WORKER_RETURNS_CONTENT
+    _WORKER_RETURNS_CONTENT = return_content
+    import spacy
+    import torch
+    # Workers already run in parallel; intra-op threads per worker would oversubscribe the cores
+    torch.set_num_threads(1)
+    spacy.require_cpu()
+    _WORKER = PDFContentProcessor(path_manager)
+    _WORKER.nlp
+
+
+def _process_pdf_task(task):
+    result, content = _WORKER.process_pdf_file_with_content(*task)
+    # The full text only travels back to the parent when it is being indexed;
+    # this worker's timings ride along and are merged into the parent's registry
+    return result, content if _WORKER_RETURNS_CONTENT else None, METRICS.collect()
+
+
+def _merge_worker_metrics(outputs):
+    """Fold each task's worker timings into this process's registry, yielding (result, content)"""
+    for result, content, worker_metrics in outputs:
+        METRICS.merge(worker_metrics)
+        yield result, content
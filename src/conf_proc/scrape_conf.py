@@ -7,6 +7,7 @@ import time
 import random
 import os
 from src.conf_proc.pathing import ConferencePathManager
+from src.pipeline.metrics import METRICS
 
 # Modified main classes to use the path manager
 class ConferenceDownloader:
@@ -53,7 +54,10 @@ class ConferenceDownloader:
         all_filename = os.path.join(all_folder, filename)
 
         for attempt in range(max_retries):
-            response = self.session.get(pdf_url)
+            with METRICS.timer("http.pdf_download") as span:
+                response = self.session.get(pdf_url)
+                span.add(bytes_in=len(response.content))
+            METRICS.count(f"http.pdf_download.status_{response.status_code}")
             if response.status_code == 200:
                 # Save in year-specific folder
                 with open(year_filename, 'wb') as f:
@@ -0,0 +1,169 @@
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.corpus.inverted_index import tokenize
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+# Mersenne prime 2^31 - 1 keeps a * h + b inside uint64
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Accent-, case- and punctuation-insensitive form of a title for exact matching"""
+    if not isinstance(title, str):
+        return ''
+    title = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_RE.sub(' ', title.lower()).strip()
+
+
+def shingles(text: Optional[str], k: int = 3) -> set:
+    """Word k-gram shingles; texts shorter than k words fall back to their tokens"""
+    tokens = tokenize(text)
+    if len(tokens) < k:
+        return set(tokens)
+    return {' '.join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures over shingle sets with ``num_perm`` universal hash functions"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Iterable[str]) -> Optional[np.ndarray]:
+        hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64)
+        if not len(hashes):
+            return None
+        hashes %= MERSENNE_PRIME
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures.
+
+    Documents sharing any band bucket become candidates; only candidates whose
+    signatures agree on at least ``threshold`` of the hashes (the estimated
+    Jaccard similarity) are reported, so each lookup is close to constant time.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(bands)]
+        self.signatures: Dict[int, np.ndarray] = {}
+
+    def query_insert(self, doc: int, signature: np.ndarray) -> List[int]:
+        """Insert a document and return the earlier documents it near-duplicates"""
+        candidates = set()
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = self.buckets[band][key]
+            candidates.update(bucket)
+            bucket.append(doc)
+        self.signatures[doc] = signature
+        return [
+            other for other in candidates
+            if np.mean(self.signatures[other] == signature) >= self.threshold
+        ]
+
+
+class UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> None:
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def find_duplicate_clusters(titles: List[str], abstracts: List[str], threshold: float = 0.8,
+                            num_perm: int = 64, bands: int = 16) -> np.ndarray:
+    """
+    Cluster label per record: records with the same normalized title, or whose
+    title + abstract shingles are estimated to be at least ``threshold`` Jaccard
+    similar, share a label (the index of the cluster's first record).
+    """
+    n = len(titles)
+    clusters = UnionFind(n)
+
+    first_by_title = {}
+    for i, title in enumerate(titles):
+        key = normalize_title(title)
+        if key:
+            clusters.union(first_by_title.setdefault(key, i), i)
+
+    hasher = MinHasher(num_perm)
+    lsh = LSHIndex(num_perm, bands, threshold)
+    for i, (title, abstract) in enumerate(zip(titles, abstracts)):
+        signature = hasher.signature(shingles(f"{title or ''} {abstract or ''}"))
+        if signature is None:
+            continue
+        for other in lsh.query_insert(i, signature):
+            clusters.union(other, i)
+
+    return np.array([clusters.find(i) for i in range(n)], dtype=np.int64)
+
+
+def deduplicate(df: pd.DataFrame, title_column: str = 'title', abstract_column: str = 'abstract',
+                threshold: float = 0.8, cleaned_title_column: str = 'cleaned_title') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Collapse near-duplicate papers to one canonical row per cluster.
+
+    Titles are matched on ``cleaned_title_column`` where it is filled in, since raw
+    conference titles extracted from PDFs still carry headers and author names.
+    The canonical row is the most cited, then the one with the longest abstract.
+    Returns the deduplicated frame (with ``dedup_cluster`` and ``duplicate_venues``
+    columns) and a frame listing every member of multi-record clusters.
+    """
+    titles = df[title_column].fillna('').astype(str)
+    if cleaned_title_column in df:
+        cleaned = df[cleaned_title_column].fillna('').astype(str)
+        titles = cleaned.where(cleaned.str.strip() != '', titles)
+    titles = titles.tolist()
+    abstracts = df[abstract_column].fillna('').astype(str).tolist()
+    labels = find_duplicate_clusters(titles, abstracts, threshold)
+
+    frame = df.reset_index(drop=True).assign(dedup_cluster=labels)
+    ranking = pd.DataFrame({
+        'cluster': labels,
+        'citations': pd.to_numeric(frame.get('citation_count', 0), errors='coerce'),
+        'abstract_length': [len(abstract) for abstract in abstracts],
+    }).fillna({'citations': 0})
+    canonical = ranking.sort_values(['citations', 'abstract_length'], ascending=False, kind='stable') \
+        .drop_duplicates('cluster').index.sort_values()
+
+    sizes = frame['dedup_cluster'].map(frame['dedup_cluster'].value_counts())
+    members = frame.loc[sizes > 1, ['dedup_cluster'] + [c for c in ('venue', 'paper_id', title_column) if c in frame]]
+    members = members.assign(canonical=members.index.isin(canonical))
+
+    deduped = frame.loc[canonical]
+    if 'venue' in frame:
+        # Only multi-record clusters need aggregating; singletons keep their own venue
+        venues = members.groupby('dedup_cluster')['venue'].agg(lambda v: ','.join(sorted(set(map(str, v)))))
+        deduped = deduped.assign(
+            duplicate_venues=deduped['dedup_cluster'].map(venues).fillna(deduped['venue'].astype(str))
+        )
+    return deduped.reset_index(drop=True), members.sort_values('dedup_cluster').reset_index(drop=True)
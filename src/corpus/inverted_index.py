@@ -0,0 +1,162 @@
+import os
+import pickle
+import re
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens used for both indexing and queries."""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InvertedIndex:
+    """
+    Positional inverted index (term -> paper -> token positions) over paper content.
+
+    An opt-in query path for ad-hoc term and dataset questions: term groups are
+    answered as phrase lookups instead of rescanning every document. The
+    published counts still come from the substring test in ``count_mentions``;
+    a phrase here only matches whole tokens, so e.g. "mimic" does not match
+    "mimicking". Re-adding a paper replaces its previous postings; removed
+    papers are tombstoned and dropped from postings on ``compact``.
+    """
+
+    def __init__(self):
+        self.doc_ids: List[str] = []
+        self.doc_lookup: Dict[str, int] = {}
+        self.deleted: Set[int] = set()
+        self.postings: Dict[str, Dict[int, array]] = defaultdict(dict)
+        # paper_id -> version (e.g. content hash) the paper was indexed at
+        self.versions: Dict[str, str] = {}
+
+    @classmethod
+    def from_texts(cls, items: Iterable[Tuple[str, str]]) -> "InvertedIndex":
+        index = cls()
+        for paper_id, text in items:
+            index.add_document(paper_id, text)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_lookup)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return str(paper_id) in self.doc_lookup
+
+    def add_document(self, paper_id: str, text: Optional[str], version: Optional[str] = None) -> None:
+        """Index a paper, replacing any earlier version of it."""
+        paper_id = str(paper_id)
+        self.remove_document(paper_id)
+        doc = len(self.doc_ids)
+        self.doc_ids.append(paper_id)
+        self.doc_lookup[paper_id] = doc
+        if version is not None:
+            self.versions[paper_id] = version
+
+        positions = defaultdict(lambda: array('I'))
+        for position, token in enumerate(tokenize(text)):
+            positions[token].append(position)
+        for token, token_positions in positions.items():
+            self.postings[token][doc] = token_positions
+
+    def remove_document(self, paper_id: str) -> None:
+        doc = self.doc_lookup.pop(str(paper_id), None)
+        self.versions.pop(str(paper_id), None)
+        if doc is not None:
+            self.deleted.add(doc)
+
+    def update(self, versions: Dict[str, str], text_fn: Callable[[str], Optional[str]]) -> int:
+        """
+        Bring the index in line with ``versions`` (paper_id -> content version).
+
+        Only papers that are new or whose version changed are read with
+        ``text_fn`` and re-indexed; papers missing from ``versions`` are removed.
+        Returns the number of papers (re-)indexed.
+        """
+        versions = {str(paper_id): version for paper_id, version in versions.items()}
+        for paper_id in [p for p in self.doc_lookup if p not in versions]:
+            self.remove_document(paper_id)
+        changed = [p for p, version in versions.items() if self.versions.get(p) != version or p not in self]
+        for paper_id in changed:
+            self.add_document(paper_id, text_fn(paper_id), versions[paper_id])
+        return len(changed)
+
+    def compact(self) -> None:
+        """Drop postings of removed papers."""
+        if not self.deleted:
+            return
+        for token in list(self.postings):
+            docs = self.postings[token]
+            for doc in self.deleted.intersection(docs):
+                del docs[doc]
+            if not docs:
+                del self.postings[token]
+        self.deleted.clear()
+
+    def phrase_counts(self, phrase: str) -> Dict[str, int]:
+        """Number of occurrences of ``phrase`` per paper_id, for papers containing it."""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return {}
+        token_docs = [self.postings.get(token) for token in tokens]
+        if any(docs is None for docs in token_docs):
+            return {}
+
+        # Walk the rarest token's documents and verify the remaining tokens positionally
+        rarest = min(range(len(tokens)), key=lambda i: len(token_docs[i]))
+        counts = {}
+        for doc, anchor_positions in token_docs[rarest].items():
+            if doc in self.deleted or not all(doc in docs for docs in token_docs):
+                continue
+            if len(tokens) == 1:
+                hits = len(anchor_positions)
+            else:
+                position_sets = [set(docs[doc]) for docs in token_docs]
+                hits = sum(
+                    1 for anchor in anchor_positions
+                    if all(anchor - rarest + i in position_sets[i] for i in range(len(tokens)))
+                )
+            if hits:
+                counts[self.doc_ids[doc]] = hits
+        return counts
+
+    def count_group(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Per paper, how many of ``terms`` occur in it (the ``count_mentions`` convention)."""
+        counts = defaultdict(int)
+        for term in terms:
+            for paper_id in self.phrase_counts(term):
+                counts[paper_id] += 1
+        return dict(counts)
+
+    def count_groups(self, mapping: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+        """``count_group`` for every key of a dataset-style term mapping."""
+        return {key: self.count_group(terms) for key, terms in mapping.items()}
+
+    def save(self, filename: str) -> None:
+        self.compact()
+        with open(filename, 'wb') as f:
+            pickle.dump({
+                'doc_ids': self.doc_ids,
+                'doc_lookup': self.doc_lookup,
+                'postings': dict(self.postings),
+                'versions': self.versions,
+            }, f)
+
+    @classmethod
+    def load(cls, filename: str) -> "InvertedIndex":
+        index = cls()
+        with open(filename, 'rb') as f:
+            state = pickle.load(f)
+        index.doc_ids = state['doc_ids']
+        index.doc_lookup = state['doc_lookup']
+        index.postings = defaultdict(dict, state['postings'])
+        index.versions = state.get('versions', {})
+        index.deleted = set(range(len(index.doc_ids))) - set(index.doc_lookup.values())
+        return index
+
+    @classmethod
+    def load_or_create(cls, filename: str) -> "InvertedIndex":
+        return cls.load(filename) if os.path.exists(filename) else cls()
@@ -0,0 +1,93 @@
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class FullTextStore:
+    """
+    Read-only full-text blob store backed by ``mmap``.
+
+    Paper contents are concatenated UTF-8 bytes in ``{prefix}.bin`` with an
+    offset index ``{prefix}.idx.json`` mapping paper_id -> [offset, length].
+    Opening the store maps the file without reading it, so only the papers
+    that are actually looked up get paged in and decoded.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        with open(f"{prefix}.idx.json", 'r', encoding='utf-8') as f:
+            self.index: Dict[str, List[int]] = json.load(f)
+        self._file = open(f"{prefix}.bin", 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    @staticmethod
+    def write(prefix: str, items: Iterable[Tuple[str, str]], append: bool = False) -> int:
+        """
+        Write (paper_id, text) pairs to a store at ``prefix``.
+
+        With ``append=True`` new papers are added after the existing blob; a paper
+        written again points at its newest copy. Returns the number of papers written.
+        """
+        index = {}
+        if append and os.path.exists(f"{prefix}.idx.json"):
+            with open(f"{prefix}.idx.json", 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+        os.makedirs(os.path.dirname(prefix) or '.', exist_ok=True)
+        written = 0
+        with open(f"{prefix}.bin", 'ab' if append else 'wb') as f:
+            offset = f.tell()
+            for paper_id, text in items:
+                data = (text or "").encode('utf-8')
+                f.write(data)
+                index[str(paper_id)] = [offset, len(data)]
+                offset += len(data)
+                written += 1
+
+        tmp_path = f"{prefix}.idx.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, f"{prefix}.idx.json")
+        return written
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return str(paper_id) in self.index
+
+    def ids(self) -> List[str]:
+        return list(self.index)
+
+    def view(self, paper_id: str) -> memoryview:
+        """Zero-copy slice of a paper's UTF-8 bytes; release it before closing the store."""
+        offset, length = self.index[str(paper_id)]
+        return self._view[offset:offset + length]
+
+    def text(self, paper_id: str) -> str:
+        """Decoded content of a single paper."""
+        return str(self.view(paper_id), 'utf-8')
+
+    def get(self, paper_id: str, default: Optional[str] = None) -> Optional[str]:
+        return self.text(paper_id) if paper_id in self else default
+
+    def items(self, paper_ids: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+        """Lazily decode (paper_id, text) pairs, optionally for a subset of papers."""
+        for paper_id in (self.index if paper_ids is None else paper_ids):
+            yield str(paper_id), self.text(paper_id)
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
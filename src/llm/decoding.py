@@ -0,0 +1,112 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.pipeline.metrics import METRICS
+
+
+@dataclass(frozen=True)
+class DecodingConfig:
+    """
+    Decoding strategy for generation: "greedy" (default, deterministic and
+    cheapest), "beam" (``num_beams``) or "sample" (``temperature``/``top_p``).
+    """
+    strategy: str = "greedy"
+    num_beams: int = 4
+    temperature: float = 0.7
+    top_p: float = 0.9
+
+    def __post_init__(self):
+        if self.strategy not in ("greedy", "beam", "sample"):
+            raise ValueError(f"Unknown decoding strategy: {self.strategy}")
+
+    def to_generate_kwargs(self) -> dict:
+        if self.strategy == "sample":
+            return {"do_sample": True, "temperature": self.temperature, "top_p": self.top_p}
+        if self.strategy == "beam":
+            return {"do_sample": False, "num_beams": self.num_beams}
+        return {"do_sample": False}
+
+    def as_record(self) -> dict:
+        """Parameters that affect outputs, stored alongside results"""
+        record = {"strategy": self.strategy}
+        if self.strategy == "beam":
+            record["num_beams"] = self.num_beams
+        elif self.strategy == "sample":
+            record.update(temperature=self.temperature, top_p=self.top_p)
+        return record
+
+
+GREEDY = DecodingConfig()
+
+
+@dataclass(frozen=True)
+class AssistedDecoding:
+    """
+    Assisted (speculative) generation settings for one task.
+
+    Either a small draft model sharing the main model's tokenizer, or n-gram
+    lookup in the prompt itself, proposes tokens that the main model verifies in
+    one forward pass. Assisted runs decode greedily, so outputs match plain
+    greedy decoding; prompt lookup suits outputs that mostly copy the input.
+    """
+    draft_model_id: Optional[str] = None
+    prompt_lookup_num_tokens: Optional[int] = None
+    num_assistant_tokens: int = 5
+
+    def __post_init__(self):
+        if (self.draft_model_id is None) == (self.prompt_lookup_num_tokens is None):
+            raise ValueError("Set exactly one of draft_model_id or prompt_lookup_num_tokens")
+
+    def as_record(self) -> dict:
+        if self.prompt_lookup_num_tokens is not None:
+            return {"prompt_lookup_num_tokens": self.prompt_lookup_num_tokens}
+        return {"draft_model_id": self.draft_model_id, "num_assistant_tokens": self.num_assistant_tokens}
+
+    def generate_kwargs(self, device) -> dict:
+        if self.prompt_lookup_num_tokens is not None:
+            return {"prompt_lookup_num_tokens": self.prompt_lookup_num_tokens}
+        from src.llm.llm import load_draft_model
+        assistant = load_draft_model(self.draft_model_id, device)
+        assistant.generation_config.num_assistant_tokens = self.num_assistant_tokens
+        return {"assistant_model": assistant}
+
+
+class GenerationTimer:
+    """
+    Stopping criterion that splits generate() wall time into prefill and decode.
+
+    generate() checks its stopping criteria after every step, so the first call
+    marks the end of the prefill (plus the first token) and the number of calls
+    is the number of decode steps. It never stops generation. ``record`` reports
+    ``<name>.prefill`` (items = prompt tokens) and ``<name>.decode`` (items =
+    generated tokens across the batch) to METRICS.
+    """
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self.start = time.perf_counter()
+        self.first_step = None
+        self.steps = 0
+        self.batch = 1
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.first_step is None:
+            self.first_step = time.perf_counter()
+        self.steps += 1
+        self.batch = input_ids.shape[0]
+        return False
+
+    def criteria(self):
+        """The list passed as ``stopping_criteria`` to generate() or a pipeline call"""
+        try:
+            from transformers import StoppingCriteriaList
+        except ImportError:
+            return [self]
+        return StoppingCriteriaList([self])
+
+    def record(self, prompt_tokens: int) -> None:
+        end = time.perf_counter()
+        first_step = self.first_step or end
+        METRICS.observe(f"{self.name}.prefill", first_step - self.start, items=prompt_tokens)
+        METRICS.observe(f"{self.name}.decode", end - first_step, items=self.steps * self.batch)
@@ -1,8 +1,131 @@
+import weakref
+from typing import Optional
 import transformers
 import torch
 from transformers import BitsAndBytesConfig, pipeline, AutoTokenizer
+from src.llm.decoding import AssistedDecoding, DecodingConfig, GenerationTimer, GREEDY
 
-def generate_text_with_icl(prompt, pipeline, task_examples, max_new_tokens=256, temperature=0.00001, top_p=0.99) -> str:
+ICL_SYSTEM_PROMPT = "You are an expert and experienced from the healthcare and biomedical domain with extensive medical knowledge and practical experience. Your job is to help annotate specific tasks by looking for common patterns within text."
+ICL_EXAMPLES_HEADER = " Here are some examples of how to perform the task:\n\n"
+
+# Placeholders used to locate the message slots inside the rendered chat template
+_SYSTEM_SENTINEL = "<<SYSTEM_SLOT>>"
+_USER_SENTINEL = "<<USER_SLOT>>"
+
+
+class PromptBuilder:
+    """
+    Builds chat-formatted ICL prompts as token IDs with the fixed parts tokenized once.
+
+    The chat template is rendered a single time with placeholder messages; the
+    constant segments around the system and user slots and the terminator IDs are
+    tokenized up front. The system prompt plus ICL examples is tokenized once per
+    example set and cached, so each request only tokenizes its own input.
+    """
+
+    def __init__(self, tokenizer, system_prompt: str = ICL_SYSTEM_PROMPT):
+        self.tokenizer = tokenizer
+        template = tokenizer.apply_chat_template(
+            [
+                {"role": "system", "content": _SYSTEM_SENTINEL},
+                {"role": "user", "content": _USER_SENTINEL},
+            ],
+            tokenize=False,
+            add_generation_prompt=True
+        )
+        prefix, rest = template.split(_SYSTEM_SENTINEL)
+        middle, suffix = rest.split(_USER_SENTINEL)
+        self.prefix_ids = self._encode(prefix)
+        self.middle_ids = self._encode(middle)
+        self.suffix_ids = self._encode(suffix)
+        self.system_prompt = system_prompt
+        # Token IDs of the system prompt and ICL examples, keyed by the example pairs
+        self._icl_ids = {}
+        self.terminators = [
+            tokenizer.eos_token_id,
+            tokenizer.convert_tokens_to_ids("<|eot_id|>")
+        ]
+
+    def _encode(self, text):
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def icl_text(self, task_examples):
+        """System prompt and ICL examples; the part of the system message shared by every input"""
+        parts = [self.system_prompt]
+        if len(task_examples) > 0:
+            parts.append(ICL_EXAMPLES_HEADER)
+            parts.extend(f"Input: {example['input']}\nOutput: {example['output']}\n\n" for example in task_examples)
+        return "".join(parts)
+
+    @staticmethod
+    def request_text(prompt):
+        return f"Now, please perform the same task for the following input:\nInput: {prompt}\nOutput:"
+
+    def system_text(self, prompt, task_examples):
+        return self.icl_text(task_examples) + self.request_text(prompt)
+
+    def icl_ids(self, task_examples):
+        """Token IDs of ``icl_text``, tokenized once per example set"""
+        key = tuple((example['input'], example['output']) for example in task_examples)
+        ids = self._icl_ids.get(key)
+        if ids is None:
+            ids = self._icl_ids[key] = self._encode(self.icl_text(task_examples).lstrip())
+        return ids
+
+    def build(self, prompt, task_examples=()):
+        """Token IDs of the full chat prompt (the template trims message contents)"""
+        return (
+            self.prefix_ids
+            + self.icl_ids(task_examples)
+            + self._encode(self.request_text(prompt))
+            + self.middle_ids
+            + self._encode(prompt.strip())
+            + self.suffix_ids
+        )
+
+    def generate(self, model, prompt, task_examples=(), **generate_kwargs):
+        """Generate from the prompt and decode only the new tokens"""
+        input_ids = torch.tensor([self.build(prompt, task_examples)], device=model.device)
+        timer = GenerationTimer("llm.icl")
+        with torch.no_grad():
+            output_ids = model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                eos_token_id=self.terminators,
+                pad_token_id=self.tokenizer.eos_token_id,
+                stopping_criteria=timer.criteria(),
+                **generate_kwargs
+            )
+        timer.record(prompt_tokens=input_ids.shape[1])
+        return self.tokenizer.decode(output_ids[0, input_ids.shape[1]:], skip_special_tokens=True)
+
+
+_prompt_builders = weakref.WeakKeyDictionary()
+
+
+def get_prompt_builder(pipeline) -> PromptBuilder:
+    """PromptBuilder for a pipeline's tokenizer, created on first use"""
+    builder = _prompt_builders.get(pipeline.tokenizer)
+    if builder is None:
+        builder = _prompt_builders[pipeline.tokenizer] = PromptBuilder(pipeline.tokenizer)
+    return builder
+
+
+_draft_models = {}
+
+
+def load_draft_model(model_id, device):
+    """Small draft model for assisted generation, loaded once per device"""
+    key = (model_id, str(device))
+    if key not in _draft_models:
+        _draft_models[key] = transformers.AutoModelForCausalLM.from_pretrained(
+            model_id, torch_dtype=torch.bfloat16, device_map={"": device}
+        )
+    return _draft_models[key]
+
+
+def generate_text_with_icl(prompt, pipeline, task_examples, max_new_tokens=256,
+                           decoding: DecodingConfig = GREEDY, assist: Optional[AssistedDecoding] = None) -> str:
     """
     Generate text using the specified prompt and parameters with in-context learning.
     Args:
@@ -10,75 +133,58 @@ def generate_text_with_icl(prompt, pipeline, task_examples, max_new_tokens=256,
     pipeline: The text generation pipeline.
     task_examples (list): List of dictionaries containing input-output pairs for in-context learning.
     max_new_tokens (int, optional): The maximum number of new tokens to generate. Defaults to 256.
-    temperature (float, optional): The temperature value for sampling. Defaults to 0.00001.
-    top_p (float, optional): The top-p value for sampling. Defaults to 0.99.
+    decoding (DecodingConfig, optional): Decoding strategy. Defaults to greedy.
+    assist (AssistedDecoding, optional): Draft-model or prompt-lookup assisted generation; requires greedy decoding.
     Returns:
     str: The generated text.
     """
-    # Construct the in-context learning prompt
-    icl_prompt = "You are an expert and experienced from the healthcare and biomedical domain with extensive medical knowledge and practical experience. Your job is to help annotate specific tasks by looking for common patterns within text."
-    if len(task_examples) > 0:
-        icl_prompt += " Here are some examples of how to perform the task:\n\n"
-        
-        for example in task_examples:
-            icl_prompt += f"Input: {example['input']}\nOutput: {example['output']}\n\n"
-    
-    icl_prompt += f"Now, please perform the same task for the following input:\nInput: {prompt}\nOutput:"
-
-    messages = [
-        {"role": "system", "content": icl_prompt},
-        {"role": "user", "content": prompt},
-    ]
-    
-    full_prompt = pipeline.tokenizer.apply_chat_template(
-        messages,
-        tokenize=False,
-        add_generation_prompt=True
-    )
-    
-    terminators = [
-        pipeline.tokenizer.eos_token_id,
-        pipeline.tokenizer.convert_tokens_to_ids("<|eot_id|>")
-    ]
-    
-    outputs = pipeline(
-        full_prompt,
+    generate_kwargs = decoding.to_generate_kwargs()
+    if assist is not None:
+        if decoding.strategy != "greedy":
+            raise ValueError("Assisted generation is only used with greedy decoding")
+        generate_kwargs.update(assist.generate_kwargs(pipeline.model.device))
+    return get_prompt_builder(pipeline).generate(
+        pipeline.model,
+        prompt,
+        task_examples,
         max_new_tokens=max_new_tokens,
-        eos_token_id=terminators,
-        do_sample=True,
-        temperature=temperature,
-        top_p=top_p,
+        **generate_kwargs
     )
-    
-    return outputs[0]["generated_text"][len(full_prompt):]
 
 
 
-def load_70b_model(device):
-    ACCESS_TOKEN = ""
-    model_id = "aaditya/OpenBioLLM-Llama3-70B"
-        # Load model directly
+OPENBIO_70B = "aaditya/OpenBioLLM-Llama3-70B"
 
-    nf4_config = BitsAndBytesConfig(
-        load_in_4bit=True,
-        bnb_4bit_quant_type="nf4",
-        bnb_4bit_use_double_quant=True,
-        bnb_4bit_compute_dtype=torch.bfloat16
-    )
-    model_nf4 = transformers.AutoModelForCausalLM.from_pretrained(model_id, 
-                                                    quantization_config=nf4_config,
-                                                    device_map={"": device},
-                                                    token=ACCESS_TOKEN)
-    
-    tokenizer = AutoTokenizer.from_pretrained(model_id, token=ACCESS_TOKEN)
-    
-    pipeline = transformers.pipeline(
-        "text-generation",
-        model= model_nf4, #model_id,
-        # model_kwargs={"torch_dtype": torch.bfloat16},
-        tokenizer=tokenizer,
-        # device=device,
-    )
+
+def load_model(device, model_id=OPENBIO_70B, quantize=True, access_token=""):
+    """
+    Load a causal LM into a text-generation pipeline.
+    Args:
+    device (str): "cpu", a single device such as "cuda:1", or "auto" to spread layers over all GPUs.
+    model_id (str): Hugging Face model id. Defaults to OpenBioLLM-70B.
+    quantize (bool): Load in 4-bit NF4 (GPU only). Defaults to True.
+    Returns:
+    The text-generation pipeline.
+    """
+    device = str(device)
+    kwargs = {"token": access_token}
+    if device != "cpu":
+        kwargs["device_map"] = "auto" if device == "auto" else {"": device}
+        if quantize:
+            kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_compute_dtype=torch.bfloat16
+            )
+    model = transformers.AutoModelForCausalLM.from_pretrained(model_id, **kwargs)
+    tokenizer = AutoTokenizer.from_pretrained(model_id, token=access_token)
+    return transformers.pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+
+def load_70b_model(device, decoding: DecodingConfig = GREEDY):
+    """Load OpenBioLLM-70B and check it with one short chat turn decoded with ``decoding``"""
+    pipeline = load_model(device, OPENBIO_70B, quantize=True)
 
     messages = [
         {"role": "system", "content": "You are an expert and experienced from the healthcare and biomedical domain with extensive medical knowledge and practical experience. Your name is OpenBioLLM, and your job is to annotate medically-relevant data. Please answer the below message."},
@@ -100,9 +206,7 @@ def load_70b_model(device):
         prompt,
         max_new_tokens=256,
         eos_token_id=terminators,
-        do_sample=True,
-        temperature=0.1,
-        top_p=0.9,
+        **decoding.to_generate_kwargs(),
     )
     print(outputs[0]["generated_text"][len(prompt):])
     return pipeline
\ No newline at end of file
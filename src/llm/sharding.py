@@ -0,0 +1,91 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.metrics import METRICS
+
+
+def split_contiguous(df: pd.DataFrame, n: int) -> List[pd.DataFrame]:
+    """Split rows into ``n`` contiguous, nearly equal shards (empty shards dropped)"""
+    bounds = np.linspace(0, len(df), n + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+# The model replica owned by this worker process, loaded once by _load_replica
+_REPLICA = None
+
+
+def _load_replica(loader: Callable[[str], Any], device: str) -> None:
+    # Runs once in each spawned worker: load its model replica on its device
+    global _REPLICA
+    with METRICS.timer("llm.load"):
+        _REPLICA = loader(device)
+
+
+def _run_shard(fn: Callable, shard: pd.DataFrame, shard_index: int):
+    result = fn(_REPLICA, shard, shard_index)
+    # The worker's timings go back with its result so the parent can report them
+    return result, METRICS.collect()
+
+
+class ShardedRunner:
+    """
+    Runs a per-shard function with one long-lived model replica per device.
+
+    Each entry of ``devices`` gets its own spawned worker process (CUDA cannot
+    be forked), started on the first ``map`` call, which calls ``loader(device)``
+    once and keeps the model for every later call. ``map`` splits rows into
+    contiguous shards, one per device, runs ``fn(model, shard, shard_index)`` on
+    them and returns the results in shard order, so concatenating them preserves
+    row order. Call ``close`` (or use the runner as a context manager) to stop
+    the workers and free their devices.
+    Devices may repeat, e.g. ``["cpu", "cpu"]`` with a tiny model for tests, and
+    ``"auto"`` lets one replica span several GPUs through ``device_map``.
+    ``loader`` and ``fn`` must be picklable (module-level functions or partials).
+    """
+
+    def __init__(self, devices: Sequence[str], loader: Callable[[str], Any]):
+        if not devices:
+            raise ValueError("ShardedRunner needs at least one device")
+        self.devices = list(devices)
+        self.loader = loader
+        self._executors: List[ProcessPoolExecutor] = []
+
+    def start(self) -> None:
+        """Start one worker per device; each loads its replica before its first shard"""
+        if self._executors:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                initializer=_load_replica, initargs=(self.loader, device))
+            for device in self.devices
+        ]
+
+    def map(self, fn: Callable[[Any, pd.DataFrame, int], Any], df: pd.DataFrame) -> List[Any]:
+        self.start()
+        shards = split_contiguous(df, len(self.devices))
+        futures = [
+            executor.submit(_run_shard, fn, shard, shard_index)
+            for shard_index, (executor, shard) in enumerate(zip(self._executors, shards))
+        ]
+        results = []
+        for future in futures:
+            result, worker_metrics = future.result()
+            METRICS.merge(worker_metrics)
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
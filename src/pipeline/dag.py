@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from src.pipeline.metrics import METRICS
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step and the files it reads and writes.
+
+    A stage depends on every stage that declares one of its ``inputs`` as an
+    output, plus any stage named in ``after``. ``params`` are hashed into the
+    stage fingerprint, so changing them reruns the stage. ``resources`` name
+    things the stage needs exclusively, e.g. "gpu"; stages sharing a resource
+    never run at the same time.
+    """
+    name: str
+    fn: Callable[[], Any]
+    inputs: Sequence[PathLike] = ()
+    outputs: Sequence[PathLike] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    after: Sequence[str] = ()
+    resources: Sequence[str] = ()
+
+    def __post_init__(self):
+        self.inputs = [Path(p) for p in self.inputs]
+        self.outputs = [Path(p) for p in self.outputs]
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # ran, skipped, failed or blocked
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class ContentHasher:
+    """
+    sha256 of files and directory trees.
+
+    Digests are cached by (size, mtime_ns) so unchanged multi-gigabyte pickles
+    and PDF folders are only read again after they are rewritten.
+    """
+
+    def __init__(self, cache: Optional[Dict[str, list]] = None):
+        self.cache = cache if cache is not None else {}
+        self._lock = threading.Lock()
+
+    def file_digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with self._lock:
+            self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def snapshot(self) -> Dict[str, list]:
+        with self._lock:
+            return dict(self.cache)
+
+    def digest(self, path: Path) -> str:
+        """Digest of a file, of every file under a directory, or 'missing'"""
+        if path.is_file():
+            return self.file_digest(path)
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob('*') if p.is_file()):
+                digest.update(f"{child.relative_to(path)}\0{self.file_digest(child)}\n".encode('utf-8'))
+            return digest.hexdigest()
+        return 'missing'
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order with content-hash caching.
+
+    Before a stage runs, its fingerprint (the stage name, its params and the
+    content hashes of its inputs) is compared with the one stored in
+    ``state_path`` by the last successful run; if they match and all outputs
+    exist, the stage is skipped. Independent stages run concurrently on up to
+    ``max_workers`` threads, except that a stage waits while another stage
+    holding one of its ``resources`` runs. A failed stage blocks only its dependents.
+    """
+
+    def __init__(self, stages: Iterable[Stage], state_path: PathLike = "data/.pipeline_state.json",
+                 max_workers: int = 2):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.state_path = Path(state_path)
+        self.max_workers = max_workers
+        self.wall_seconds = 0.0
+        self.deps = self._resolve_dependencies()
+        self._check_acyclic()
+
+        self.state = {'stages': {}, 'hashes': {}}
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.hasher = ContentHasher(self.state.setdefault('hashes', {}))
+        self._state_lock = threading.Lock()
+
+    def _resolve_dependencies(self) -> Dict[str, Set[str]]:
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is written by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+
+        deps = {}
+        for stage in self.stages.values():
+            unknown = [name for name in stage.after if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} runs after unknown stage(s): {unknown}")
+            deps[stage.name] = {producers[p] for p in stage.inputs if p in producers} | set(stage.after)
+            deps[stage.name].discard(stage.name)
+        return deps
+
+    def _check_acyclic(self) -> None:
+        remaining = {name: set(deps) for name, deps in self.deps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Stage dependencies form a cycle among: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def upstream(self, targets: Iterable[str]) -> Set[str]:
+        """The targets and every stage they transitively depend on"""
+        selected, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.deps[name])
+        return selected
+
+    def fingerprint(self, stage: Stage) -> str:
+        payload = {
+            'name': stage.name,
+            'params': stage.params,
+            'inputs': {str(path): self.hasher.digest(path) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Other stages may be hashing files while the state is written
+            json.dump({**self.state, 'hashes': self.hasher.snapshot()}, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def _run_stage(self, stage: Stage, force: bool) -> StageResult:
+        fingerprint = self.fingerprint(stage)
+        previous = self.state['stages'].get(stage.name, {})
+        if not force and previous.get('fingerprint') == fingerprint and all(p.exists() for p in stage.outputs):
+            print(f"[{stage.name}] up to date, skipping")
+            METRICS.count(f"stage.{stage.name}.skipped")
+            return StageResult(stage.name, 'skipped')
+
+        print(f"[{stage.name}] running")
+        start = time.perf_counter()
+        try:
+            stage.fn()
+            missing = [str(p) for p in stage.outputs if not p.exists()]
+            if missing:
+                raise RuntimeError(f"finished without writing {missing}")
+        except Exception as e:
+            print(f"[{stage.name}] failed: {e}")
+            METRICS.count(f"stage.{stage.name}.failed")
+            return StageResult(stage.name, 'failed', time.perf_counter() - start, str(e))
+        seconds = time.perf_counter() - start
+        METRICS.observe(f"stage.{stage.name}", seconds)
+
+        with self._state_lock:
+            self.state['stages'][stage.name] = {
+                'fingerprint': fingerprint,
+                'seconds': round(seconds, 3),
+                'finished': time.time(),
+            }
+            self._save_state()
+        print(f"[{stage.name}] done in {seconds:.1f}s")
+        return StageResult(stage.name, 'ran', seconds)
+
+    def run(self, targets: Optional[Iterable[str]] = None,
+            force: Union[bool, Iterable[str]] = False) -> List[StageResult]:
+        """
+        Run ``targets`` (default: every stage) and whatever they depend on.
+
+        ``force`` reruns every selected stage when True, or only the named stages.
+        Returns one result per selected stage in completion order.
+        """
+        selected = self.upstream(targets) if targets else set(self.stages)
+        forced = set(selected) if force is True else set(force or ())
+        pending = {name: self.deps[name] & selected for name in selected}
+        results: Dict[str, StageResult] = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            # resource -> name of the running stage holding it
+            held: Dict[str, str] = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if deps <= results.keys()]:
+                    failed = [d for d in pending[name] if results[d].status in ('failed', 'blocked')]
+                    if failed:
+                        del pending[name]
+                        results[name] = StageResult(name, 'blocked', error=f"upstream failed: {sorted(failed)}")
+                        continue
+                    stage = self.stages[name]
+                    # Stays pending until the stage holding the resource finishes
+                    if any(resource in held for resource in stage.resources):
+                        continue
+                    del pending[name]
+                    held.update((resource, name) for resource in stage.resources)
+                    running[executor.submit(self._run_stage, stage, name in forced)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    for resource in self.stages[name].resources:
+                        held.pop(resource, None)
+
+        self.wall_seconds = time.perf_counter() - start
+        with self._state_lock:
+            self._save_state()
+        return list(results.values())
+
+    def format_report(self, results: List[StageResult]) -> str:
+        lines = [f"{'stage':<22} {'status':<8} {'seconds':>9}"]
+        for result in results:
+            line = f"{result.name:<22} {result.status:<8} {result.seconds:>9.1f}"
+            if result.error:
+                line += f"  {result.error}"
+            lines.append(line)
+        total = sum(result.seconds for result in results)
+        lines.append(f"{'stage total':<31} {total:>9.1f}")
+        lines.append(f"{'wall clock':<31} {self.wall_seconds:>9.1f}")
+        return "\n".join(lines)
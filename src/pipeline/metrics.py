@@ -0,0 +1,261 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Latency samples kept per timer; beyond this, reservoir sampling keeps a uniform subset
+MAX_SAMPLES = 4096
+PROMETHEUS_NAME_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+@dataclass
+class TimerStats:
+    """Accumulated timings for one named operation"""
+    calls: int = 0
+    seconds: float = 0.0
+    items: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    samples: List[float] = field(default_factory=list)
+
+    def add(self, seconds: float, items: int = 1, bytes_in: int = 0, bytes_out: int = 0,
+            rng: Optional[random.Random] = None) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.items += items
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = (rng or random).randrange(self.calls)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def merge(self, other: 'TimerStats', rng: Optional[random.Random] = None) -> None:
+        # Weight each sample by how many calls it stands for on its side
+        weights = [self.calls / len(self.samples)] * len(self.samples) if self.samples else []
+        weights += [other.calls / len(other.samples)] * len(other.samples) if other.samples else []
+        samples = self.samples + other.samples
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.items += other.items
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        if len(samples) > MAX_SAMPLES:
+            samples = (rng or random).choices(samples, weights, k=MAX_SAMPLES)
+        self.samples = samples
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        return {
+            'calls': self.calls,
+            'seconds': round(self.seconds, 6),
+            'items': self.items,
+            'items_per_sec': round(self.items / self.seconds, 3) if self.seconds else 0.0,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'p50': round(self.percentile(0.50), 6),
+            'p95': round(self.percentile(0.95), 6),
+        }
+
+
+class Span:
+    """Handle yielded by ``Metrics.timer`` to report work done inside the block"""
+
+    def __init__(self, items: int = 1, bytes_in: int = 0, bytes_out: int = 0):
+        self.items = items
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+
+    def add(self, items: int = 0, bytes_in: int = 0, bytes_out: int = 0) -> None:
+        self.items += items
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+
+class Metrics:
+    """
+    Thread-safe registry of timers and counters.
+
+    Timers record call counts, wall time, items and bytes processed and a
+    bounded latency sample for p50/p95. Counters are plain integers; a pair
+    named ``<name>.hits`` / ``<name>.misses`` is reported as a cache hit rate.
+    Process-pool workers ``collect`` their registry and the parent ``merge``s it.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.timers: Dict[str, TimerStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, items: int = 1, bytes_in: int = 0, bytes_out: int = 0) -> None:
+        with self._lock:
+            self.timers.setdefault(name, TimerStats()).add(seconds, items, bytes_in, bytes_out, self._rng)
+
+    @contextmanager
+    def timer(self, name: str, items: int = 1, bytes_in: int = 0, bytes_out: int = 0):
+        """Time the block; use the yielded span to add items or bytes found inside it"""
+        span = Span(items, bytes_in, bytes_out)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            self.observe(name, time.perf_counter() - start, span.items, span.bytes_in, span.bytes_out)
+
+    def timed(self, name: str):
+        """Decorator form of ``timer``"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def cache(self, name: str, hit: bool) -> None:
+        self.count(f"{name}.hits" if hit else f"{name}.misses")
+
+    def collect(self) -> dict:
+        """Picklable copy of everything recorded so far, then reset (for worker processes)"""
+        with self._lock:
+            state = {'timers': self.timers, 'counters': self.counters}
+            self.timers, self.counters = {}, {}
+        return state
+
+    def merge(self, state: dict) -> None:
+        with self._lock:
+            for name, stats in state['timers'].items():
+                self.timers.setdefault(name, TimerStats()).merge(stats, self._rng)
+            for name, n in state['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        self.collect()
+        self.started = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {name: stats.summary() for name, stats in sorted(self.timers.items())}
+            counters = dict(sorted(self.counters.items()))
+        hit_rates = {}
+        for name in counters:
+            if name.endswith('.hits'):
+                base = name[:-len('.hits')]
+                total = counters[name] + counters.get(f"{base}.misses", 0)
+                hit_rates[base] = round(counters[name] / total, 4) if total else 0.0
+        return {
+            'started': self.started,
+            'elapsed': round(time.time() - self.started, 3),
+            'timers': timers,
+            'counters': counters,
+            'cache_hit_rates': hit_rates,
+        }
+
+    def to_json(self, path) -> None:
+        _write_atomic(path, json.dumps(self.snapshot(), indent=1))
+
+    def to_prometheus(self, path, prefix: str = "reproai4h") -> None:
+        """Write a node_exporter textfile-collector file"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def emit(metric, kind, samples):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{metric}{{{label_text}}} {value}" if labels else f"{prefix}_{metric} {value}")
+
+        timers = snapshot['timers']
+        emit('timer_seconds_total', 'counter', [({'name': n}, t['seconds']) for n, t in timers.items()])
+        emit('timer_calls_total', 'counter', [({'name': n}, t['calls']) for n, t in timers.items()])
+        emit('timer_items_total', 'counter', [({'name': n}, t['items']) for n, t in timers.items()])
+        emit('timer_bytes_in_total', 'counter', [({'name': n}, t['bytes_in']) for n, t in timers.items()])
+        emit('timer_bytes_out_total', 'counter', [({'name': n}, t['bytes_out']) for n, t in timers.items()])
+        emit('timer_latency_seconds', 'gauge', [
+            ({'name': n, 'quantile': q}, t[key])
+            for n, t in timers.items() for q, key in (('0.5', 'p50'), ('0.95', 'p95'))
+        ])
+        for name, value in snapshot['counters'].items():
+            emit(f"{PROMETHEUS_NAME_RE.sub('_', name)}_total", 'counter', [({}, value)])
+        emit('cache_hit_ratio', 'gauge', [({'cache': n}, r) for n, r in snapshot['cache_hit_rates'].items()])
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+    def format_report(self) -> str:
+        snapshot = self.snapshot()
+        lines = [f"{'timer':<28} {'calls':>8} {'seconds':>10} {'items/s':>9} "
+                 f"{'MB in':>8} {'MB out':>8} {'p50 ms':>8} {'p95 ms':>8}"]
+        for name, t in sorted(snapshot['timers'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append(
+                f"{name:<28} {t['calls']:>8} {t['seconds']:>10.1f} {t['items_per_sec']:>9.1f} "
+                f"{t['bytes_in'] / 1e6:>8.1f} {t['bytes_out'] / 1e6:>8.1f} "
+                f"{t['p50'] * 1e3:>8.1f} {t['p95'] * 1e3:>8.1f}"
+            )
+        for name, rate in snapshot['cache_hit_rates'].items():
+            lines.append(f"cache {name}: {rate:.1%} hits")
+        return "\n".join(lines)
+
+
+def _write_atomic(path, text: str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the instrumented pipeline code
+METRICS = Metrics()
+
+
+class MetricsExporter:
+    """
+    Rewrites the JSON and Prometheus textfile exports every ``interval`` seconds
+    while a long run is in progress, and once more on exit.
+    """
+
+    def __init__(self, metrics: Metrics, json_path=None, prometheus_path=None, interval: float = 60.0):
+        self.metrics = metrics
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def export(self) -> None:
+        if self.json_path:
+            self.metrics.to_json(self.json_path)
+        if self.prometheus_path:
+            self.metrics.to_prometheus(self.prometheus_path)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.export()
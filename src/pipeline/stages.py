@@ -0,0 +1,208 @@
+import atexit
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.conf_proc.pathing import ConferencePathManager
+from src.pipeline.dag import Pipeline, Stage
+
+CONFERENCES = ['chil', 'ml4h', 'mlhc']
+PMIDS_PATH = Path("data/raw/pubmed/open_access_ai_ml_pmids.csv")
+# Every clean_* and the classify stage load 70B models; only one may hold the GPUs at a time
+GPU = "gpu"
+_GPU_RUNNER = None
+
+
+def _gpu_runner():
+    """
+    One 70B replica per GPU when there are several, else None.
+
+    The runner is shared by every GPU stage of the run, so the replicas load once
+    and are reused by each clean_* stage and classify; it is closed at exit.
+    """
+    global _GPU_RUNNER
+    import torch
+    from src.llm.llm import load_70b_model
+    from src.llm.sharding import ShardedRunner
+    devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    if len(devices) < 2:
+        return None
+    if _GPU_RUNNER is None:
+        _GPU_RUNNER = ShardedRunner(devices, load_70b_model)
+        atexit.register(_GPU_RUNNER.close)
+    return _GPU_RUNNER
+
+
+def pubmed_stages(venue: str = "pubmed", n: int = 10000) -> List[Stage]:
+    """PMID query -> BioC fetch -> parse -> iCite -> term counts -> affiliations"""
+    from src.pubmed import pmc_scrape
+
+    raw = Path(f"data/raw/{venue}")
+    processed = Path("data/processed")
+    bioc_path = raw / "bioc_xmls.pkl"
+    records_path = raw / "paper_content_flattened.pkl"
+    content_paths = [raw / "paper_content.bin", raw / "paper_content.idx.json"]
+    citations_path = processed / f"{venue}_citations.csv"
+    stats_path = processed / f"{venue}_stats.csv"
+    affiliations_path = processed / f"{venue}_affiliations.csv"
+    term_cache_path = processed / f"{venue}_term_cache.pkl"
+
+    from src.pubmed.term_cache import CITATION_TTL
+
+    def processor():
+        return pmc_scrape.PubMedProcessor(venue=venue)
+
+    def query():
+        from src.pubmed.query_pmid import query_pmids
+        query_pmids()
+
+    def fetch():
+        proc = processor()
+        proc.fetch_bioc(proc.read_pmids_from_csv(str(PMIDS_PATH))[:n])
+
+    def parse():
+        proc = processor()
+        pmids = proc.read_pmids_from_csv(str(PMIDS_PATH))[:n]
+        proc.parse_bioc(proc.load_from_pickle(str(bioc_path)), pmids)
+
+    def icite():
+        proc = processor()
+        proc.fetch_citations(proc.load_records())
+
+    def count():
+        proc = processor()
+        proc.analyze(proc.load_records())
+
+    def affiliation():
+        from src.pubmed.medline import query_affiliation
+        query_affiliation(str(stats_path), output_path=str(affiliations_path))
+
+    terms = {
+        'datasets': pmc_scrape.DATASET_TERMS,
+        'code': pmc_scrape.CODE_TERMS,
+        'ai': pmc_scrape.AI_TERMS,
+        'years': pmc_scrape.YEARS,
+    }
+    return [
+        Stage("pmid_query", query, outputs=[PMIDS_PATH]),
+        Stage("bioc_fetch", fetch, inputs=[PMIDS_PATH], outputs=[bioc_path], params={'n': n}),
+        Stage("parse", parse, inputs=[PMIDS_PATH, bioc_path],
+              outputs=[records_path, *content_paths],
+              params={'n': n}),
+        # Reruns once per citation TTL window so counts are refreshed like the cache expires them
+        Stage("icite", icite, inputs=[records_path], outputs=[citations_path, term_cache_path],
+              params={'citation_window': int(time.time() // CITATION_TTL)}),
+        Stage("count", count, inputs=[records_path, *content_paths, citations_path, term_cache_path],
+              outputs=[stats_path, processed / f"{venue}_paper_data.json", processed / f"{venue}_paper_data.pkl"],
+              params=terms),
+        Stage("affiliation", affiliation, inputs=[stats_path], outputs=[affiliations_path]),
+    ]
+
+
+def conference_stages(path_manager: ConferencePathManager, conference: str,
+                      workers: Optional[int] = None) -> List[Stage]:
+    """Download -> PDF extract -> LLM clean -> Semantic Scholar citations for one conference"""
+    conf = path_manager.get_conference_config(conference)
+    years = conf.get_years(path_manager.debug)
+    year = conf.debug_year if path_manager.debug else None
+    pdf_dirs = [path_manager.get_paths(conference, y)['year_pdfs'] for y in years]
+    processed_path = path_manager.get_output_filename(conference, year=year, stage='processed')
+    cleaned_path = path_manager.get_output_filename(conference, year=year, stage='cleaned')
+    citations_path = path_manager.get_paths(conference)['processed'] / f"{conf.folder_prefix}_citations.csv"
+
+    def download():
+        from src.conf_proc.scrape_conf import ConferenceDownloader
+        ConferenceDownloader(path_manager).process_conference(conference)
+
+    def extract():
+        from src.conf_proc.measure_conf import DEFAULT_PDF_WORKERS, PDFContentProcessor
+        # Header parsing is CPU-only; shard PDFs over a few processes
+        PDFContentProcessor(path_manager).process_conference(conference, workers=workers or DEFAULT_PDF_WORKERS)
+
+    def clean():
+        from src.conf_proc.clean_conf import ConferencePaperCleaner
+        cleaner = ConferencePaperCleaner(path_manager, device="cuda:0")
+        cleaner.clean_conference_papers(conference, runner=_gpu_runner())
+
+    def citations():
+        from src.citation.semantic_scholar import SemanticScholarProcessor
+        SemanticScholarProcessor().process_conferences(
+            {conference: {'input': str(cleaned_path), 'output': str(citations_path)}}
+        )
+
+    return [
+        Stage(f"download_{conference}", download, outputs=pdf_dirs,
+              params={'years': years, 'urls': conf.get_urls(path_manager.debug)}),
+        Stage(f"extract_{conference}", extract, inputs=pdf_dirs, outputs=[processed_path]),
+        Stage(f"clean_{conference}", clean, inputs=[processed_path], outputs=[cleaned_path], resources=[GPU]),
+        Stage(f"s2_{conference}", citations, inputs=[cleaned_path], outputs=[citations_path]),
+    ]
+
+
+def merge_classify_stages(pubmed_path: Path, conference_paths: Dict[str, Path]) -> List[Stage]:
+    """Merge all venues, deduplicate, then classify topics"""
+    from src.topic.classification import ClassifierConfig, TopicClassifier
+
+    output_path = Path("data/processed/combined_data.csv")
+    parquet_path = Path("data/processed/combined_data.parquet")
+    classified_path = Path("data/processed/classified_data.csv")
+
+    def merge():
+        from combine_classify import DataMerger, DataPaths
+        paths = DataPaths(
+            pubmed_path=pubmed_path,
+            ml4h_path=conference_paths['ml4h'],
+            chil_path=conference_paths['chil'],
+            mlhc_path=conference_paths['mlhc'],
+            output_path=output_path,
+            parquet_path=parquet_path,
+        )
+        DataMerger(paths).merge_data(dedup=True)
+
+    def classify():
+        config = ClassifierConfig(device="cuda:1", input_path=output_path, output_path=classified_path)
+        runner = _gpu_runner()
+        if runner is None:
+            import torch
+            from src.llm.llm import load_70b_model
+            device = torch.device(config.device if torch.cuda.is_available() else "cpu")
+            classifier = TopicClassifier(config, load_70b_model(device, config.decoding))
+        else:
+            classifier = TopicClassifier(config)
+        classifier.process_dataset(batch_size=100, runner=runner)
+
+    return [
+        Stage("merge", merge, inputs=[pubmed_path, *conference_paths.values()],
+              outputs=[output_path, output_path.with_name(f"{output_path.stem}_duplicates.csv")]),
+        Stage("classify", classify, inputs=[output_path], outputs=[classified_path],
+              params={'decoding': ClassifierConfig().decoding.as_record()}, resources=[GPU]),
+    ]
+
+
+def build_pipeline(debug: bool = False, n: int = 10000,
+                   max_workers: int = 2, pdf_workers: Optional[int] = None) -> Pipeline:
+    """
+    The full pipeline: the PubMed and conference branches are independent, so
+    they run side by side and meet at the merge.
+
+    Debug mode processes only the first ML4H papers of its debug year under
+    data/debug, which has no PubMed branch and stops before the merge.
+    """
+    if debug:
+        path_manager = ConferencePathManager(base_dir="data", debug=True)
+        return Pipeline(
+            conference_stages(path_manager, 'ml4h', pdf_workers),
+            state_path="data/debug/.pipeline_state.json",
+            max_workers=max_workers,
+        )
+
+    path_manager = ConferencePathManager(base_dir="data")
+    stages = pubmed_stages(n=n)
+    pubmed_path = stages[-1].outputs[0]
+    conference_paths = {}
+    for conference in CONFERENCES:
+        conference_branch = conference_stages(path_manager, conference, pdf_workers)
+        stages.extend(conference_branch)
+        conference_paths[conference] = conference_branch[-1].outputs[0]
+    stages.extend(merge_classify_stages(pubmed_path, conference_paths))
+    return Pipeline(stages, max_workers=max_workers)
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ID_MAP_PATH = "data/processed/id_map.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    pmid TEXT PRIMARY KEY,
+    pmcid TEXT,
+    doi TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS ids_pmcid ON ids (pmcid);
+CREATE TABLE IF NOT EXISTS oa_links (
+    pmcid TEXT PRIMARY KEY,
+    link TEXT,
+    updated REAL
+);
+"""
+
+# sqlite caps the number of bound parameters per statement
+_QUERY_CHUNK = 900
+# PMC deposits and OA packages appear after publication, so "none" answers are re-checked
+NEGATIVE_TTL = 30 * 24 * 60 * 60
+
+
+class IdMapCache:
+    """
+    Local PMID <-> PMCID <-> DOI <-> OA link table.
+
+    Every ID the converter or OA service has answered for is stored, including
+    PMIDs with no PMC copy and PMCIDs with no OA package (as NULL), so later
+    runs only query NCBI for IDs never seen before. NULL answers older than
+    ``negative_ttl`` seconds are treated as unseen and asked again.
+    ``path=None`` keeps the table in memory.
+    """
+
+    def __init__(self, path: Optional[str] = ID_MAP_PATH, negative_ttl: float = NEGATIVE_TTL):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _select(self, sql: str, keys: List[str]) -> List[tuple]:
+        rows = []
+        with self._lock:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                rows.extend(self._conn.execute(sql.format(",".join("?" * len(chunk))), chunk).fetchall())
+        return rows
+
+    def _fresh(self, value: Optional[str], updated: Optional[float]) -> bool:
+        return value is not None or (updated or 0) >= time.time() - self.negative_ttl
+
+    def lookup_pmids(self, pmids: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(pmcid, doi) of every PMID already converted, skipping expired PMIDs without a PMCID"""
+        rows = self._select("SELECT pmid, pmcid, doi, updated FROM ids WHERE pmid IN ({})", list(pmids))
+        return {pmid: (pmcid, doi) for pmid, pmcid, doi, updated in rows if self._fresh(pmcid, updated)}
+
+    def store_pmids(self, rows: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """Record (pmid, pmcid, doi) conversions"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ids (pmid, pmcid, doi, updated) VALUES (?, ?, ?, ?)",
+                [(pmid, pmcid, doi, now) for pmid, pmcid, doi in rows],
+            )
+
+    def lookup_oa(self, pmcids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """OA package link of every PMCID already checked, skipping expired PMCIDs without one"""
+        rows = self._select("SELECT pmcid, link, updated FROM oa_links WHERE pmcid IN ({})", list(pmcids))
+        return {pmcid: link for pmcid, link, updated in rows if self._fresh(link, updated)}
+
+    def store_oa(self, links: Iterable[Tuple[str, Optional[str]]]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO oa_links (pmcid, link, updated) VALUES (?, ?, ?)",
+                [(pmcid, link, now) for pmcid, link in links],
+            )
+
+    def mapping(self, pmids: Iterable[str]) -> Dict[str, dict]:
+        """Everything known about each PMID: pmcid, doi and OA link"""
+        rows = self._select(
+            "SELECT ids.pmid, ids.pmcid, ids.doi, oa_links.link FROM ids "
+            "LEFT JOIN oa_links ON oa_links.pmcid = ids.pmcid WHERE ids.pmid IN ({})",
+            list(pmids),
+        )
+        return {pmid: {'pmcid': pmcid, 'doi': doi, 'oa_link': link} for pmid, pmcid, doi, link in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[IdMapCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> IdMapCache:
+    """The table at ID_MAP_PATH, opened on first use"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = IdMapCache(ID_MAP_PATH)
+        return _default_cache
@@ -1,8 +1,10 @@
 from Bio import Medline
-import urllib.request as urllib
+import os
 import pandas as pd
-import time
-from urllib.error import HTTPError
+import requests
+from src.pubmed.ncbi import PRIORITY_LOW, get_scheduler
+
+MEDLINE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
 
 def get_data(element, source):
     """Get data from source and join if it's a list."""
@@ -11,16 +13,26 @@ def get_data(element, source):
         value = '||'.join(value)
     return value
 
-def get_author_affiliation(pmid, api_key):
-    MEDLINE_URL = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pubmed&api_key={api_key}&rettype=medline&retmode=text&id={pmid}"
+def fetch_medline(pmid, api_key=None):
+    """Queue the MEDLINE record of one PMID on the shared NCBI scheduler."""
+    params = {'db': 'pubmed', 'rettype': 'medline', 'retmode': 'text', 'id': pmid}
+    if api_key:
+        params['api_key'] = api_key
+    return get_scheduler().submit(MEDLINE_URL, params, priority=PRIORITY_LOW, name="medline")
+
+def get_author_affiliation(pmid, api_key=None, future=None):
     text_path = f'medline/pubmed_data_{pmid}.txt'
     try:
-        urllib.urlretrieve(MEDLINE_URL, text_path)
+        response = (future or fetch_medline(pmid, api_key)).result()
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        with open(text_path, mode="w", encoding="utf-8") as handle:
+            handle.write(response.text)
         with open(text_path, mode="r", encoding="utf-8") as handle:
             articles = Medline.parse(handle)
             for article in articles:
                 return get_data("AD", article)
-    except HTTPError as e:
+    except requests.HTTPError as e:
         print(f"HTTP Error occurred for PMID {pmid}: {e}")
         return None
     except Exception as e:
@@ -28,49 +40,46 @@ def get_author_affiliation(pmid, api_key):
         return None
     return None  # Return None if no affiliation found
 
-# Function to get affiliation with rate limiting
-def get_affiliation_with_rate_limit(row, api_key):
-    if row['venue'] == 'pubmed':
-        try:
-            pmid = str(int(float(row['paper_id'])))  # Convert to int then string to remove any decimal places
-            print(f"Processing PMID: {pmid}")
-            affiliation = get_author_affiliation(pmid, api_key)
-            print(affiliation)
-            print(affiliation == None or affiliation == '')
-            time.sleep(1.0)  # Sleep for 0.34 seconds to respect rate limit (300 requests per minute)
-            return affiliation if affiliation is not None else ''
-        except ValueError:
-            print(f"Invalid PMID format for paper_id: {row['paper_id']}")
-    return ''
+def row_pmid(row):
+    """PMID of a PubMed row, None for other venues or malformed ids."""
+    if row['venue'] != 'pubmed':
+        return None
+    try:
+        return str(int(float(row['paper_id'])))  # Convert to int then string to remove any decimal places
+    except ValueError:
+        print(f"Invalid PMID format for paper_id: {row['paper_id']}")
+        return None
+
+# Requests are paced by the shared NCBI scheduler rather than a sleep per row
+def get_affiliation_with_rate_limit(row, api_key=None, futures=None):
+    pmid = row_pmid(row)
+    if pmid is None:
+        return ''
+    affiliation = get_author_affiliation(pmid, api_key, (futures or {}).get(pmid))
+    return affiliation if affiliation is not None else ''
 
 
-def query_affiliation(path, api_key="your_api_key_here"):
+def query_affiliation(path, api_key=None, output_path=None):
+    # Writes back to path unless output_path is given
+    output_path = output_path or path
     # Load the data
     code = pd.read_csv(path)
-    # Add a new 'affiliation' column, initially filled with empty strings
-    code['affiliation'] = ''
+    if api_key:
+        get_scheduler().set_api_key(api_key)
+    # Queue every lookup up front so the scheduler can run them at the full NCBI rate
+    pmids = {pmid for pmid in code.apply(row_pmid, axis=1) if pmid}
+    futures = {pmid: fetch_medline(pmid, api_key) for pmid in pmids}
+    print(f"Queued {len(futures)} MEDLINE lookups")
     # Apply the function to each row
-    code['affiliation'] = code.apply(lambda row: get_affiliation_with_rate_limit(row, api_key), axis=1)
-    # Save the updated dataframe in place
-    code.to_csv(path, index=False)
-    print(f"Processing complete. Updated data saved to '{path}'")
-    return path
+    code['affiliation'] = code.apply(lambda row: get_affiliation_with_rate_limit(row, api_key, futures), axis=1)
+    # Save the updated dataframe
+    code.to_csv(output_path, index=False)
+    print(f"Processing complete. Updated data saved to '{output_path}'")
+    return output_path
 
 
 if __name__ == "__main__":
     # for pubmed data
-    api_key = "your_api_key_here"
-    # Load the data
-    code = pd.read_csv("processed_data/combined_data.csv")
-
-    # Add a new 'affiliation' column, initially filled with empty strings
-    code['affiliation'] = ''
-
-
-    # Apply the function to each row
-    code['affiliation'] = code.apply(lambda row: get_affiliation_with_rate_limit(row, api_key), axis=1)
-
-    # Save the updated dataframe
-    code.to_csv("processed_data/combined_data_medline.csv", index=False)
-
-    print("Processing complete. Updated data saved to 'processed_data/combined_data_medline.csv'")
\ No newline at end of file
+    api_key = os.getenv("NCBI_API_KEY")
+    query_affiliation("processed_data/combined_data.csv", api_key,
+                      output_path="processed_data/combined_data_medline.csv")
\ No newline at end of file
@@ -0,0 +1,205 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.pipeline.metrics import METRICS
+
+# NCBI E-utilities allow 3 requests/s per IP, or 10 requests/s with an API key
+RATE_WITHOUT_KEY = 3.0
+RATE_WITH_KEY = 10.0
+EUTILS_HOST = "eutils.ncbi.nlm.nih.gov"
+
+# Lower runs first: a one-off search should not wait behind 10k BioC fetches
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token bucket; ``pause`` stops issuing tokens after a 429"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self.rate = rate
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    start = max(self.updated, self.paused_until)
+                    self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    wait = (1.0 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    fn: Callable[[], Any] = field(compare=False)
+    future: Future = field(compare=False)
+    name: str = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    queued: float = field(default_factory=time.perf_counter, compare=False)
+
+
+class NCBIScheduler:
+    """
+    Process-wide queue for every request to NCBI services.
+
+    A single dispatcher thread hands out requests in priority order, each
+    after taking a token from a global bucket sized from the API key, to a
+    pool of workers sharing one pooled session. Rate-limited and failed
+    requests go back on the queue with exponential backoff, so retries also
+    respect the limit, and a 429 pauses the whole bucket.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_workers: int = 8,
+                 max_retries: int = 5, backoff: float = 1.0):
+        self.api_key = api_key or None
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(self.rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._queue: "queue.PriorityQueue[_Job]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._slots = threading.Semaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ncbi")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return RATE_WITH_KEY if self.api_key else RATE_WITHOUT_KEY
+
+    def set_api_key(self, api_key: Optional[str]) -> None:
+        """Use ``api_key`` for E-utilities requests and raise the shared rate to match"""
+        self.api_key = api_key or None
+        self.bucket.set_rate(self.rate)
+
+    def call(self, fn: Callable[[], Any], priority: int = PRIORITY_NORMAL, name: str = "ncbi") -> Future:
+        """Queue any callable that makes exactly one NCBI request, e.g. a Bio.Entrez query"""
+        future = Future()
+        self._put(_Job(priority, next(self._seq), fn, future, name))
+        self._start()
+        return future
+
+    def submit(self, url: str, params: Optional[Dict[str, Any]] = None, priority: int = PRIORITY_NORMAL,
+               name: str = "ncbi", timeout: float = 30) -> Future:
+        """Queue a GET; the future resolves to the final ``requests.Response``"""
+        params = dict(params or {})
+        if self.api_key and urlparse(url).hostname == EUTILS_HOST and 'api_key=' not in url:
+            params.setdefault('api_key', self.api_key)
+        return self.call(lambda: self.session.get(url, params=params, timeout=timeout), priority, name)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, priority: int = PRIORITY_NORMAL,
+            name: str = "ncbi", timeout: float = 30) -> requests.Response:
+        return self.submit(url, params, priority, name, timeout).result()
+
+    def _put(self, job: _Job) -> None:
+        job.queued = time.perf_counter()
+        self._queue.put(job)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="ncbi-dispatch", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch(self) -> None:
+        while True:
+            # Take a worker slot first so the job chosen is the most urgent one when a worker is free
+            self._slots.acquire()
+            job = self._queue.get()
+            if job.attempt == 0 and not job.future.set_running_or_notify_cancel():
+                self._slots.release()
+                continue
+            self.bucket.acquire()
+            METRICS.observe("ncbi.queue_wait", time.perf_counter() - job.queued)
+            self._executor.submit(self._run, job)
+
+    def _retry(self, job: _Job, reason: str, delay: float) -> bool:
+        if job.attempt >= self.max_retries:
+            return False
+        METRICS.count("ncbi.retries")
+        print(f"NCBI {job.name} request {reason}, retrying in {delay:.1f}s")
+        job.attempt += 1
+        threading.Timer(delay, self._put, args=(job,)).start()
+        return True
+
+    def _run(self, job: _Job) -> None:
+        try:
+            METRICS.count("ncbi.requests")
+            delay = self.backoff * 2 ** job.attempt
+            try:
+                with METRICS.timer(f"http.{job.name}") as span:
+                    result = job.fn()
+                    if isinstance(result, requests.Response):
+                        span.add(bytes_in=len(result.content))
+            except requests.exceptions.RequestException as e:
+                if not self._retry(job, f"failed ({e})", delay):
+                    job.future.set_exception(e)
+                return
+
+            if isinstance(result, requests.Response) and result.status_code in RETRY_STATUSES:
+                if result.status_code == 429:
+                    METRICS.count("ncbi.throttled")
+                    retry_after = result.headers.get('Retry-After', '')
+                    delay = max(delay, float(retry_after)) if retry_after.isdigit() else delay
+                    self.bucket.pause(delay)
+                if self._retry(job, f"returned {result.status_code}", delay):
+                    return
+            job.future.set_result(result)
+        except Exception as e:
+            job.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+_scheduler: Optional[NCBIScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> NCBIScheduler:
+    """The shared scheduler, keyed from NCBI_API_KEY when that is set"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = NCBIScheduler(api_key=os.getenv('NCBI_API_KEY'))
+        return _scheduler
@@ -2,13 +2,10 @@ import pandas as pd
 import pickle 
 import csv
 import json
-import pmidcite
 import requests
 import time
-import metapub as mp
 import os
 from typing import Dict, List, Any, Tuple, Optional, Union
-from pmidcite.icite.downloader import get_downloader
 from src.pubmed.pmc_scrape_func import (
     parse_bioc_xml, 
     parse_bioc_xml_year, 
@@ -16,33 +13,84 @@ from src.pubmed.pmc_scrape_func import (
     parse_bioc_xml_authors, 
     parse_bioc_xml_title
 )
+from src.corpus.inverted_index import InvertedIndex
+from src.corpus.text_store import FullTextStore
+from src.pubmed import ncbi
+from src.pipeline.metrics import METRICS
+from src.pubmed.records import PaperRecord, content_digest, parse_year, record_year
+from src.pubmed.sections import SectionFilter, flatten_with_sections
+from src.pubmed.stats import compute_stats, counts_to_frame, stats_keys
+from src.pubmed.term_cache import TermCountCache, fingerprint_terms
+
+YEARS = ["2018", "2019", "2020", "2021", "2022", "2023", "2024"]
+DATASET_TERMS = [
+    ["MIMIC", "Medical Information Mart for Intensive Care"],
+    ["eICU", "eICU Collaborative Research Database"],
+    ["UK Biobank"],
+    ["Chest X-Ray14", "NIH Chest X-ray"],
+    ["ADNI", "Alzheimer's Disease Neuroimaging Initiative"],
+    ["PhysioNet"],
+    ["OASIS", "Open Access Series of Imaging Studies"],
+    ["TCGA", "The Cancer Genome Atlas Program"],
+    ["GDC", "Genomic Data Commons"],
+    ["SEER", "Surveilance Epidemiology and End Results"],
+    ["TUH EEG Corpus", "TUEG"],
+    ["TUH Abnormal EEG Corpus", "TUAB"],
+    ["TUH EEG Artifact Corpus", "TUAR"],
+    ["TUH EEG Epilepsy Corpus", "TUEP"],
+    ["TUH EEG Events Corpus", "TUEV"],
+    ["TUH EEG Seizure Corpus", "TUSV"],
+    ["TUH EEG Slowing Corpus", "TUSL"]
+]
+CODE_TERMS = ["github", "gitlab", "zenodo", "colab", "bitbucket", "docker", "jupyter", "kaggle"]
+AI_TERMS = ["AI", "Artificial Intelligence", "Machine Learning", "Deep Learning", "Neural Network"]
 
 class PubMedProcessor:
-    def __init__(self, venue: str = "pubmed"):
+    def __init__(self, venue: str = "pubmed", section_filter: Optional[SectionFilter] = None):
         """
         Initialize the PubMed processor with venue and citation downloader.
         
         Args:
             venue (str): The venue to process ('pubmed' or 'amia')
+            section_filter (SectionFilter): Restrict mention counting to some BioC
+                section types, e.g. SectionFilter.of(include=["METHODS"]). Counts
+                use every flattened passage when None.
         """
         self.venue = venue
-        print(f"pmidcite version: {pmidcite.__version__}")
-        self.dnldr = get_downloader()
+        self.section_filter = section_filter
+        # The iCite downloader is created on the first citation lookup
+        self._dnldr = None
         self.dataset_mapping = {}
+        self.content_store: Optional[FullTextStore] = None
+        self.term_cache = TermCountCache(f"data/processed/{venue}_term_cache.pkl")
         
         # Create necessary directories
         os.makedirs(f"{venue}_content", exist_ok=True)
         os.makedirs("processed_data", exist_ok=True)
 
+    @property
+    def dnldr(self):
+        if self._dnldr is None:
+            import pmidcite
+            from pmidcite.icite.downloader import get_downloader
+            print(f"pmidcite version: {pmidcite.__version__}")
+            self._dnldr = get_downloader()
+        return self._dnldr
+
+    def citation_count(self, pmid: str) -> int:
+        """Citation count from the term count cache, querying iCite on a miss."""
+        METRICS.cache("citation_cache", self.term_cache.has_citation(pmid))
+        return self.term_cache.citation(pmid, self.get_citation_count)
+
     def get_citation_count(self, pmid: str) -> int:
         """Get citation count for a given PMID."""
-        nih_entry = self.dnldr.get_icite(pmid)
+        with METRICS.timer("http.icite"):
+            nih_entry = self.dnldr.get_icite(pmid)
         nih_dict = nih_entry.get_dict()
         return nih_dict["citation_count"]
 
     def pmid2biocxml(self, pmid: Union[str, List[str]]) -> List[str]:
         """Fetch BioC XML for given PMIDs."""
-        start_time = time.time()
         base_url = "https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_xml/{pmid}/unicode"
         
         if not isinstance(pmid, list):
@@ -50,21 +98,27 @@ class PubMedProcessor:
             
         res = []
         api_status = "up"
+        # Everything is queued up front; the shared NCBI scheduler paces the requests
+        futures = [
+            ncbi.get_scheduler().submit(base_url.format(pmid=pmid_), priority=ncbi.PRIORITY_LOW,
+                                        name="bioc", timeout=10)
+            for pmid_ in pmid
+        ]
         
-        for pmid_ in pmid:
-            request_url = base_url.format(pmid=pmid_)
+        for pmid_, future in zip(pmid, futures):
             try:
-                response = requests.get(request_url, timeout=10)
+                response = future.result()
                 response.raise_for_status()
                 res.append(response.text)
-                print(f"PMID {pmid_}: Response length = {len(response.text)} characters")
             except requests.exceptions.RequestException as e:
+                METRICS.count("http.bioc.errors")
                 print(f"Error accessing the API for PMID {pmid_}: {str(e)}")
                 api_status = "down"
+                for pending in futures:
+                    pending.cancel()
                 break
                 
-        end_time = time.time()
-        print(f"pmid2biocxml execution time: {end_time - start_time:.2f} seconds")
+        print(f"Fetched BioC XML for {len(res)}/{len(pmid)} PMIDs")
         print(f"API Status: {'Up' if api_status == 'up' else 'Down'}")
         return res
 
@@ -86,39 +140,42 @@ class PubMedProcessor:
         """Flatten passage content into single string."""
         return " ".join(section["content"] for section in bioc_dict["passage"])
 
-    def process_bioc_xml(self, bioc_xmls: List[str], read_pmids: List[str]) -> Dict:
-        """Process BioC XML data into structured dictionary."""
+    def process_bioc_xml(self, bioc_xmls: List[str], read_pmids: List[str]) -> Dict[str, PaperRecord]:
+        """Process BioC XML data into PaperRecords keyed by PMID."""
         pubmed_dates = [parse_bioc_xml_year(xml) for xml in bioc_xmls]
         
         my_processed_dict = {}
-        parse_start_time = time.time()
         
         for idx, bioc_xml in enumerate(bioc_xmls):
             pmid = read_pmids[idx]
             year = pubmed_dates[idx]
-            print(f"Processing {self.venue.upper()} ID:", pmid)
             
             if isinstance(bioc_xml, str) and len(bioc_xml) > 0 and "xml" in bioc_xml:
-                dictionary = parse_bioc_xml(bioc_xml)
-                my_processed_dict[pmid] = {
-                    "content": self.flatten_passages(dictionary),
-                    "year": year,
-                    "title": parse_bioc_xml_title(bioc_xml),
-                    "authors": parse_bioc_xml_authors(bioc_xml),
-                    "abstract": parse_bioc_xml_abstract(bioc_xml)
-                }
+                with METRICS.timer("xml.parse", bytes_in=len(bioc_xml)) as span:
+                    dictionary = parse_bioc_xml(bioc_xml)
+                    content, sections = flatten_with_sections(dictionary["passage"])
+                    my_processed_dict[pmid] = PaperRecord(
+                        pmid=pmid,
+                        year=parse_year(year),
+                        title=parse_bioc_xml_title(bioc_xml),
+                        authors=parse_bioc_xml_authors(bioc_xml),
+                        abstract=parse_bioc_xml_abstract(bioc_xml),
+                        content=content,
+                        sections=sections,
+                        content_hash=content_digest(content, sections),
+                    )
+                    span.add(bytes_out=len(content))
             else:
+                METRICS.count("xml.parse.invalid")
                 print(f"Warning: Empty or invalid BioC XML for {self.venue.upper()} ID {pmid}")
         
-        parse_end_time = time.time()
-        print(f"parse_bioc_xml execution time: {parse_end_time - parse_start_time:.2f} seconds")
         return my_processed_dict
 
     def get_papers_year(self, dictionary: Dict, year: str) -> Dict:
         """Filter papers by year."""
         return {
             pmid: record for pmid, record in dictionary.items()
-            if record["year"] == year
+            if record_year(record) == parse_year(year)
         }
 
     @staticmethod
@@ -147,65 +204,142 @@ class PubMedProcessor:
             for key, terms in self.dataset_mapping.items()
         }
 
+    def save_content_store(self, records: Dict[str, PaperRecord], prefix: str) -> None:
+        """
+        Move flattened paper content into an mmap-able full-text store at ``prefix``.
+
+        The records keep their metadata, section spans and content hash, but their
+        ``content`` is emptied; it is read back from the store via ``get_content``.
+        """
+        FullTextStore.write(prefix, ((pmid, record["content"]) for pmid, record in records.items()))
+        for record in records.values():
+            record.content = ""
+        self.open_content_store(prefix)
+        print(f"Saved {len(records)} papers to full-text store {prefix}.bin")
+
+    def open_content_store(self, prefix: str) -> FullTextStore:
+        """Open a full-text store so records without in-memory content can be counted."""
+        if self.content_store is not None:
+            self.content_store.close()
+        self.content_store = FullTextStore(prefix)
+        return self.content_store
+
+    def load_records(self) -> Dict[str, PaperRecord]:
+        """
+        Load the parsed paper records and open their full-text store.
+
+        Text is only paged in from the store for papers whose counts are not cached.
+        Records pickled before the store existed still carry their content inline.
+        """
+        records = self.load_from_pickle(f"data/raw/{self.venue}/paper_content_flattened.pkl")
+        prefix = f"data/raw/{self.venue}/paper_content"
+        if os.path.exists(f"{prefix}.idx.json"):
+            self.open_content_store(prefix)
+        return records
+
+    def build_inverted_index(self, records: Dict[str, PaperRecord], filename: str) -> InvertedIndex:
+        """
+        Update the opt-in phrase index at ``filename`` for ad-hoc term queries.
+
+        Only papers whose content hash changed since the last build are read from
+        the store and re-indexed. Counting does not use the index, so the
+        substring semantics of ``count_mentions`` are unchanged.
+        """
+        index = InvertedIndex.load_or_create(filename)
+        with METRICS.timer("index.update") as span:
+            indexed = index.update(
+                {pmid: self.get_content_hash(pmid, record) for pmid, record in records.items()},
+                lambda pmid: self.get_content(pmid, records[pmid]),
+            )
+            span.add(items=indexed)
+        index.save(filename)
+        print(f"Indexed {indexed} new or changed papers; inverted index covers {len(index)} papers at {filename}")
+        return index
+
+    def get_content(self, pmid: str, record: Any) -> Optional[str]:
+        """Paper content from the record, falling back to the full-text store."""
+        content = record["content"]
+        if not content and self.content_store is not None:
+            content = self.content_store.get(pmid)
+        return content
+
+    def get_content_hash(self, pmid: str, record: Any) -> str:
+        """Content hash from the record, computed for records saved before it was stored."""
+        return record.get("content_hash") or content_digest(self.get_content(pmid, record), record.get("sections", ()))
+
+    def get_counted_text(self, pmid: str, record: Any) -> Optional[str]:
+        """Content restricted to the sections selected by ``section_filter``."""
+        content = self.get_content(pmid, record)
+        if self.section_filter is None:
+            return content
+        return self.section_filter.apply(content, record.get("sections", ()))
+
+    def count_columns(self) -> Dict[str, List[str]]:
+        """Term list behind every per-paper count column."""
+        return {**self.dataset_mapping, "code": CODE_TERMS, "ai": AI_TERMS}
+
     def get_counts_per_paper(self, year_papers: Dict) -> Dict:
-        """Get counts of various metrics per paper."""
+        """Get counts of various metrics per paper, reusing cached columns whose terms are unchanged."""
         counts = {}
-        code_terms = ["github", "gitlab", "zenodo", "colab", "bitbucket", "docker", "jupyter", "kaggle"]
+        columns = self.count_columns()
+        sections = self.section_filter.fingerprint() if self.section_filter else None
+        fingerprints = {name: fingerprint_terms(terms, sections) for name, terms in columns.items()}
         
         for pmid, record in year_papers.items():
-            text = record["content"]
-            dataset_counts = self.count_mentions_grouped(text)
+            self.term_cache.check_content(pmid, self.get_content_hash(pmid, record))
+            text = None
+            row = {}
+            for name, terms in columns.items():
+                value = self.term_cache.lookup(fingerprints[name], pmid)
+                METRICS.cache("term_cache", value is not None)
+                if value is None:
+                    if text is None:
+                        text = self.get_counted_text(pmid, record)
+                    with METRICS.timer("terms.count", bytes_in=len(text or "")):
+                        value = self.term_cache.store(fingerprints[name], pmid, self.count_mentions(text, terms))
+                row[name] = value
             
+            dataset_counts = {key: row[key] for key in self.dataset_mapping}
             counts[pmid] = {
                 **dataset_counts,
                 "big_datasets": sum(dataset_counts.values()),
-                "code": self.count_mentions(text, code_terms),
-                "ai": self.count_mentions(text, [
-                    "AI", "Artificial Intelligence", "Machine Learning",
-                    "Deep Learning", "Neural Network"
-                ]),
-                "citation_count": self.get_citation_count(pmid)
+                "code": row["code"],
+                "ai": row["ai"],
+                "citation_count": self.citation_count(pmid)
             }
-            print(counts[pmid])
         return counts
 
     def get_analysis(self, counts: Dict) -> Dict:
         """Generate analysis statistics from counts."""
-        stats = {
-            'total_files': len(counts),
-            'files_with_github': sum(1 for r in counts.values() if r['code'] > 0),
-            'files_without_github': sum(1 for r in counts.values() if r['code'] == 0),
-            'total_github_mentions': sum(r['code'] for r in counts.values()),
-            'files_with_public_dataset': sum(1 for r in counts.values() if r['big_datasets'] > 0),
-            'total_dataset_mentions': sum(r['big_datasets'] for r in counts.values()),
-            'files_with_github_and_dataset': sum(1 for r in counts.values() if r['code'] > 0 and r['big_datasets'] > 0),
-            'files_with_github_and_without_dataset': sum(1 for r in counts.values() if r['code'] > 0 and r['big_datasets'] == 0),
-            'files_with_AI': sum(1 for r in counts.values() if r['ai'] > 0),
-            'total_citations': sum(r['citation_count'] for r in counts.values() if r['citation_count'] is not None),
-        }
-        
-        # Add dataset-specific statistics
-        for key in self.dataset_mapping.keys():
-            stats[f'files_with_{key}'] = sum(1 for r in counts.values() if r[key] > 0)
-            stats[f'total_{key}_mentions'] = sum(r[key] for r in counts.values())
-        
-        return stats
+        frame = counts_to_frame(counts, year="all")
+        return compute_stats(frame, self.dataset_mapping.keys(), years=["all"])["all"]
 
     def analyze_papers_across_years(self, dictionary: Dict, years: List[str]) -> Tuple[Dict, Dict]:
         """Analyze papers across multiple years."""
-        all_stats = {}
-        all_paper_data = {}
-        
+        # One pass over the corpus buckets papers by year instead of one filter per year
+        wanted = {parse_year(year): year for year in years}
+        papers_by_year = {year: {} for year in years}
+        for pmid, record in dictionary.items():
+            year = wanted.get(record_year(record))
+            if year is not None:
+                papers_by_year[year][pmid] = record
+
+        all_paper_data = {
+            year: self.get_counts_per_paper(papers)
+            for year, papers in papers_by_year.items()
+        }
+
+        # Compute all statistics with a single groupby over year
+        frames = [counts_to_frame(counts, year) for year, counts in all_paper_data.items() if counts]
+        frame = pd.concat(frames) if frames else pd.DataFrame(columns=["year"])
+        all_stats = compute_stats(frame, self.dataset_mapping.keys(), years=years)
+
         for year in years:
-            papers = self.get_papers_year(dictionary, year)
-            counts_each_paper = self.get_counts_per_paper(papers)
-            analysis = self.get_analysis(counts_each_paper)
-            
-            all_stats[year] = analysis 
-            all_paper_data[year] = counts_each_paper
-            
-            print(f"Year: {year}, Papers: {len(papers)}")
-            print(analysis)
+            print(f"Year: {year}, Papers: {len(papers_by_year[year])}")
+            print(all_stats[year])
+
+        self.term_cache.save()
+        print(f"Term count cache: {self.term_cache.hits} hits, {self.term_cache.misses} misses")
             
         return all_stats, all_paper_data
 
@@ -213,15 +347,17 @@ class PubMedProcessor:
         """Save analysis results to files."""
         csv_file_path = f"data/processed/{self.venue}_stats.csv"
         # Save stats to CSV
-        self.write_stats_to_csv(all_stats, 
-                              csv_file_path)
+        with METRICS.timer("csv.write"):
+            self.write_stats_to_csv(all_stats, 
+                                  csv_file_path)
         
 
         # Save paper data with full information
-        self.save_paper_data(all_paper_data, 
-                           f"data/processed/{self.venue}_paper_data.json",
-                           f"data/processed/{self.venue}_paper_data.pkl",
-                           bioc_dicts)
+        with METRICS.timer("paper_data.write"):
+            self.save_paper_data(all_paper_data, 
+                               f"data/processed/{self.venue}_paper_data.json",
+                               f"data/processed/{self.venue}_paper_data.pkl",
+                               bioc_dicts)
 
         return csv_file_path
     
@@ -233,20 +369,7 @@ class PubMedProcessor:
             header = ['Statistic'] + list(all_stats.keys())
             writer.writerow(header)
             
-            stats_keys = [
-                'total_files', 
-                'files_with_github', 'files_without_github', 'total_github_mentions',
-                'files_with_public_dataset', 'total_dataset_mentions',
-                'files_with_github_and_dataset',
-                'files_with_github_and_without_dataset',
-                'files_with_AI',
-                'total_citations'
-            ]
-            
-            for key in self.dataset_mapping.keys():
-                stats_keys.extend([f'files_with_{key}', f'total_{key}_mentions'])
-            
-            for key in stats_keys:
+            for key in stats_keys(self.dataset_mapping.keys()):
                 row = [key.replace('_', ' ').title()]
                 for year in all_stats.keys():
                     row.append(all_stats[year].get(key, ''))
@@ -254,25 +377,54 @@ class PubMedProcessor:
 
     def save_paper_data(self, all_paper_data: Dict, json_filename: str, 
                        pkl_filename: str, bioc_dicts: Dict) -> None:
-        """Save paper data to JSON and pickle files with full information."""
-        full_paper_data = {
-            year: {
-                pmid: {
-                    **data,
-                    "title": bioc_dicts[pmid]["title"],
-                    "authors": bioc_dicts[pmid]["authors"],
-                    "abstract": bioc_dicts[pmid]["abstract"]
-                }
-                for pmid, data in papers.items()
-            }
-            for year, papers in all_paper_data.items()
-        }
-        
+        """
+        Save paper data to JSON and pickle files with full information.
+
+        The JSON is streamed one paper at a time so no merged copy of the corpus is
+        built in memory. The pickle stores the counts next to the shared records as
+        {"counts": {year: {pmid: counts}}, "papers": {pmid: PaperRecord}}.
+        """
         with open(json_filename, 'w') as f:
-            json.dump(full_paper_data, f, indent=4)
-        
+            f.write("{")
+            for year_idx, (year, papers) in enumerate(all_paper_data.items()):
+                f.write(f"{',' if year_idx else ''}\n    {json.dumps(str(year))}: {{")
+                for paper_idx, (pmid, data) in enumerate(papers.items()):
+                    paper = {**data, **bioc_dicts[pmid].metadata()}
+                    f.write(f"{',' if paper_idx else ''}\n        {json.dumps(str(pmid))}: {json.dumps(paper)}")
+                f.write("\n    }")
+            f.write("\n}\n")
+
+        papers = {pmid: bioc_dicts[pmid] for counts in all_paper_data.values() for pmid in counts}
         with open(pkl_filename, 'wb') as f:
-            pickle.dump(full_paper_data, f)
+            pickle.dump({"counts": all_paper_data, "papers": papers}, f)
+
+    @staticmethod
+    def load_paper_data(pkl_filename: str) -> Dict:
+        """
+        Load a paper data pickle as {"counts": ..., "papers": ...}.
+
+        Older pickles hold {year: {pmid: {**counts, title, authors, abstract}}};
+        they are split into counts and PaperRecords without content.
+        """
+        with open(pkl_filename, 'rb') as f:
+            data = pickle.load(f)
+        if set(data) == {"counts", "papers"}:
+            return data
+
+        metadata_keys = ("title", "authors", "abstract")
+        counts, papers = {}, {}
+        for year, year_papers in data.items():
+            counts[year] = {}
+            for pmid, paper in year_papers.items():
+                counts[year][pmid] = {key: value for key, value in paper.items() if key not in metadata_keys}
+                papers[pmid] = PaperRecord(
+                    pmid=pmid,
+                    year=parse_year(year),
+                    title=paper.get("title"),
+                    authors=paper.get("authors") or [],
+                    abstract=paper.get("abstract") or "",
+                )
+        return {"counts": counts, "papers": papers}
 
     @staticmethod
     def save_to_pickle(data: Any, filename: str) -> None:
@@ -286,59 +438,83 @@ class PubMedProcessor:
         with open(filename, 'rb') as f:
             return pickle.load(f)
 
-    def process_venue(self, n: int = 10000, filename = "") -> None:
+    def fetch_bioc(self, pmids: List[str]) -> List[str]:
+        """Fetch BioC XML for the PMIDs and save it raw."""
+        bioc_xmls = self.pmid2biocxml(pmids)
+        self.save_to_pickle(bioc_xmls, f"data/raw/{self.venue}/bioc_xmls.pkl")
+        return bioc_xmls
+
+    def parse_bioc(self, bioc_xmls: List[str], pmids: List[str]) -> Dict[str, PaperRecord]:
+        """Build paper records from BioC XML and save them with their content store."""
+        bioc_dicts = self.process_bioc_xml(bioc_xmls, pmids)
+        # The store takes the content, so the pickle only holds metadata and section spans
+        self.save_content_store(bioc_dicts, f"data/raw/{self.venue}/paper_content")
+        self.save_to_pickle(bioc_dicts, f"data/raw/{self.venue}/paper_content_flattened.pkl")
+        print(f"Processed {len(bioc_dicts)} papers")
+        return bioc_dicts
+
+    def fetch_citations(self, bioc_dicts: Dict[str, PaperRecord]) -> str:
+        """
+        Look up iCite citation counts for every paper and write them to CSV.
+
+        Counts are always fetched fresh here and land in the term count cache,
+        so the analysis step that follows reads them instead of querying iCite again.
+        """
+        filename = f"data/processed/{self.venue}_citations.csv"
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['pmid', 'citation_count'])
+            for pmid in bioc_dicts:
+                writer.writerow([pmid, self.term_cache.citation(pmid, self.get_citation_count, refresh=True)])
+        self.term_cache.save()
+        return filename
+
+    def analyze(self, bioc_dicts: Dict[str, PaperRecord], dataset_terms: Optional[List[List[str]]] = None,
+                years: Optional[List[str]] = None) -> str:
+        """Count terms per paper, compute per-year statistics and save them."""
+        self.create_dataset_mapping(dataset_terms or DATASET_TERMS)
+        all_stats, all_paper_data = self.analyze_papers_across_years(bioc_dicts, years or YEARS)
+        return self.save_results(all_stats, all_paper_data, bioc_dicts)
+
+    def process_venue(self, n: int = 10000, filename = "", build_index: bool = False) -> None:
         """
         Process the entire venue workflow.
         
         Args:
             n (int): Number of PMIDs to process
+            build_index (bool): Also update the inverted index for ad-hoc phrase queries
         """
         start_time = time.time()
         print(f"Starting BioC scraping for venue: {self.venue.upper()}")
 
         # Step 1: Read PMIDs and fetch BioC XML
         # filename = f"{self.venue}_ai_ml_pmids.csv"
-        read_pmids = self.read_pmids_from_csv(filename)
-        bioc_xmls = self.pmid2biocxml(read_pmids[:n])
-        self.save_to_pickle(bioc_xmls, f"data/raw/{self.venue}/bioc_xmls.pkl")
+        read_pmids = self.read_pmids_from_csv(filename)[:n]
+        bioc_xmls = self.fetch_bioc(read_pmids)
 
         # Step 2: Process BioC XML
-        bioc_xmls = self.load_from_pickle(f"data/raw/{self.venue}/bioc_xmls.pkl")
-        my_processed_dict = self.process_bioc_xml(bioc_xmls, read_pmids[:n])
-        self.save_to_pickle(my_processed_dict, f"data/raw/{self.venue}/paper_content_flattened.pkl")
+        bioc_dicts = self.parse_bioc(bioc_xmls, read_pmids)
+        del bioc_xmls  # raw XML is not needed once the records are built
+        if build_index:
+            self.build_inverted_index(bioc_dicts, f"data/raw/{self.venue}/inverted_index.pkl")
 
-        # Step 3: Analyze processed data
-        bioc_dicts = self.load_from_pickle(f"data/raw/{self.venue}/paper_content_flattened.pkl")
-        print(f"Processed {len(bioc_dicts)} papers")
-        
-        years = ["2018", "2019", "2020", "2021", "2022", "2023", "2024"]
-        dataset_terms = [
-            ["MIMIC", "Medical Information Mart for Intensive Care"],
-            ["eICU", "eICU Collaborative Research Database"],
-            ["UK Biobank"],
-            ["Chest X-Ray14", "NIH Chest X-ray"],
-            ["ADNI", "Alzheimer's Disease Neuroimaging Initiative"],
-            ["PhysioNet"],
-            ["OASIS", "Open Access Series of Imaging Studies"],
-            ["TCGA", "The Cancer Genome Atlas Program"],
-            ["GDC", "Genomic Data Commons"],
-            ["SEER", "Surveilance Epidemiology and End Results"],
-            ["TUH EEG Corpus", "TUEG"],
-            ["TUH Abnormal EEG Corpus", "TUAB"],
-            ["TUH EEG Artifact Corpus", "TUAR"],
-            ["TUH EEG Epilepsy Corpus", "TUEP"],
-            ["TUH EEG Events Corpus", "TUEV"],
-            ["TUH EEG Seizure Corpus", "TUSV"],
-            ["TUH EEG Slowing Corpus", "TUSL"]
-        ]
-        
-        # Create dataset mapping and analyze papers
-        self.create_dataset_mapping(dataset_terms)
-        all_stats, all_paper_data = self.analyze_papers_across_years(bioc_dicts, years)
-        
-        # Save results
-        processed_filepath = self.save_results(all_stats, all_paper_data, bioc_dicts)
+        # Step 3: Refresh iCite citation counts
+        self.fetch_citations(bioc_dicts)
+
+        # Step 4: Analyze processed data and save results
+        processed_filepath = self.analyze(bioc_dicts)
         
         end_time = time.time()
         print(f"Total execution time: {end_time - start_time:.2f} seconds")
-        return processed_filepath
\ No newline at end of file
+        return processed_filepath
+
+    def reanalyze(self, dataset_terms: Optional[List[List[str]]] = None,
+                  years: Optional[List[str]] = None) -> str:
+        """
+        Regenerate statistics from the saved records after editing the term lists.
+
+        Only term groups whose fingerprint changed are recounted; all other columns
+        come from the term count cache, and so do iCite citation counts younger
+        than its TTL.
+        """
+        return self.analyze(self.load_records(), dataset_terms, years)
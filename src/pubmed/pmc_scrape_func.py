@@ -1,16 +1,3 @@
-import requests
-def pmid2biocxml(pmid):
-    base_url = "https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_xml/{pmid}/unicode"
-    if not isinstance(pmid, list): pmid = [pmid]
-    res = []
-    for pmid_ in pmid:
-        request_url = base_url.format(pmid=pmid_)
-        response = requests.get(request_url)
-        res.append(response.text)
-    return res
-
-
-
 """
 Parsers for PubMed XML
 Adapted from "https://github.com/titipata/pubmed_parser/blob/master/pubmed_parser/pubmed_oa_parser.py".
@@ -36,6 +23,10 @@ import xml.etree.ElementTree as ET
 from unidecode import unidecode
 import pandas as pd
 import tenacity
+from concurrent.futures import as_completed
+from src.pipeline.metrics import METRICS
+from src.pubmed.id_map import default_cache
+from src.pubmed.ncbi import PRIORITY_LOW, PRIORITY_NORMAL, get_scheduler
 
 
 
@@ -55,6 +46,10 @@ __all__ = [
 ]
 
 BATCH_REQUEST_SIZE = 400
+# The PMC ID converter accepts at most 200 IDs per request
+IDCONV_CHUNK_SIZE = 200
+IDCONV_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/"
+OA_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi"
 SUMMARY_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id="
 PUBMED_EFETCH_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pubmed&id="
 
@@ -164,45 +159,94 @@ def stringify_affiliation_rec(node):
 
 "Start of the other APIs"
 # utilities to automate the acquisition
-def pmid2pmcid(pmid):
-    base_url = "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/?ids={ids}"
+def _parse_idconv(chunk, response):
+    """Turn one ID-converter reply into (pmid, pmcid, doi) rows"""
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    rows = {}
+    for rec in soup.find_all("record"):
+        requested = rec.get("requested-id") or rec.get("pmid")
+        if requested:
+            rows[requested] = (requested, rec.get("pmcid", None), rec.get("doi", None))
+    # IDs the converter did not echo back have no PMC copy either
+    return [rows.get(pmid_, (pmid_, None, None)) for pmid_ in chunk]
+
+def pmid2pmcid(pmid, cache=None):
+    """
+    PMCID of each PMID (None when it has none), in input order.
+
+    Unseen PMIDs are converted IDCONV_CHUNK_SIZE at a time, concurrently through
+    the NCBI scheduler, and recorded in the ID-mapping table as each reply
+    arrives so later calls resolve from it without touching the network. PMIDs
+    of a failed request come back as None and are not recorded.
+    """
     if not isinstance(pmid, list): pmid = [pmid]
-    pmid_str = ",".join(pmid)
-    request_url = base_url.format(ids=pmid_str)
-    response = requests.get(request_url)
+    pmid = [str(p) for p in pmid]
+    cache = cache or default_cache()
+    known = cache.lookup_pmids(pmid)
+    missing = list(dict.fromkeys(p for p in pmid if p not in known))
+    METRICS.count("id_map.hits", len(pmid) - len(missing))
+    METRICS.count("id_map.misses", len(missing))
+
+    chunks = [missing[i:i + IDCONV_CHUNK_SIZE] for i in range(0, len(missing), IDCONV_CHUNK_SIZE)]
+    futures = {
+        get_scheduler().submit(IDCONV_URL, params={"ids": ",".join(chunk)}, name="idconv"): chunk
+        for chunk in chunks
+    }
+    for future in as_completed(futures):
+        chunk = futures[future]
+        try:
+            rows = _parse_idconv(chunk, future.result())
+        except Exception as e:
+            METRICS.count("id_map.errors", len(chunk))
+            print(f"ID conversion failed for {len(chunk)} PMIDs starting at {chunk[0]}: {e}")
+            continue
+        cache.store_pmids(rows)
+        known.update((pmid_, (pmcid, doi)) for pmid_, pmcid, doi in rows)
+    return [known.get(p, (None, None))[0] for p in pmid]
+
+def _parse_oa(response):
+    response.raise_for_status()
     soup = BeautifulSoup(response.text, "html.parser")
-    found = soup.find_all("record")
-    res = []
-    for rec in found:
-        res.append(rec.get("pmcid", None))
-    return res
-    
-def pmcid2ftplink(pmcid):
-    base_url = "https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi?id={pmcid}"
+    pdf_links = soup.find_all("link", attrs={"format": "tgz"})
+    pdf_href_list = [link.get("href") for link in pdf_links]
+    return pdf_href_list[0] if len(pdf_href_list) > 0 else None
+
+def pmcid2ftplink(pmcid, cache=None):
+    """
+    OA package (tgz) link of each PMCID, None when it has none, in input order.
+
+    The OA service answers one ID per request, so unseen PMCIDs are queued on
+    the NCBI scheduler together and each answer is stored in the ID-mapping
+    table as it arrives. A failed lookup comes back as None and is not recorded.
+    """
     if not isinstance(pmcid, list): pmcid = [pmcid]
-    res = []
-    for pmcid_ in pmcid:
-        request_url = base_url.format(pmcid=pmcid_)
-        response = requests.get(request_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        pdf_links = soup.find_all("link", attrs={"format": "tgz"})
-        pdf_href_list = [link.get("href") for link in pdf_links]
-        if len(pdf_href_list) > 0:
-            pdf_href = pdf_href_list[0]
-        else:
-            pdf_href = None
-        res.append(pdf_href)
-    return res
+    cache = cache or default_cache()
+    known = cache.lookup_oa(pmcid)
+    missing = list(dict.fromkeys(p for p in pmcid if p not in known))
+    METRICS.count("oa_links.hits", len(pmcid) - len(missing))
+    METRICS.count("oa_links.misses", len(missing))
+
+    futures = {get_scheduler().submit(OA_URL, params={"id": pmcid_}, name="oa"): pmcid_ for pmcid_ in missing}
+    for future in as_completed(futures):
+        pmcid_ = futures[future]
+        try:
+            link = _parse_oa(future.result())
+        except Exception as e:
+            METRICS.count("oa_links.errors")
+            print(f"OA lookup failed for {pmcid_}: {e}")
+            continue
+        cache.store_oa([(pmcid_, link)])
+        known[pmcid_] = link
+    return [known.get(p) for p in pmcid]
 
 def pmid2biocxml(pmid):
     base_url = "https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_xml/{pmid}/unicode"
     if not isinstance(pmid, list): pmid = [pmid]
-    res = []
-    for pmid_ in pmid:
-        request_url = base_url.format(pmid=pmid_)
-        response = requests.get(request_url)
-        res.append(response.text)
-    return res
+    # Queue every PMID at once so the scheduler keeps NCBI busy at the allowed rate
+    scheduler = get_scheduler()
+    futures = [scheduler.submit(base_url.format(pmid=pmid_), priority=PRIORITY_LOW, name="bioc") for pmid_ in pmid]
+    return [future.result().text for future in futures]
     
 def ftplink2local(ftplink, output_dir):
     if not isinstance(ftplink, list):
@@ -222,9 +266,12 @@ def ftplink2local(ftplink, output_dir):
 
         output_path = os.path.join(output_dir, "PMC{}.tar.gz".format(tgt_pmcid))
             
-        with closing(urllib.request.urlopen(link)) as r:
-            with open(output_path, 'wb') as f:
-                shutil.copyfileobj(r, f)
+        def download(link=link, output_path=output_path):
+            with closing(urllib.request.urlopen(link)) as r:
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(r, f)
+
+        get_scheduler().call(download, priority=PRIORITY_LOW, name="ftp").result()
                 
         # unzip the file under the folder
         import tarfile
@@ -1069,9 +1116,10 @@ def _retrieve_abstract_from_efetch(pmids, api_key):
     for i in range(0, len(pmids), BATCH_REQUEST_SIZE):
         pmid_subset = pmids[i:i+BATCH_REQUEST_SIZE]
         pmid_str = ','.join(pmid_subset)
-        query = PUBMED_EFETCH_BASE_URL + pmid_str + "&retmode=xml" + "&api_key=" + api_key
-        logger.info(f"Abstract Query: {query}")
-        response = get_response_with_retry(query)
+        query = PUBMED_EFETCH_BASE_URL + pmid_str + "&retmode=xml"
+        if api_key:
+            query += "&api_key=" + api_key
+        response = get_scheduler().get(query, priority=PRIORITY_NORMAL, name="efetch")
         if response.status_code != 200:
             continue
         else:
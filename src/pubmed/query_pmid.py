@@ -2,16 +2,23 @@ import csv
 from Bio import Entrez
 import time
 from datetime import datetime
+from src.pubmed.ncbi import PRIORITY_HIGH, get_scheduler
 
 def search_pubmed(query, max_results=100, email="johnwu3@illinois.edu"):
     Entrez.email = email  # Always tell NCBI who you are
-    handle = Entrez.esearch(db="pubmed", 
-                            sort="relevance", 
-                            retmax=max_results,
-                            retmode="xml", 
-                            term=query)
-    results = Entrez.read(handle)
-    return results
+    scheduler = get_scheduler()
+    Entrez.api_key = scheduler.api_key
+
+    def esearch():
+        handle = Entrez.esearch(db="pubmed", 
+                                sort="relevance", 
+                                retmax=max_results,
+                                retmode="xml", 
+                                term=query)
+        return Entrez.read(handle)
+
+    # Goes through the shared scheduler so it counts against the same NCBI rate limit
+    return scheduler.call(esearch, priority=PRIORITY_HIGH, name="esearch").result()
 
 def get_pmids(query, max_results=100):
     results = search_pubmed(query, max_results)
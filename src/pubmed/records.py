@@ -0,0 +1,60 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+
+def parse_year(year: Any) -> Optional[int]:
+    """Convert a BioC year string (or int) into an int, None if missing or malformed."""
+    try:
+        return int(str(year).strip()[:4])
+    except (TypeError, ValueError):
+        return None
+
+
+def content_digest(content: Optional[str], sections: Any = ()) -> str:
+    """Hash of a paper's flattened content and section spans, used to invalidate cached counts."""
+    digest = hashlib.sha1((content or "").encode('utf-8'))
+    digest.update(repr(tuple(tuple(span) for span in sections or ())).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+@dataclass(slots=True)
+class PaperRecord:
+    """
+    Compact per-paper record shared by every PubMedProcessor stage.
+
+    Counts, statistics and saved outputs refer back to the record rather than
+    copying its fields. Once parsed, the flattened full text lives in the
+    FullTextStore and ``content`` is left empty.
+    """
+    pmid: str
+    year: Optional[int]
+    title: Optional[str] = None
+    authors: List[str] = field(default_factory=list)
+    abstract: str = ""
+    content: str = ""
+    # (section_type, start, end) spans of the passages within ``content``
+    sections: Tuple[Tuple[str, int, int], ...] = ()
+    # content_digest of ``content`` and ``sections``
+    content_hash: str = ""
+
+    def __getitem__(self, key: str) -> Any:
+        # Dict-style access keeps code written against the old nested dicts working,
+        # including their string years, e.g. record["year"] == "2020"
+        if key == "year":
+            return None if self.year is None else str(self.year)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if hasattr(self, key) else default
+
+    def metadata(self) -> dict:
+        """Title, authors and abstract as saved alongside per-paper counts."""
+        return {"title": self.title, "authors": self.authors, "abstract": self.abstract}
+
+
+def record_year(record: Any) -> Optional[int]:
+    """Year of a PaperRecord or of a legacy dict record as an int."""
+    if isinstance(record, PaperRecord):
+        return record.year
+    return parse_year(record["year"])
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# (section_type, start, end) character span of one passage inside the flattened content
+SectionSpan = Tuple[str, int, int]
+
+
+def flatten_with_sections(passages: List[Dict]) -> Tuple[str, Tuple[SectionSpan, ...]]:
+    """
+    Join passage contents with single spaces, recording each passage's section span.
+
+    Produces exactly the string ``PubMedProcessor.flatten_passages`` builds, so the
+    spans can be used to slice it later without re-parsing the BioC XML.
+    """
+    parts = []
+    spans = []
+    offset = 0
+    for passage in passages:
+        text = passage["content"]
+        if parts:
+            offset += 1  # joining space
+        spans.append((passage.get("section") or "", offset, offset + len(text)))
+        parts.append(text)
+        offset += len(text)
+    return " ".join(parts), tuple(spans)
+
+
+@dataclass(frozen=True)
+class SectionFilter:
+    """
+    Which BioC ``section_type`` passages count towards term mentions.
+
+    ``include`` limits counting to the listed sections (e.g. {"METHODS"}); ``exclude``
+    drops sections from whatever is included. Section names compare case-insensitively.
+    """
+    include: Optional[FrozenSet[str]] = None
+    exclude: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def of(cls, include: Optional[Iterable[str]] = None,
+           exclude: Iterable[str] = ()) -> "SectionFilter":
+        return cls(
+            include=frozenset(s.upper() for s in include) if include is not None else None,
+            exclude=frozenset(s.upper() for s in exclude),
+        )
+
+    def allows(self, section: str) -> bool:
+        section = section.upper()
+        if self.include is not None and section not in self.include:
+            return False
+        return section not in self.exclude
+
+    def apply(self, content: Optional[str], sections: Tuple[SectionSpan, ...]) -> Optional[str]:
+        """Text of the allowed sections; the full content if no spans were recorded."""
+        if content is None or not sections:
+            return content
+        return " ".join(content[start:end] for section, start, end in sections if self.allows(section))
+
+    def fingerprint(self) -> str:
+        include = sorted(self.include) if self.include is not None else "*"
+        return f"include={include};exclude={sorted(self.exclude)}"
@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Row order of the per-year statistics CSV; dataset keys are appended after these
+BASE_STATS_KEYS = [
+    'total_files',
+    'files_with_github', 'files_without_github', 'total_github_mentions',
+    'files_with_public_dataset', 'total_dataset_mentions',
+    'files_with_github_and_dataset',
+    'files_with_github_and_without_dataset',
+    'files_with_AI',
+    'total_citations'
+]
+
+
+def stats_keys(dataset_keys: Iterable[str]) -> List[str]:
+    """Return every statistic name in CSV order for the given dataset keys."""
+    keys = list(BASE_STATS_KEYS)
+    for key in dataset_keys:
+        keys.extend([f'files_with_{key}', f'total_{key}_mentions'])
+    return keys
+
+
+def counts_to_frame(counts: Dict[str, Dict], year: Optional[str] = None) -> pd.DataFrame:
+    """Load per-paper count dicts (pmid -> counts) into a columnar frame indexed by pmid."""
+    frame = pd.DataFrame.from_dict(counts, orient='index')
+    if year is not None:
+        frame['year'] = year
+    return frame
+
+
+def compute_stats(frame: pd.DataFrame, dataset_keys: Iterable[str],
+                  years: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Compute every per-year statistic with a single groupby over ``frame['year']``.
+
+    Args:
+        frame: One row per paper with 'year', 'code', 'big_datasets', 'ai',
+            'citation_count' and one column per dataset key.
+        dataset_keys: Dataset mapping keys to produce per-dataset statistics for.
+        years: Years to report; years without papers get all-zero statistics.
+    """
+    dataset_keys = list(dataset_keys)
+    if years is None:
+        years = sorted(frame['year'].unique()) if len(frame) else []
+
+    def column(name):
+        if name in frame:
+            return pd.to_numeric(frame[name], errors='coerce')
+        return pd.Series(0, index=frame.index)
+
+    code = column('code').fillna(0)
+    datasets = column('big_datasets').fillna(0)
+    has_code = code > 0
+    has_dataset = datasets > 0
+
+    columns = {
+        'total_files': pd.Series(1, index=frame.index),
+        'files_with_github': has_code,
+        'files_without_github': code == 0,
+        'total_github_mentions': code,
+        'files_with_public_dataset': has_dataset,
+        'total_dataset_mentions': datasets,
+        'files_with_github_and_dataset': has_code & has_dataset,
+        'files_with_github_and_without_dataset': has_code & (datasets == 0),
+        'files_with_AI': column('ai').fillna(0) > 0,
+        'total_citations': column('citation_count').fillna(0),
+    }
+    for key in dataset_keys:
+        mentions = column(key).fillna(0)
+        columns[f'files_with_{key}'] = mentions > 0
+        columns[f'total_{key}_mentions'] = mentions
+
+    parts = pd.DataFrame(columns).astype('int64')
+    parts['year'] = frame['year'].values if len(frame) else []
+    per_year = (
+        parts.groupby('year').sum()
+        .reindex(years, fill_value=0)[stats_keys(dataset_keys)]
+    )
+    return {
+        year: {key: int(value) for key, value in row.items()}
+        for year, row in per_year.iterrows()
+    }
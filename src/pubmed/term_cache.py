@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# iCite counts grow over time; cached counts older than this are fetched again
+CITATION_TTL = 24 * 60 * 60
+
+
+def fingerprint_terms(terms: Iterable[str], *context: Any) -> str:
+    """Stable fingerprint of a term list plus anything else that changes how it is counted."""
+    payload = json.dumps([sorted(term.lower() for term in terms), [str(c) for c in context]])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class TermCountCache:
+    """
+    Per-paper count columns cached by the fingerprint of their term definition.
+
+    Editing one term group only changes that group's fingerprint, so re-analysis
+    recomputes that single column and reuses every other column. Counts are
+    tied to a hash of the paper content they were computed from, so a paper
+    that was re-fetched or parsed differently is recounted. iCite citation
+    counts expire after ``citation_ttl`` seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, citation_ttl: float = CITATION_TTL):
+        self.path = path
+        self.citation_ttl = citation_ttl
+        self.columns: Dict[str, Dict[str, int]] = {}
+        self.content_hashes: Dict[str, str] = {}
+        # pmid -> (citation count, time fetched)
+        self.citations: Dict[str, Tuple[Any, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            self.content_hashes = state.get('content_hashes', {})
+            # Columns saved before content hashes were recorded cannot be validated
+            self.columns = state.get('columns', {}) if self.content_hashes else {}
+            # Bare counts from older caches have no fetch time and count as expired
+            self.citations = {
+                pmid: value if isinstance(value, tuple) else (value, 0.0)
+                for pmid, value in state.get('citations', {}).items()
+            }
+
+    def check_content(self, pmid: str, content_hash: str) -> None:
+        """Forget a paper's cached counts if its content changed since they were computed."""
+        if self.content_hashes.get(pmid) != content_hash:
+            for column in self.columns.values():
+                column.pop(pmid, None)
+            self.content_hashes[pmid] = content_hash
+            self.dirty = True
+
+    def lookup(self, fingerprint: str, pmid: str) -> Optional[int]:
+        """Cached count of a paper under a term fingerprint, None if not computed yet."""
+        value = self.columns.get(fingerprint, {}).get(pmid)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def store(self, fingerprint: str, pmid: str, value: int) -> int:
+        self.columns.setdefault(fingerprint, {})[pmid] = value
+        self.dirty = True
+        return value
+
+    def has_citation(self, pmid: str) -> bool:
+        """Whether a citation count is cached and younger than the TTL."""
+        cached = self.citations.get(pmid)
+        return cached is not None and time.time() - cached[1] <= self.citation_ttl
+
+    def citation(self, pmid: str, fetch_fn: Callable[[str], Any], refresh: bool = False) -> Any:
+        if refresh or not self.has_citation(pmid):
+            self.citations[pmid] = (fetch_fn(pmid), time.time())
+            self.dirty = True
+        return self.citations[pmid][0]
+
+    def prune(self, active_fingerprints: Iterable[str]) -> None:
+        """Drop columns whose term definitions are no longer in use."""
+        active = set(active_fingerprints)
+        pruned = {fp: col for fp, col in self.columns.items() if fp in active}
+        self.dirty |= len(pruned) != len(self.columns)
+        self.columns = pruned
+
+    def clear(self) -> None:
+        self.columns = {}
+        self.content_hashes = {}
+        self.citations = {}
+        self.dirty = True
+
+    def save(self) -> None:
+        # Left untouched when nothing changed, so the file's content hash stays stable
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'columns': self.columns,
+                'content_hashes': self.content_hashes,
+                'citations': self.citations,
+            }, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
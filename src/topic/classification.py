@@ -1,10 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
 import re
-import torch
 import logging
+from src.topic.results_log import ClassificationLog, paper_keys
+from src.topic.token_budget import TokenBudget
+from src.llm.sharding import ShardedRunner
+from src.llm.decoding import DecodingConfig, GenerationTimer
+from src.pipeline.metrics import METRICS
 
 @dataclass
 class ClassifierConfig:
@@ -12,6 +17,11 @@ class ClassifierConfig:
     device: str = "cuda:0"  # Default GPU device
     input_path: Path = Path("data/processed/combined_data.csv")
     output_path: Path = Path("data/processed/classified_data.csv")
+    log_path: Path = Path("data/processed/classified_data.jsonl")  # Append-only per-batch results
+    max_abstract_tokens: Optional[int] = 512  # None keeps abstracts whole
+    length_buckets: Tuple[int, ...] = (256, 512, 768, 1024, 1536)  # Prompt token bucket edges
+    generation_batch_size: int = 8  # Prompts per generate call within a bucket
+    decoding: DecodingConfig = field(default_factory=DecodingConfig)  # Greedy unless configured
 
 class TopicClassifier:
     """Classifier for medical research topics using LLM"""
@@ -32,11 +42,30 @@ Key Guidelines for Classification:
 5. Scale: Note the scale of the study (e.g., individual organs, whole-body systems, molecular level, or population-level data).
 """
 
-    def __init__(self, config: ClassifierConfig, llm_pipeline):
+    def __init__(self, config: ClassifierConfig, llm_pipeline=None):
         self.config = config
         self.llm_pipeline = llm_pipeline
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
+        self.results_log = ClassificationLog(config.log_path)
+        # Without a pipeline this instance only coordinates sharded runs (see process_dataset)
+        self.token_budget = None
+        if llm_pipeline is not None:
+            self._setup_pipeline(llm_pipeline)
+
+    def _setup_pipeline(self, llm_pipeline):
+        self.model_name = getattr(getattr(llm_pipeline, 'model', None), 'name_or_path', 'unknown')
+        self.token_budget = TokenBudget(
+            llm_pipeline.tokenizer,
+            max_abstract_tokens=self.config.max_abstract_tokens,
+            bucket_edges=self.config.length_buckets
+        )
+        # Batched generation pads on the left; Llama tokenizers ship without a pad token
+        if llm_pipeline.tokenizer.pad_token_id is None:
+            llm_pipeline.tokenizer.pad_token_id = llm_pipeline.tokenizer.eos_token_id
+        llm_pipeline.tokenizer.padding_side = "left"
+        # Tokens contributed by the fixed prompt template itself
+        self.template_tokens = self.token_budget.count(self.generate_classification_prompt("", ""))
 
     def generate_classification_prompt(self, title: str, abstract: str) -> str:
         """Generate a prompt for the LLM to classify the paper"""
@@ -76,20 +105,51 @@ Classification:"""
         
         return "Unknown"
 
+    @staticmethod
+    def paper_title(row: pd.Series) -> str:
+        # Select appropriate title field based on venue
+        return row['cleaned_title'] if row['venue'] in ['ml4h', 'mlhc', 'chil'] else row['title']
+
+    def budgeted_prompt(self, row: pd.Series) -> Tuple[str, int, bool]:
+        """Prompt with the abstract cut to the token budget, its token count, and whether it was cut"""
+        title = self.paper_title(row)
+        abstract = self.token_budget.truncate(row['abstract'])
+        tokens = self.template_tokens + self.token_budget.count(str(title)) + abstract.tokens
+        return self.generate_classification_prompt(title, abstract.text), tokens, abstract.truncated
+
+    def classify_batch(self, batch_df: pd.DataFrame) -> List[Optional[str]]:
+        """Classify a batch of papers, generating for similar-length prompts together; None marks a failed generation"""
+        prompts, lengths, truncated = zip(*(self.budgeted_prompt(row) for _, row in batch_df.iterrows()))
+        topics = [None] * len(prompts)
+        for batch in self.token_budget.plan_batches(lengths, self.config.generation_batch_size, truncated):
+            try:
+                timer = GenerationTimer("llm.classify")
+                outputs = self.llm_pipeline(
+                    [prompts[i] for i in batch],
+                    batch_size=len(batch),
+                    max_new_tokens=100,
+                    return_full_text=False,
+                    stopping_criteria=timer.criteria(),
+                    **self.config.decoding.to_generate_kwargs()
+                )
+                timer.record(prompt_tokens=sum(lengths[i] for i in batch))
+                for i, output in zip(batch, outputs):
+                    topics[i] = self.extract_classification(output[0]['generated_text'])
+            except Exception as e:
+                paper_ids = [batch_df.iloc[i]['paper_id'] for i in batch]
+                self.logger.error(f"Error classifying papers {paper_ids}: {str(e)}")
+        return topics
+
     def classify_paper(self, row: pd.Series) -> str:
         """Classify a single paper using the LLM"""
-        # Select appropriate title field based on venue
-        title = row['cleaned_title'] if row['venue'] in ['ml4h', 'mlhc', 'chil'] else row['title']
-        abstract = row['abstract']
-        
-        prompt = self.generate_classification_prompt(title, abstract)
+        prompt, _, _ = self.budgeted_prompt(row)
         
         try:
             generated_text = self.llm_pipeline(
                 prompt,
                 max_new_tokens=100,
-                temperature=0.1,
-                do_sample=True
+                return_full_text=False,
+                **self.config.decoding.to_generate_kwargs()
             )[0]['generated_text']
             
             classification = self.extract_classification(generated_text)
@@ -99,12 +159,31 @@ Classification:"""
             self.logger.error(f"Error classifying paper {row['paper_id']}: {str(e)}")
             return "Unknown"
 
+    def classify_into_log(self, todo: pd.DataFrame, keys: pd.Series, batch_size: int = 100) -> None:
+        """Classify papers in batches, appending each batch to the results log"""
+        total_papers = len(todo)
+        for i in range(0, total_papers, batch_size):
+            batch_df = todo.iloc[i:i + batch_size]
+            topics = self.classify_batch(batch_df)
+            # Failed generations are not logged, so a restart retries them
+            classified = [(key, topic) for key, topic in zip(keys.iloc[i:i + batch_size], topics) if topic is not None]
+            self.results_log.append([key for key, _ in classified], [topic for _, topic in classified],
+                                    model=self.model_name, decoding=self.config.decoding.as_record())
+            
+            self.logger.info(f"Processed {min(i + batch_size, total_papers)}/{total_papers} papers")
+
     def process_dataset(
         self,
         df: Optional[pd.DataFrame] = None,
-        batch_size: int = 100
+        batch_size: int = 100,
+        runner: Optional[ShardedRunner] = None
     ) -> pd.DataFrame:
-        """Process the entire dataset, classifying papers in batches"""
+        """
+        Process the entire dataset, classifying papers in batches.
+
+        With a ShardedRunner the pending papers are split into contiguous shards,
+        each classified by its own model replica into a per-shard results log.
+        """
         # Load data if not provided
         if df is None:
             try:
@@ -114,28 +193,47 @@ Classification:"""
                 self.logger.error(f"Could not find input file: {self.config.input_path}")
                 return None
 
-        total_papers = len(df)
-        self.logger.info(f"Starting classification of {total_papers} papers")
+        keys = paper_keys(df)
+        # Results logged under other decoding parameters are stale and get redone
+        decoding = self.config.decoding.as_record()
+        done = self.results_log.completed(decoding=decoding)
+        pending = ~keys.isin(done).to_numpy()
+        todo, todo_keys = df.loc[pending], keys[pending]
+        total_papers = len(todo)
+        self.logger.info(
+            f"Starting classification of {total_papers} papers "
+            f"({len(df) - total_papers} already logged in {self.results_log.path})"
+        )
         
-        # Process in batches
-        for i in range(0, total_papers, batch_size):
-            batch_df = df.iloc[i:i + batch_size].copy()
-            batch_df['topic'] = batch_df.apply(self.classify_paper, axis=1)
-            df.iloc[i:i + batch_size, df.columns.get_loc('topic')] = batch_df['topic']
-            
-            self.logger.info(f"Processed {min(i + batch_size, total_papers)}/{total_papers} papers")
-            
-            # Periodically save progress
-            if (i + batch_size) % 1000 == 0 or (i + batch_size) >= total_papers:
-                df.to_csv(self.config.output_path, index=False)
-                self.logger.info(f"Saved progress to {self.config.output_path}")
+        if runner is None:
+            self.classify_into_log(todo, todo_keys, batch_size)
+        elif total_papers:
+            shard_fn = partial(classify_shard, config=self.config, batch_size=batch_size)
+            runner.map(shard_fn, todo.assign(_paper_key=todo_keys.to_numpy()))
+
+        # Materialize the final table with a single join against the log
+        topics = self.results_log.to_frame(decoding=decoding).set_index('paper_id')['topic']
+        df['topic'] = keys.map(topics).fillna("Unknown").to_numpy()
+        with METRICS.timer("csv.write", items=len(df)):
+            df.to_csv(self.config.output_path, index=False)
+        self.logger.info(f"Saved classified data to {self.config.output_path}")
 
         # Print classification summary
         self.logger.info("\nClassification Summary:")
         self.logger.info(df['topic'].value_counts())
+        if self.token_budget is not None:
+            self.logger.info("Prompt length buckets:\n" + self.token_budget.format_report())
         
         return df
 
+def classify_shard(llm_pipeline, shard: pd.DataFrame, shard_index: int,
+                   config: ClassifierConfig, batch_size: int = 100) -> int:
+    """ShardedRunner task: classify one shard into its own results log"""
+    shard_config = replace(config, log_path=ClassificationLog(config.log_path).shard_path(shard_index))
+    classifier = TopicClassifier(shard_config, llm_pipeline)
+    classifier.classify_into_log(shard, shard['_paper_key'], batch_size)
+    return len(shard)
+
 # Example usage:
 # def main():
 #     # Initialize config
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def paper_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Stable per-paper key: the paper_id when present, else a venue/title hash.
+
+    Conference rows can lack a paper_id, so those fall back to hashing the
+    venue and title, which is stable across re-merges of the same inputs.
+    """
+    paper_ids = df['paper_id'].fillna('').astype(str) if 'paper_id' in df else pd.Series('', index=df.index)
+    venues = df['venue'].astype(str) if 'venue' in df else pd.Series('', index=df.index)
+    titles = df['title'].fillna('').astype(str) if 'title' in df else pd.Series('', index=df.index)
+    hashed = [
+        'sha1:' + hashlib.sha1(f"{venue}\t{title}".encode('utf-8')).hexdigest()[:16]
+        for venue, title in zip(venues, titles)
+    ]
+    return paper_ids.where(paper_ids.str.strip() != '', pd.Series(hashed, index=df.index))
+
+
+class ClassificationLog:
+    """
+    Append-only JSONL log of classification results.
+
+    Each batch is appended and fsynced, so a crash loses at most the batch in
+    flight; on restart ``completed`` tells which papers to skip. A torn last
+    line from an interrupted write is ignored when reading.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def shard_path(self, shard_index: int) -> Path:
+        """Log written by one worker of a sharded run, e.g. classified_data.shard0.jsonl"""
+        return self.path.with_name(f"{self.path.stem}.shard{shard_index}{self.path.suffix}")
+
+    def paths(self):
+        """The main log followed by any shard logs beside it"""
+        shards = sorted(self.path.parent.glob(f"{self.path.stem}.shard*{self.path.suffix}"))
+        return [path for path in [self.path] + shards if path.exists()]
+
+    def read(self, **match) -> Dict[str, dict]:
+        """
+        Latest logged record per paper key by timestamp, across the main and shard logs.
+
+        With ``match``, only records whose fields equal it are considered, so an
+        older matching record is not hidden by a newer one logged under other settings.
+        """
+        records = {}
+        for path in self.paths():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable line {line_number} in {path}")
+                        continue
+                    if any(record.get(name) != value for name, value in match.items()):
+                        continue
+                    latest = records.get(record['paper_id'])
+                    # Ties keep the record read last, i.e. the later line of the same file
+                    if latest is None or record.get('timestamp', 0) >= latest.get('timestamp', 0):
+                        records[record['paper_id']] = record
+        return records
+
+    def completed(self, **match) -> set:
+        """Keys of logged papers, optionally only those with a record equal to ``match``"""
+        return set(self.read(**match))
+
+    def append(self, keys: Iterable[str], topics: Iterable[str], model: str,
+               probabilities: Optional[Iterable[Optional[dict]]] = None, **fields) -> int:
+        """Append one record per paper and fsync; extra ``fields`` are stored on every record"""
+        timestamp = time.time()
+        keys, topics = list(keys), list(topics)
+        probabilities = list(probabilities) if probabilities is not None else [None] * len(keys)
+        lines = [
+            json.dumps({
+                'paper_id': key,
+                'topic': topic,
+                'probabilities': probs,
+                'model': model,
+                'timestamp': timestamp,
+                **fields,
+            })
+            for key, topic, probs in zip(keys, topics, probabilities)
+        ]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab+') as f:
+            # Terminate a torn line from an interrupted write so it stays isolated
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            if lines:
+                f.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        return len(lines)
+
+    def to_frame(self, **match) -> pd.DataFrame:
+        records = list(self.read(**match).values())
+        if not records:
+            return pd.DataFrame(columns=['paper_id', 'topic', 'probabilities', 'model', 'timestamp'])
+        return pd.DataFrame(records)
@@ -0,0 +1,131 @@
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A sentence ends at ., ! or ? followed by whitespace
+SENTENCE_END_RE = re.compile(r'[.!?](?=\s)')
+
+
+@dataclass
+class BucketStats:
+    """Token accounting for one prompt-length bucket"""
+    upper: Optional[int]
+    prompts: int = 0
+    tokens: int = 0
+    max_tokens: int = 0
+    padded_tokens: int = 0
+    truncated: int = 0
+
+    @property
+    def padding_efficiency(self) -> float:
+        return self.tokens / self.padded_tokens if self.padded_tokens else 1.0
+
+
+@dataclass
+class BudgetedText:
+    text: str
+    tokens: int
+    truncated: bool = False
+
+
+class TokenBudget:
+    """
+    Token budgeting for classification prompts.
+
+    Each abstract is tokenized once (with character offsets) to measure it and,
+    if it exceeds ``max_abstract_tokens``, cut at the last sentence boundary
+    inside the budget. Prompts are then grouped into length buckets and batched
+    by similar length so a few very long abstracts no longer set the padded
+    length of every batch.
+    """
+
+    def __init__(self, tokenizer, max_abstract_tokens: Optional[int] = 512,
+                 bucket_edges: Sequence[int] = (256, 512, 768, 1024, 1536)):
+        self.tokenizer = tokenizer
+        self.max_abstract_tokens = max_abstract_tokens
+        self.bucket_edges = sorted(bucket_edges)
+        self.stats: Dict[int, BucketStats] = {}
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False)['input_ids'])
+
+    def truncate(self, text: Optional[str]) -> BudgetedText:
+        """Trim text to the token budget, preferring to end on a full sentence"""
+        text = text if isinstance(text, str) else ''
+        if not text or self.max_abstract_tokens is None:
+            return BudgetedText(text, self.count(text) if text else 0)
+
+        offsets = None
+        if getattr(self.tokenizer, 'is_fast', False):
+            encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            if len(encoding['input_ids']) <= self.max_abstract_tokens:
+                return BudgetedText(text, len(encoding['input_ids']))
+            offsets = encoding['offset_mapping']
+            cut = offsets[self.max_abstract_tokens - 1][1]
+        else:
+            # Slow tokenizers have no offsets; decode the kept prefix instead
+            ids = self.tokenizer(text, add_special_tokens=False)['input_ids']
+            if len(ids) <= self.max_abstract_tokens:
+                return BudgetedText(text, len(ids))
+            cut = len(self.tokenizer.decode(ids[:self.max_abstract_tokens]))
+
+        # Back off to the last sentence end, unless that would drop more than half the budget
+        ends = [m.end() for m in SENTENCE_END_RE.finditer(text, 0, cut + 1)]
+        if ends and ends[-1] >= cut // 2:
+            cut = ends[-1]
+        truncated = text[:cut].rstrip()
+        # The offsets already tell how many tokens were kept
+        tokens = bisect_right([end for _, end in offsets], len(truncated)) if offsets else self.count(truncated)
+        return BudgetedText(truncated, tokens, truncated=True)
+
+    def bucket_of(self, tokens: int) -> int:
+        """Index of the smallest bucket holding ``tokens``; the last bucket is unbounded"""
+        return bisect_left(self.bucket_edges, tokens)
+
+    def plan_batches(self, lengths: Sequence[int], batch_size: int,
+                     truncated: Optional[Sequence[bool]] = None) -> List[List[int]]:
+        """
+        Group prompt indices into batches of similar length.
+
+        Indices are sorted by length within each bucket and batches never span
+        buckets. Per-bucket token counts accumulate in ``stats``.
+        """
+        buckets: Dict[int, List[int]] = {}
+        for i, tokens in enumerate(lengths):
+            buckets.setdefault(self.bucket_of(tokens), []).append(i)
+
+        batches = []
+        for bucket, indices in sorted(buckets.items()):
+            indices.sort(key=lambda i: lengths[i])
+            upper = self.bucket_edges[bucket] if bucket < len(self.bucket_edges) else None
+            stats = self.stats.setdefault(bucket, BucketStats(upper))
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                longest = max(lengths[i] for i in batch)
+                stats.prompts += len(batch)
+                stats.tokens += sum(lengths[i] for i in batch)
+                stats.max_tokens = max(stats.max_tokens, longest)
+                stats.padded_tokens += longest * len(batch)
+                if truncated is not None:
+                    stats.truncated += sum(1 for i in batch if truncated[i])
+                batches.append(batch)
+        return batches
+
+    def report(self) -> List[Tuple[str, BucketStats]]:
+        """(label, stats) per non-empty bucket, e.g. ('257-512', ...)"""
+        rows = []
+        for bucket, stats in sorted(self.stats.items()):
+            lower = self.bucket_edges[bucket - 1] + 1 if bucket else 0
+            label = f"{lower}-{stats.upper}" if stats.upper is not None else f">{lower - 1}"
+            rows.append((label, stats))
+        return rows
+
+    def format_report(self) -> str:
+        lines = ["bucket      prompts    tokens  max  truncated  padding_eff"]
+        for label, stats in self.report():
+            lines.append(
+                f"{label:<10} {stats.prompts:>8} {stats.tokens:>9} {stats.max_tokens:>4} "
+                f"{stats.truncated:>10} {stats.padding_efficiency:>12.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,20 @@
+import pytest
+
+from src.conf_proc.clean_conf import DEFAULT_ASSIST, ConferencePaperCleaner
+from src.conf_proc.pathing import ConferencePathManager
+from src.llm.decoding import AssistedDecoding, DecodingConfig
+
+BEAM = DecodingConfig(strategy="beam")
+
+
+def test_default_assist_only_for_greedy_decoding():
+    path_manager = ConferencePathManager()
+    assert ConferencePaperCleaner(path_manager).assist == DEFAULT_ASSIST
+    assert ConferencePaperCleaner(path_manager, decoding=BEAM).assist == {}
+    assert ConferencePaperCleaner(path_manager, assist={"title": None}, decoding=BEAM).assist == {"title": None}
+
+
+def test_assist_rejected_with_non_greedy_decoding():
+    with pytest.raises(ValueError):
+        ConferencePaperCleaner(ConferencePathManager(), decoding=BEAM,
+                               assist={"title": AssistedDecoding(prompt_lookup_num_tokens=10)})
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from combine_classify import DataMerger, DataPaths
+
+
+def write_sources(tmp_path):
+    conference = {'title': ["A Paper"], 'cleaned_title': ["A Paper"], 'year': [2021],
+                  'abstract': ["x"], 'processed_emails': ["a@b.edu"], 'mimic_count': [2]}
+    for name in ('ml4h', 'chil', 'mlhc'):
+        pd.DataFrame(conference).assign(title=f"{name} paper").to_csv(tmp_path / f"{name}.csv", index=False)
+    pd.DataFrame({'paper_id': ["1"], 'title': ["PubMed Paper"], 'year': [2020], 'abstract': ["y"],
+                  'affiliation': ["UIUC"], 'paper_with_code_data_count': [1]}).to_csv(tmp_path / "pubmed.csv", index=False)
+    return DataPaths(
+        pubmed_path=tmp_path / "pubmed.csv", ml4h_path=tmp_path / "ml4h.csv",
+        chil_path=tmp_path / "chil.csv", mlhc_path=tmp_path / "mlhc.csv",
+        output_path=tmp_path / "combined.csv",
+    )
+
+
+def test_non_schema_columns_survive_the_merge(tmp_path):
+    paths = write_sources(tmp_path)
+    DataMerger(paths).merge_data()
+
+    merged = pd.read_csv(paths.output_path)
+    extras = ['processed_emails', 'mimic_count', 'affiliation', 'paper_with_code_data_count']
+    assert set(extras) <= set(merged.columns)
+    pubmed = merged[merged['venue'] == 'pubmed'].iloc[0]
+    assert pubmed['affiliation'] == "UIUC" and pubmed['paper_with_code_data_count'] == 1
+    assert merged.loc[merged['venue'] == 'ml4h', 'mimic_count'].tolist() == [2]
+
+
+def test_non_schema_columns_survive_into_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    paths = write_sources(tmp_path)
+    paths.parquet_path = tmp_path / "combined.parquet"
+    DataMerger(paths).merge_data(write_csv=False)
+
+    merged = pd.read_parquet(paths.parquet_path)
+    assert {'affiliation', 'processed_emails', 'mimic_count'} <= set(merged.columns)
+
+
+def test_declared_extra_columns_restrict_the_merge(tmp_path):
+    paths = write_sources(tmp_path)
+    merged = DataMerger(paths, extra_columns=('mimic_count',)).merge_data(write_csv=False)
+    assert 'mimic_count' in merged and 'affiliation' not in merged
+    assert merged['mimic_count'].tolist().count(0) == 1
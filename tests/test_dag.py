@@ -0,0 +1,39 @@
+import threading
+import time
+
+from src.pipeline.dag import Pipeline, Stage
+
+
+class Tracker:
+    """Records the peak number of tracked stages running at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def stage(self, seconds=0.05):
+        def fn():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            time.sleep(seconds)
+            with self.lock:
+                self.running -= 1
+        return fn
+
+
+def test_stages_sharing_a_resource_never_overlap(tmp_path):
+    gpu, cpu = Tracker(), Tracker()
+    stages = [
+        Stage("clean_a", gpu.stage(), resources=["gpu"]),
+        Stage("clean_b", gpu.stage(), resources=["gpu"]),
+        Stage("classify", gpu.stage(), resources=["gpu"]),
+        Stage("extract_a", cpu.stage()),
+        Stage("extract_b", cpu.stage()),
+    ]
+    results = Pipeline(stages, state_path=tmp_path / "state.json", max_workers=4).run()
+
+    assert all(result.status == 'ran' for result in results)
+    assert gpu.peak == 1
+    assert cpu.peak == 2
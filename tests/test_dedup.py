@@ -0,0 +1,25 @@
+import pandas as pd
+
+from src.corpus.dedup import deduplicate
+
+
+def test_cross_venue_duplicate_matched_on_cleaned_title():
+    title = "Predicting Childhood Asthma Outcomes with Electronic Health Records"
+    abstract = "We train gradient boosted trees on pediatric records to predict asthma exacerbations."
+    df = pd.DataFrame({
+        'venue': ['pubmed', 'ml4h', 'ml4h'],
+        'paper_id': ['1', '', ''],
+        # Raw titles of conference rows are extracted from the PDF header
+        'title': [title,
+                  f"Machine Learning for Health (ML4H) 2020 {title} Jane Doe, John Roe University of Illinois",
+                  "Proceedings of Machine Learning Research 2020 Sepsis Onset Prediction Alice Poe"],
+        'cleaned_title': ['', title, "Sepsis Onset Prediction from Vital Signs"],
+        'abstract': [abstract, abstract, "A recurrent model forecasts sepsis onset from bedside vitals."],
+        'citation_count': [5, 2, 0],
+    })
+
+    deduped, members = deduplicate(df)
+
+    assert len(deduped) == 2
+    assert deduped.loc[deduped['paper_id'] == '1', 'duplicate_venues'].item() == 'ml4h,pubmed'
+    assert sorted(members['venue']) == ['ml4h', 'pubmed']
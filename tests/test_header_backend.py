@@ -0,0 +1,28 @@
+from src.conf_proc.header_backend import GrobidHeaderBackend, GrobidStubServer
+
+HEADERS = {
+    'sepsis.pdf': {'title': "Early Sepsis Prediction & Triage", 'authors': ["Ada Lovelace", "Alan M. Turing"],
+                   'emails': ["ada@example.org"], 'abstract': "We predict sepsis."},
+    'empty.pdf': '<?xml version="1.0"?><TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader/></TEI>',
+    'blank.pdf': '',
+    'broken.pdf': '<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><fileDesc>',
+}
+
+
+def test_grobid_backend_round_trip_against_stub(tmp_path):
+    pdfs = []
+    for name in HEADERS:
+        (tmp_path / name).write_bytes(b"%PDF-1.4 stub")
+        pdfs.append(tmp_path / name)
+
+    with GrobidStubServer(lambda filename, data: HEADERS[filename]) as stub:
+        backend = GrobidHeaderBackend(stub.url, max_workers=2)
+        assert backend.is_available()
+        sepsis, empty, blank, broken = backend.extract_batch(pdfs)
+
+    assert sepsis == {**HEADERS['sepsis.pdf'], 'source': 'grobid'}
+    # A well-formed but empty header parses to empty fields, so callers fall back to the heuristics
+    assert empty == {'title': '', 'authors': [], 'emails': [], 'abstract': '', 'source': 'grobid'}
+    assert blank is None and broken is None
+    assert stub.requests == 4
+    assert not backend.is_available()
@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import Future
+
+from src.pubmed import pmc_scrape_func
+from src.pubmed.id_map import IdMapCache
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class Scheduler:
+    """Answers OA lookups from ``links``; IDs missing from it fail"""
+
+    def __init__(self, links):
+        self.links = links
+        self.requested = []
+
+    def submit(self, url, params=None, **kwargs):
+        pmcid = params["id"]
+        self.requested.append(pmcid)
+        future = Future()
+        if pmcid not in self.links:
+            future.set_exception(ConnectionError("reset"))
+        elif self.links[pmcid] is None:
+            future.set_result(Response("<OA></OA>"))
+        else:
+            future.set_result(Response(f'<OA><link format="tgz" href="{self.links[pmcid]}"/></OA>'))
+        return future
+
+
+def test_failed_oa_lookup_keeps_other_results(monkeypatch):
+    cache = IdMapCache(None)
+    scheduler = Scheduler({'PMC1': 'ftp://pmc1.tar.gz', 'PMC3': None})
+    monkeypatch.setattr(pmc_scrape_func, "get_scheduler", lambda: scheduler)
+
+    assert pmc_scrape_func.pmcid2ftplink(['PMC1', 'PMC2', 'PMC3'], cache=cache) == ['ftp://pmc1.tar.gz', None, None]
+    assert cache.lookup_oa(['PMC1', 'PMC2', 'PMC3']) == {'PMC1': 'ftp://pmc1.tar.gz', 'PMC3': None}
+
+
+def test_negative_entries_expire():
+    cache = IdMapCache(None, negative_ttl=60)
+    cache.store_pmids([('1', 'PMC1', None), ('2', None, None)])
+    cache.store_oa([('PMC1', None)])
+    assert set(cache.lookup_pmids(['1', '2'])) == {'1', '2'}
+
+    with cache._conn:
+        cache._conn.execute("UPDATE ids SET updated = ?", (time.time() - 120,))
+        cache._conn.execute("UPDATE oa_links SET updated = ?", (time.time() - 120,))
+    assert set(cache.lookup_pmids(['1', '2'])) == {'1'}
+    assert cache.lookup_oa(['PMC1']) == {}
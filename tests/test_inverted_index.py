@@ -0,0 +1,48 @@
+from src.corpus.inverted_index import InvertedIndex
+from src.pubmed.pmc_scrape import PubMedProcessor
+from src.pubmed.records import PaperRecord, content_digest
+
+
+def test_phrase_queries_match_whole_tokens_in_order():
+    index = InvertedIndex.from_texts([
+        ('1', "Trained on MIMIC-III and the UK Biobank; UK Biobank again."),
+        ('2', "Biobank data from the UK, mimicking prior work."),
+    ])
+    assert index.phrase_counts("UK Biobank") == {'1': 2}
+    assert index.phrase_counts("mimic") == {'1': 1}
+    assert index.count_group(["UK Biobank", "MIMIC", "Biobank"]) == {'1': 3, '2': 1}
+
+
+def test_update_reindexes_only_changed_papers_and_survives_save(tmp_path):
+    texts = {'1': "uses eICU", '2': "uses ADNI", '3': "uses TCGA"}
+    read = []
+
+    def text_fn(paper_id):
+        read.append(paper_id)
+        return texts[paper_id]
+
+    index = InvertedIndex()
+    assert index.update({'1': 'a', '2': 'a', '3': 'a'}, text_fn) == 3
+    index.save(tmp_path / "index.pkl")
+
+    index = InvertedIndex.load_or_create(tmp_path / "index.pkl")
+    texts['2'] = "uses PhysioNet"
+    read.clear()
+    assert index.update({'1': 'a', '2': 'b'}, text_fn) == 1
+    assert read == ['2']
+    assert index.phrase_counts("ADNI") == {} and index.phrase_counts("physionet") == {'2': 1}
+    assert '3' not in index and index.phrase_counts("TCGA") == {}
+
+
+def test_building_the_index_leaves_substring_counts_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    content = "We build on mimicking MIMIC baselines."
+    records = {'1': PaperRecord(pmid='1', year=2020, content=content, content_hash=content_digest(content))}
+    proc = PubMedProcessor()
+    proc.get_citation_count = lambda pmid: 0
+    proc.create_dataset_mapping([["MIMIC"]])
+
+    index = proc.build_inverted_index(records, str(tmp_path / "inverted_index.pkl"))
+    assert index.phrase_counts("mimic") == {'1': 1}
+    assert proc.count_mentions(content, ["mimic", "mimicking"]) == 2
+    assert proc.get_counts_per_paper(records)['1']['mimic'] == 1
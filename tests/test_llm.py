@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from src.llm.decoding import AssistedDecoding
+from src.llm.llm import PromptBuilder, generate_text_with_icl
+
+SPECIAL_TOKENS = ["<|begin_of_text|>", "<|start_header_id|>", "<|end_header_id|>", "<|eot_id|>"]
+CHAT_TEMPLATE = (
+    "{{ '<|begin_of_text|>' }}{% for message in messages %}"
+    "{{ '<|start_header_id|>' + message['role'] + '<|end_header_id|>\n\n' + message['content'] | trim + '<|eot_id|>' }}"
+    "{% endfor %}{% if add_generation_prompt %}{{ '<|start_header_id|>assistant<|end_header_id|>\n\n' }}{% endif %}"
+)
+# A few merges so token boundaries matter ("\u0120" is a byte-level space, "\u010a" a newline)
+MERGES = [("\u0120", "t"), ("\u0120t", "h"), ("\u0120th", "e"), ("I", "n"), ("In", "p"), ("Inp", "u"),
+          ("Inpu", "t"), ("\u010a", "\u010a"), ("N", "o"), ("No", "w"), (":", "\u010a")]
+EXAMPLES = [
+    {"input": "deep  learning for sepsis", "output": "Deep Learning for Sepsis"},
+    {"input": "ICU mortality prediction", "output": "ICU Mortality Prediction"},
+]
+
+
+def tiny_pipeline():
+    """Byte-level tokenizer with a Llama-3 style chat template and a random 1-layer Llama"""
+    alphabet = tokenizers.pre_tokenizers.ByteLevel.alphabet()
+    tokens = SPECIAL_TOKENS + sorted(alphabet) + ["".join(merge) for merge in MERGES]
+    vocab = {token: i for i, token in enumerate(tokens)}
+    backend = tokenizers.Tokenizer(tokenizers.models.BPE(vocab=vocab, merges=MERGES))
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.ByteLevel(add_prefix_space=False)
+    backend.decoder = tokenizers.decoders.ByteLevel()
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend, bos_token="<|begin_of_text|>", eos_token="<|eot_id|>",
+        additional_special_tokens=SPECIAL_TOKENS
+    )
+    tokenizer.chat_template = CHAT_TEMPLATE
+
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=len(vocab), hidden_size=32, intermediate_size=64, num_hidden_layers=1,
+        num_attention_heads=2, num_key_value_heads=2, eos_token_id=vocab["<|eot_id|>"]
+    )
+    model = transformers.LlamaForCausalLM(config).eval()
+    return SimpleNamespace(model=model, tokenizer=tokenizer)
+
+
+def test_prompt_lookup_assist_keeps_greedy_output():
+    pipeline = tiny_pipeline()
+    prompt = "multi scale  cnn for chest x-ray"
+    plain = generate_text_with_icl(prompt, pipeline, EXAMPLES, max_new_tokens=24)
+    assisted = generate_text_with_icl(prompt, pipeline, EXAMPLES, max_new_tokens=24,
+                                      assist=AssistedDecoding(prompt_lookup_num_tokens=4))
+    assert assisted == plain
+
+
+@pytest.mark.parametrize("examples", [EXAMPLES, []])
+def test_prompt_builder_matches_apply_chat_template(examples):
+    tokenizer = tiny_pipeline().tokenizer
+    builder = PromptBuilder(tokenizer)
+    for prompt in ["  the input title: Deep  Learning\n", "Now the second input"]:
+        messages = [
+            {"role": "system", "content": builder.system_text(prompt, examples)},
+            {"role": "user", "content": prompt},
+        ]
+        expected = tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True)
+        assert builder.build(prompt, examples) == list(expected)
+    # The system prompt and examples were tokenized once for both inputs
+    assert len(builder._icl_ids) == 1
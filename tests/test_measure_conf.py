@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from src.conf_proc.measure_conf import PDFContentProcessor
+
+
+def test_clean_title_does_not_match_conference_names_inside_words():
+    # "CHIL" inside "Childhood" must not swallow the title up to the trailing year
+    title = "Predicting Childhood Asthma Outcomes Machine Learning for Health (ML4H) 2020"
+    assert PDFContentProcessor.clean_title(title) == "Predicting Childhood Asthma Outcomes"
+
+
+def test_clean_title_still_removes_conference_names():
+    assert PDFContentProcessor.clean_title("Deep Sepsis Models CHIL 2021") == "Deep Sepsis Models"
+    assert PDFContentProcessor.clean_title("Predicting Children Outcomes (MLHC) 2019") == "Predicting Children Outcomes"
@@ -0,0 +1,27 @@
+import random
+
+from src.pipeline.metrics import MAX_SAMPLES, Metrics
+
+
+def worker_state(seed):
+    worker = Metrics(seed=seed)
+    for i in range(MAX_SAMPLES):
+        worker.observe("pdf.parse", seconds=seed + i / MAX_SAMPLES)
+    return worker.collect()
+
+
+def merged_samples():
+    parent = Metrics(seed=7)
+    for seed in (1, 2, 3):
+        parent.merge(worker_state(seed))
+    return parent.timers["pdf.parse"].samples
+
+
+def test_merge_downsamples_with_the_registry_rng():
+    random.seed(0)
+    global_state = random.getstate()
+    first = merged_samples()
+    assert len(first) == MAX_SAMPLES
+    assert merged_samples() == first
+    # The module-global generator is left alone
+    assert random.getstate() == global_state
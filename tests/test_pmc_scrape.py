@@ -0,0 +1,48 @@
+import pickle
+
+from src.pubmed.pmc_scrape import PubMedProcessor
+from src.pubmed.records import PaperRecord, content_digest
+
+
+def processor():
+    proc = PubMedProcessor()
+    proc.get_citation_count = lambda pmid: 0
+    proc.create_dataset_mapping([["MIMIC"]])
+    return proc
+
+
+def test_records_pickle_without_content_and_count_from_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data/raw/pubmed").mkdir(parents=True)
+    content = "Models were trained on MIMIC; code is on github."
+    records = {'1': PaperRecord(pmid='1', year=2020, title="t", content=content,
+                                content_hash=content_digest(content))}
+
+    proc = processor()
+    proc.save_content_store(records, "data/raw/pubmed/paper_content")
+    proc.save_to_pickle(records, "data/raw/pubmed/paper_content_flattened.pkl")
+    with open("data/raw/pubmed/paper_content_flattened.pkl", 'rb') as f:
+        assert pickle.load(f)['1'].content == ""
+
+    proc = processor()
+    counts = proc.get_counts_per_paper(proc.load_records())
+    assert counts['1']['mimic'] == 1 and counts['1']['code'] == 1
+
+
+def test_dict_access_keeps_string_years():
+    record = PaperRecord(pmid='1', year=2020)
+    assert record.year == 2020
+    assert record["year"] == record.get("year") == "2020"
+    assert PaperRecord(pmid='2', year=None)["year"] is None
+
+
+def test_load_paper_data_reads_old_format(tmp_path):
+    path = tmp_path / "pubmed_paper_data.pkl"
+    old = {"2020": {'1': {'mimic': 1, 'code': 0, 'title': "t", 'authors': ["A"], 'abstract': "a"}}}
+    with open(path, 'wb') as f:
+        pickle.dump(old, f)
+
+    data = PubMedProcessor.load_paper_data(str(path))
+    assert data["counts"] == {"2020": {'1': {'mimic': 1, 'code': 0}}}
+    assert data["papers"]['1'].metadata() == {"title": "t", "authors": ["A"], "abstract": "a"}
+    assert data["papers"]['1'].year == 2020
@@ -0,0 +1,51 @@
+import gzip
+import json
+import os
+
+import pandas as pd
+
+from src.citation.papers_with_code import load_dump_index
+from src.citation.pwc_dump import PapersWithCodeDumpIndex
+
+
+def index_of(*titles):
+    index = PapersWithCodeDumpIndex(max_df_ratio=1.0)
+    index.add_papers({'title': title, 'paper_url': f"https://pwc/{i}"} for i, title in enumerate(titles))
+    return index
+
+
+def test_match_requires_near_identical_title_and_picks_best():
+    index = index_of(
+        "Deep Learning for Sepsis Prediction in the ICU",
+        "Deep Learning for Early Sepsis Prediction in the ICU Setting",
+        "Interpretable Deep Learning for Early Sepsis Prediction in the ICU",
+    )
+    # Shares many words with every title but is not the same paper
+    assert index.match_title("Deep Learning for Mortality Prediction in the ICU") is None
+    assert index.match_title("deep learning for sepsis prediction in the ICU.") == "https://pwc/0"
+    assert index.match_title("Interpretable Deep Learning for Early Sepsis Prediction in ICU") == "https://pwc/2"
+
+
+def test_update_dataframe_emits_status():
+    index = index_of("Predicting Asthma Outcomes", "Sepsis Onset Forecasting")
+    index.set_dataset_links([("MIMIC-III", "https://pwc/0")])
+    df = pd.DataFrame({
+        'title': ["Predicting Asthma Outcomes", "Sepsis Onset Forecasting", "Something Else Entirely"],
+        'cleaned_title': ['', '', ''],
+    })
+    df = index.update_dataframe(df)
+    assert df['paper_with_code_status'].tolist() == ['found', 'no_datasets', 'no_match']
+    assert df['paper_with_code_data_count'].tolist() == [1, 0, 0]
+
+
+def test_index_cache_rebuilt_when_dump_changes(tmp_path):
+    def write_dump(*titles):
+        with gzip.open(tmp_path / "papers-with-abstracts.json.gz", 'wt', encoding='utf-8') as f:
+            json.dump([{'title': title, 'paper_url': title} for title in titles], f)
+
+    write_dump("First Paper")
+    assert load_dump_index(str(tmp_path)).titles == ["First Paper"]
+
+    write_dump("First Paper", "Second Paper")
+    os.utime(tmp_path / "papers-with-abstracts.json.gz", ns=(0, 10 ** 9))
+    assert load_dump_index(str(tmp_path)).titles == ["First Paper", "Second Paper"]
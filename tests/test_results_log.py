@@ -0,0 +1,29 @@
+import json
+
+from src.topic.results_log import ClassificationLog
+
+
+def write(path, *records):
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def test_latest_record_wins_by_timestamp_across_shard_logs(tmp_path):
+    log = ClassificationLog(tmp_path / "classified_data.jsonl")
+    write(log.path, {'paper_id': '1', 'topic': 'new', 'timestamp': 20.0, 'decoding': {'strategy': 'greedy'}})
+    # A leftover shard log from an older run is read after the main log
+    write(log.shard_path(0), {'paper_id': '1', 'topic': 'old', 'timestamp': 10.0, 'decoding': {'strategy': 'sample'}})
+
+    assert log.read()['1']['topic'] == 'new'
+    assert log.completed(decoding={'strategy': 'greedy'}) == {'1'}
+
+
+def test_match_is_applied_before_choosing_latest(tmp_path):
+    log = ClassificationLog(tmp_path / "classified_data.jsonl")
+    write(log.path,
+          {'paper_id': '1', 'topic': 'greedy', 'timestamp': 10.0, 'decoding': {'strategy': 'greedy'}},
+          {'paper_id': '1', 'topic': 'sampled', 'timestamp': 20.0, 'decoding': {'strategy': 'sample'}})
+
+    assert log.read(decoding={'strategy': 'greedy'})['1']['topic'] == 'greedy'
+    assert log.to_frame(decoding={'strategy': 'greedy'})['topic'].tolist() == ['greedy']
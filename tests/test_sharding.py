@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+from src.llm.sharding import ShardedRunner
+
+LOADS = 0
+
+
+def tiny_loader(device):
+    """Stands in for a model loader; counts loads within the worker process"""
+    global LOADS
+    LOADS += 1
+    return {'device': device, 'pid': os.getpid(), 'loads': LOADS}
+
+
+def tag_shard(model, shard, shard_index):
+    return shard.assign(pid=model['pid'], loads=model['loads'], shard_index=shard_index)
+
+
+def test_replicas_split_in_order_and_are_reused_across_maps():
+    df = pd.DataFrame({'row': range(7)})
+    with ShardedRunner(["cpu", "cpu"], tiny_loader) as runner:
+        first = pd.concat(runner.map(tag_shard, df))
+        second = pd.concat(runner.map(tag_shard, df))
+
+    for out in (first, second):
+        assert out['row'].tolist() == list(range(7))
+        assert out['shard_index'].tolist() == [0, 0, 0, 1, 1, 1, 1]
+        assert out['loads'].tolist() == [1] * 7
+    assert first['pid'].nunique() == 2
+    assert first['pid'].tolist() == second['pid'].tolist()
+    assert os.getpid() not in set(first['pid'])